@@ -0,0 +1,54 @@
+"""
+Compares the cost of explaining every out-of-sample prediction of a walk-forward run with the cost of the
+predictions themselves, and with explaining the folds one at a time.
+
+    python src/benchmarks/attribution_benchmark.py --n-estimators 300
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from managers.cross_validation import TimeSeriesCrossValidator  # noqa: E402
+from managers.pipeline import DATA_DIR, read_dated_csv  # noqa: E402
+from models.attribution import explain_folds  # noqa: E402
+from models.xgb import XGBoostRegressor  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark walk-forward feature attribution.")
+    parser.add_argument('--data', default=os.path.join(DATA_DIR, 'processed_data.csv'))
+    parser.add_argument('--target', default='BAMLHYH0A0HYM2TRIV')
+    parser.add_argument('--n-estimators', type=int, default=300)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    data = read_dated_csv(args.data)
+    target_col_index = data.columns.get_loc(args.target)
+    X = data.iloc[:, :target_col_index]
+    y = data.iloc[:, target_col_index]
+    bounds = TimeSeriesCrossValidator(data).split_bounds('rolling', initial_train_size=120, step_size=12,
+                                                         test_size=12)
+    models = [XGBoostRegressor(n_estimators=args.n_estimators).fit(X.iloc[s:e], y.iloc[s:e])
+              for s, e, _, _ in bounds]
+    print(f"{len(bounds)} folds, {X.shape[1]} features")
+
+    start = time.perf_counter()
+    for model, (_, _, test_start, test_end) in zip(models, bounds):
+        model.predict(X.iloc[test_start:test_end])
+    print(f"{'predict':<24} {time.perf_counter() - start:>8.3f} s")
+
+    start = time.perf_counter()
+    explain_folds(models, X, bounds, n_jobs=1)
+    print(f"{'contributions, serial':<24} {time.perf_counter() - start:>8.3f} s")
+
+    start = time.perf_counter()
+    attributions = explain_folds(models, X, bounds, n_jobs=args.n_jobs)
+    print(f"{'contributions, parallel':<24} {time.perf_counter() - start:>8.3f} s")
+    print(attributions.summary().head(10).to_string())
+
+
+if __name__ == '__main__':
+    main()
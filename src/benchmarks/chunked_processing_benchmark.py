@@ -0,0 +1,85 @@
+"""
+Reports peak RSS and wall time of the fuse and process steps on a synthetic wide universe, in memory and
+out of core with several memory budgets. Every run happens in a fresh subprocess so its peak RSS is its own.
+
+    python src/benchmarks/chunked_processing_benchmark.py --columns 3000 --budgets 16 64 256
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUN = """
+import json, os, resource, sys
+sys.path.insert(0, {src!r})
+from managers.pipeline import Pipeline, STAGES
+config = {{'fuse': {{'memory_budget': {budget}}},
+          'process': {{'memory_budget': {budget}, 'target_columns': ['S0', 'S1', 'SPY']}}}}
+Pipeline(STAGES, data_dir={data_dir!r}, config=config).run(until='process', force=['fuse', 'process'])
+print(json.dumps(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+"""
+
+
+def make_universe(data_dir, n_columns, n_rows, seed=0, chunk_rows=500):
+    # Written in row chunks: a child process starts with its parent's peak RSS on Linux, so the parent has to
+    # stay small for the children's numbers to mean anything.
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('1998-01-01', periods=n_rows, freq='D', name='Date')
+    columns = [f'S{i}' for i in range(n_columns)]
+    level = np.full(n_columns, 100.0)
+    with open(os.path.join(data_dir, 'fred_data.csv'), 'w') as f:
+        for start in range(0, n_rows, chunk_rows):
+            steps = rng.normal(0, 1, size=(min(chunk_rows, n_rows - start), n_columns))
+            values = level + steps.cumsum(axis=0)
+            level = values[-1]
+            values[rng.random(values.shape) < 0.5] = np.nan
+            pd.DataFrame(values, index=dates[start:start + len(values)], columns=columns).to_csv(
+                f, header=start == 0)
+    pd.DataFrame({'SPY': rng.normal(300, 10, size=n_rows)}, index=dates).to_csv(
+        os.path.join(data_dir, 'yahoo_data.csv'))
+    with open(os.path.join(data_dir, 'fred-tickers.json'), 'w') as f:
+        json.dump({column: column for column in columns}, f)
+
+
+def run(data_dir, budget):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', RUN.format(src=SRC_DIR, data_dir=data_dir, budget=budget)],
+                            capture_output=True, text=True, check=True).stdout
+    # ru_maxrss is in kilobytes on Linux.
+    return int(output.strip().splitlines()[-1]) / 1024, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark out-of-core fusion and processing.")
+    parser.add_argument('--columns', type=int, default=2000)
+    parser.add_argument('--rows', type=int, default=9000)
+    parser.add_argument('--budgets', type=int, nargs='+', default=[8, 32, 128], help="Memory budgets in MiB")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        make_universe(data_dir, args.columns, args.rows)
+        print(f"{args.columns} columns x {args.rows} daily rows "
+              f"({args.columns * args.rows * 8 / 2 ** 20:.0f} MiB as float64)")
+        print(f"{'mode':<18} {'peak RSS MiB':>14} {'seconds':>9}")
+        rss, seconds = run(data_dir, None)
+        with open(os.path.join(data_dir, 'processed_data.csv')) as f:
+            reference = f.read()
+        print(f"{'in memory':<18} {rss:>14.0f} {seconds:>9.1f}")
+        for budget in args.budgets:
+            rss, seconds = run(data_dir, budget * 2 ** 20)
+            with open(os.path.join(data_dir, 'processed_data.csv')) as f:
+                identical = f.read() == reference
+            print(f"{f'budget {budget} MiB':<18} {rss:>14.0f} {seconds:>9.1f}"
+                  f"{'' if identical else '   OUTPUT DIFFERS'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Compares walk-forward fit time and out-of-sample RMSE with and without fold-aware feature pruning.
+
+    python src/benchmarks/feature_selection_benchmark.py --threshold 0.95
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from managers.cross_validation import TimeSeriesCrossValidator  # noqa: E402
+from managers.feature_selection import CorrelationPruner, FoldFeatureSelector  # noqa: E402
+from managers.pipeline import DATA_DIR, read_dated_csv  # noqa: E402
+from models.xgb import XGBoostRegressor  # noqa: E402
+
+
+def walk_forward(X, y, bounds, model_params, selector=None):
+    fit_time, errors, n_features = 0.0, [], []
+    for train_start, train_end, test_start, test_end in bounds:
+        columns = selector.select(train_start, train_end) if selector is not None else np.arange(X.shape[1])
+        model = XGBoostRegressor(**model_params)
+        start = time.perf_counter()
+        model.fit(X[train_start:train_end][:, columns], y[train_start:train_end])
+        fit_time += time.perf_counter() - start
+        errors.append(model.predict(X[test_start:test_end][:, columns]) - y[test_start:test_end])
+        n_features.append(len(columns))
+    errors = np.concatenate(errors)
+    return fit_time, np.sqrt(np.mean(errors ** 2)), np.mean(n_features)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark fold-aware feature pruning.")
+    parser.add_argument('--data', default=os.path.join(DATA_DIR, 'processed_data.csv'))
+    parser.add_argument('--target', default='BAMLHYH0A0HYM2TRIV')
+    parser.add_argument('--threshold', type=float, default=0.95)
+    parser.add_argument('--max-features', type=int, default=None)
+    parser.add_argument('--n-estimators', type=int, default=300)
+    args = parser.parse_args(argv)
+
+    data = read_dated_csv(args.data)
+    target_col_index = data.columns.get_loc(args.target)
+    X = data.iloc[:, :target_col_index].to_numpy(dtype=float)
+    y = data.iloc[:, target_col_index].to_numpy(dtype=float)
+    bounds = TimeSeriesCrossValidator(data).split_bounds('rolling', initial_train_size=120, step_size=12,
+                                                         test_size=12)
+    model_params = {'n_estimators': args.n_estimators}
+
+    print(f"{len(bounds)} folds, {X.shape[1]} candidate features")
+    print(f"{'setting':<12} {'features':>9} {'fit s':>8} {'rmse':>10}")
+    fit_time, rmse, n_features = walk_forward(X, y, bounds, model_params)
+    print(f"{'all':<12} {n_features:>9.1f} {fit_time:>8.2f} {rmse:>10.3f}")
+    selector = FoldFeatureSelector(X, y, CorrelationPruner(args.threshold, args.max_features))
+    fit_time, rmse, n_features = walk_forward(X, y, bounds, model_params, selector)
+    print(f"{'pruned':<12} {n_features:>9.1f} {fit_time:>8.2f} {rmse:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
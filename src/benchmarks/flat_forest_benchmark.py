@@ -0,0 +1,84 @@
+"""
+Compares cold-start and per-row scoring latency of the flattened numpy evaluator with the xgboost path.
+
+    python src/benchmarks/flat_forest_benchmark.py --n-estimators 300
+"""
+import argparse
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SRC_DIR)
+
+from managers.pipeline import DATA_DIR, read_dated_csv  # noqa: E402
+from models.xgb import XGBoostRegressor  # noqa: E402
+
+
+COLD_START = {
+    'xgboost': "import pickle, numpy as np\n"
+               "model = pickle.load(open({model!r}, 'rb'))\n"
+               "model.predict(np.load({row!r}))\n",
+    'flat': "import numpy as np\n"
+            "from models.flat_forest import FlatForest\n"
+            "FlatForest.load({forest!r}).predict(np.load({row!r}))\n",
+}
+
+
+def cold_start(script, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', script], cwd=SRC_DIR, check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def latency(predict, X, batch_size, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for batch_start in range(0, len(X), batch_size):
+            predict(X[batch_start:batch_start + batch_size])
+    return (time.perf_counter() - start) / (repeats * len(X))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the flattened tree evaluator.")
+    parser.add_argument('--data', default=os.path.join(DATA_DIR, 'processed_data.csv'))
+    parser.add_argument('--target', default='BAMLHYH0A0HYM2TRIV')
+    parser.add_argument('--n-estimators', type=int, default=300)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    data = read_dated_csv(args.data)
+    target_col_index = data.columns.get_loc(args.target)
+    X = data.iloc[:, :target_col_index].to_numpy(dtype=np.float32)
+    y = data.iloc[:, target_col_index].to_numpy()
+    model = XGBoostRegressor(n_estimators=args.n_estimators).fit(X, y)
+    forest = model.export_flat()
+    print(f"{len(forest.roots)} trees, {len(forest.value)} nodes, depth {forest.depth}, "
+          f"max abs difference {np.abs(forest.predict(X) - model.predict(X)).max():.2e}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {name: os.path.join(tmp, name) for name in ('model.pkl', 'forest.npz', 'row.npy')}
+        with open(paths['model.pkl'], 'wb') as f:
+            pickle.dump(model, f)
+        forest.save(paths['forest.npz'])
+        np.save(paths['row.npy'], X[-1:])
+        for name, template in COLD_START.items():
+            script = template.format(model=paths['model.pkl'], forest=paths['forest.npz'], row=paths['row.npy'])
+            print(f"{'cold start, ' + name:<24} {cold_start(script, args.repeats) * 1e3:>10.1f} ms")
+
+    for batch_size in (1, 64, len(X)):
+        for name, predict in (('xgboost', model.predict), ('flat', forest.predict)):
+            per_row = latency(predict, X, batch_size, args.repeats)
+            print(f"{f'batch {batch_size}, {name}':<24} {per_row * 1e6:>10.1f} us/row")
+
+
+if __name__ == '__main__':
+    main()
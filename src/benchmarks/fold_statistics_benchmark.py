@@ -0,0 +1,58 @@
+"""
+Times fitting per-fold scalers (mean, standard deviation, minimum and maximum of every training window) by
+rescanning each window with numpy against managers.cross_validation.FoldStatistics' prefix sums, over the
+rolling-window folds of a wide daily panel.
+
+    python src/benchmarks/fold_statistics_benchmark.py --rows 20000 --features 100 --step 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from managers.cross_validation import FoldStatistics, TimeSeriesCrossValidator  # noqa: E402
+
+
+def rescan(values, bounds):
+    for train_start, train_end, _, _ in bounds:
+        window = values[train_start:train_end]
+        np.nanmean(window, axis=0), np.nanstd(window, axis=0, ddof=1)
+        np.nanmin(window, axis=0), np.nanmax(window, axis=0)
+
+
+def prefix(values, bounds):
+    stats = FoldStatistics(values)
+    for train_start, train_end, _, _ in bounds:
+        stats.mean(train_start, train_end), stats.std(train_start, train_end)
+        stats.min(train_start, train_end), stats.max(train_start, train_end)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--features', type=int, default=100)
+    parser.add_argument('--step', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(args.rows, args.features)),
+                        index=pd.date_range('1960-01-01', periods=args.rows, freq='D'))
+    data[data > 2.5] = np.nan
+    bounds = TimeSeriesCrossValidator(data).split_bounds('rolling', initial_train_size=args.rows // 10,
+                                                         step_size=args.step, test_size=args.step)
+    values = data.to_numpy()
+    print(f"{args.rows} rows x {args.features} features, {len(bounds)} rolling folds")
+    for name, func in (('rescan every window', rescan), ('prefix sums', prefix)):
+        start = time.perf_counter()
+        func(values, bounds)
+        seconds = time.perf_counter() - start
+        print(f"{name:>20}: {seconds:7.3f}s ({seconds / len(bounds) * 1000:.2f}ms per fold)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Measures the per-round overhead of the custom objectives in models.objectives against XGBoost's built-in
+objectives and against a naive Python objective that allocates new arrays every round.
+
+    python src/benchmarks/objectives_benchmark.py --rows 100000 --rounds 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.objectives import OBJECTIVES  # noqa: E402
+from models.xgb import XGBoostRegressor  # noqa: E402
+
+
+def naive_pseudo_huber(y_true, y_pred):
+    # The allocate-every-round form of old_dir/Model.py's huber_approx_obj.
+    d = y_pred - y_true
+    scale = 1 + d ** 2
+    scale_sqrt = np.sqrt(scale)
+    return d / scale_sqrt, 1 / scale / scale_sqrt
+
+
+def time_fit(X, y, rounds, repeats, **params):
+    timings = []
+    for _ in range(repeats):
+        model = XGBoostRegressor(n_estimators=rounds, max_depth=4, tree_method='hist', **params)
+        start = time.perf_counter()
+        model.fit(X, y)
+        timings.append(time.perf_counter() - start)
+    return min(timings) / rounds
+
+
+def time_gradient(objective, y_true, y_pred, repeats=200):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        objective(y_true, y_pred)
+    return (time.perf_counter() - start) / repeats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark custom XGBoost objectives.")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--features', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(args.rows, args.features)).astype(np.float32)
+    y = (X[:, 0] - 0.5 * X[:, 1] + rng.standard_t(3, size=args.rows)).astype(np.float32)
+    y_pred = np.zeros_like(y)
+
+    candidates = {
+        'reg:squarederror': {'objective': 'reg:squarederror'},
+        'reg:pseudohubererror': {'objective': 'reg:pseudohubererror'},
+        'naive pseudo_huber': {'objective': naive_pseudo_huber},
+    }
+    candidates.update({name: {'objective': name} for name in OBJECTIVES})
+
+    print(f"{args.rows} rows x {args.features} features, {args.rounds} rounds")
+    print(f"{'objective':<22} {'ms/round':>10} {'gradient ms':>12}")
+    baseline = time_fit(X, y, args.rounds, args.repeats, objective='reg:squarederror')
+    for name, params in candidates.items():
+        per_round = time_fit(X, y, args.rounds, args.repeats, **params) if name != 'reg:squarederror' else baseline
+        objective = params['objective']
+        gradient = time_gradient(OBJECTIVES[objective]() if objective in OBJECTIVES else objective, y, y_pred) \
+            if not isinstance(objective, str) or objective in OBJECTIVES else float('nan')
+        print(f"{name:<22} {per_round * 1e3:>10.2f} {gradient * 1e3:>12.3f}"
+              f"   ({(per_round - baseline) * 1e3:+.2f} ms/round vs reg:squarederror)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Times drawing many long daily series with plain matplotlib against managers.plotting's downsampled lines,
+for the first draw and for a sequence of zooms (the second pass over the same ranges is served by the cache).
+
+    python src/benchmarks/plotting_benchmark.py --series 40 --rows 23000 --method minmax
+"""
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+matplotlib.use('Agg')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+from managers.plotting import DownsampleCache, plot_series  # noqa: E402
+
+
+def make_series(n_series, n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('1962-01-01', periods=n_rows, freq='D')
+    return {f'series_{i}': pd.Series(100 + rng.normal(size=n_rows).cumsum(), index=index) for i in range(n_series)}
+
+
+def zoom_ranges(index, n_zooms):
+    # Windows of half the history, still far more days than the axes are pixels wide.
+    span = (index[-1] - index[0]) / 2
+    starts = index[np.linspace(0, len(index) // 2, n_zooms).astype(int)]
+    return [(start, start + span) for start in starts]
+
+
+def time_figure(series, zooms, downsample, method):
+    fig, ax = plt.subplots(figsize=(12, 8), dpi=100)
+    start = time.perf_counter()
+    if downsample:
+        plot_series(series, ax=ax, cache=DownsampleCache(method=method))
+    else:
+        for label, s in series.items():
+            ax.plot(s.index, s.to_numpy(), label=label)
+        ax.legend()
+        ax.grid(True)
+    fig.canvas.draw()
+    first_draw = time.perf_counter() - start
+
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        for lo, hi in zooms:
+            ax.set_xlim(lo, hi)
+            fig.canvas.draw()
+        timings.append((time.perf_counter() - start) / len(zooms))
+    points = sum(len(line.get_xdata()) for line in ax.get_lines())
+    plt.close(fig)
+    return first_draw, timings, points
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--series', type=int, default=40)
+    parser.add_argument('--rows', type=int, default=23000)
+    parser.add_argument('--zooms', type=int, default=10)
+    parser.add_argument('--method', choices=['minmax', 'lttb'], default='minmax')
+    args = parser.parse_args(argv)
+
+    series = make_series(args.series, args.rows)
+    zooms = zoom_ranges(next(iter(series.values())).index, args.zooms)
+    print(f"{args.series} series x {args.rows} rows, {args.zooms} zooms, method {args.method}")
+    for name, downsample in (('full', False), ('downsampled', True)):
+        first_draw, (cold, warm), points = time_figure(series, zooms, downsample, args.method)
+        print(f"{name:>12}: first draw {first_draw:6.3f}s  zoom {cold * 1000:7.1f}ms (cached {warm * 1000:7.1f}ms)  "
+              f"points drawn after zooming {points}")
+
+
+if __name__ == '__main__':
+    main()
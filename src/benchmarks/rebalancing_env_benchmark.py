@@ -0,0 +1,48 @@
+"""
+Measures the environment steps per second of models.rebalancing_env on the processed data, for growing
+numbers of parallel episodes and random allocations; n_envs=1 is what a per-episode Python loop gets.
+
+    python src/benchmarks/rebalancing_env_benchmark.py --n-envs 1 64 1024 4096 --seconds 2
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from managers.pipeline import DATA_DIR, read_dated_csv  # noqa: E402
+from models.rebalancing_env import RebalancingEnv  # noqa: E402
+
+
+def steps_per_second(env, seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    actions = rng.dirichlet(np.ones(env.n_assets), size=(64, env.n_envs))
+    env.reset()
+    n_steps = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        env.step(actions[n_steps % len(actions)])
+        n_steps += 1
+    return n_steps * env.n_envs / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=os.path.join(DATA_DIR, 'processed_data.csv'))
+    parser.add_argument('--n-envs', type=int, nargs='+', default=[1, 64, 1024, 4096])
+    parser.add_argument('--episode-length', type=int, default=36)
+    parser.add_argument('--seconds', type=float, default=2.0, help="Time spent stepping each batch size")
+    args = parser.parse_args(argv)
+
+    data = read_dated_csv(args.data)
+    for n_envs in args.n_envs:
+        env = RebalancingEnv.from_processed(data, n_envs=n_envs, episode_length=args.episode_length, seed=0)
+        print(f"n_envs {n_envs:>5}: {steps_per_second(env, args.seconds):12,.0f} env steps/s "
+              f"({env.observation_size} observation values, {len(env.starts)} possible episode starts)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Measures walk-forward fold throughput for increasing pool sizes, with every fold's XGBoost using all cores
+(oversubscribed) versus the share handed out by the resource manager.
+
+    python src/benchmarks/resources_benchmark.py --cores 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from managers.cross_validation import TimeSeriesCrossValidator  # noqa: E402
+from managers.pipeline import DATA_DIR, read_dated_csv  # noqa: E402
+from managers.resources import get_manager, set_cores  # noqa: E402
+from models.xgb import XGBoostRegressor  # noqa: E402
+
+
+def run_folds(X, y, bounds, n_estimators, workers, managed):
+    def fit(fold_bounds):
+        train_start, train_end, _, _ = fold_bounds
+        params = {} if managed else {'n_jobs': get_manager().cores}
+        XGBoostRegressor(n_estimators=n_estimators, **params).fit(X.iloc[train_start:train_end],
+                                                                  y.iloc[train_start:train_end])
+
+    start = time.perf_counter()
+    if managed:
+        with get_manager().thread_pool(len(bounds), workers) as pool:
+            list(pool.map(fit, bounds))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(fit, bounds))
+    return len(bounds) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark fold throughput with and without core budgeting.")
+    parser.add_argument('--data', default=os.path.join(DATA_DIR, 'processed_data.csv'))
+    parser.add_argument('--target', default='BAMLHYH0A0HYM2TRIV')
+    parser.add_argument('--cores', type=int, default=None)
+    parser.add_argument('--n-estimators', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    manager = set_cores(args.cores)
+    data = read_dated_csv(args.data)
+    target_col_index = data.columns.get_loc(args.target)
+    X = data.iloc[:, :target_col_index]
+    y = data.iloc[:, target_col_index]
+    bounds = TimeSeriesCrossValidator(data).split_bounds('rolling', initial_train_size=120, step_size=12,
+                                                         test_size=12)
+
+    print(f"{len(bounds)} folds on {manager.cores} cores")
+    print(f"{'workers':>8} {'oversubscribed':>16} {'managed':>10}   (folds/s)")
+    workers = 1
+    while workers <= manager.cores:
+        oversubscribed = run_folds(X, y, bounds, args.n_estimators, workers, managed=False)
+        managed = run_folds(X, y, bounds, args.n_estimators, workers, managed=True)
+        print(f"{workers:>8} {oversubscribed:>16.2f} {managed:>10.2f}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Startup benchmark for the pipeline entry point.
+
+Runs ``initial_run.py`` under ``python -X importtime`` (by default a cached-data evaluation run), prints the
+slowest top-level imports and fails when the wall-clock time exceeds the budget or when a heavy dependency that
+the requested stages do not need was imported. Meant to be run in CI, e.g.:
+
+    python src/initial_run.py --until train
+    python src/benchmarks/startup_benchmark.py --budget 1.0
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINT = os.path.join(SRC_DIR, 'initial_run.py')
+
+# Dependencies that only the fetch and train stages are allowed to pull in.
+HEAVY_MODULES = ['requests', 'yfinance', 'xgboost', 'sklearn', 'scipy', 'matplotlib']
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(stderr):
+    """
+    Parse the output of ``python -X importtime``.
+
+    :param stderr: Text written to stderr by the interpreter
+    :return: List of (module, self_us, cumulative_us, depth) tuples in import order
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return entries
+
+
+def heavy_imports(entries, heavy_modules=HEAVY_MODULES):
+    """
+    :return: Sorted list of the heavy top-level packages that appear in the import log
+    """
+    imported = {module.split('.')[0] for module, _, _, _ in entries}
+    return sorted(imported.intersection(heavy_modules))
+
+
+def measure_startup(args, repeats=3):
+    """
+    Run the entry point in fresh interpreters and time it.
+
+    :param args: Command line arguments passed to initial_run.py
+    :param repeats: Number of runs; the fastest one is reported
+    :return: Tuple of (best wall-clock seconds, parsed import log of the fastest run)
+    """
+    best_time, best_entries = None, None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', ENTRY_POINT, *args],
+                                capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if result.returncode != 0:
+            raise RuntimeError(f"initial_run.py exited with {result.returncode}:\n{result.stderr[-2000:]}")
+        if best_time is None or elapsed < best_time:
+            best_time, best_entries = elapsed, parse_importtime(result.stderr)
+    return best_time, best_entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the startup cost of the pipeline entry point.")
+    parser.add_argument('--budget', type=float, default=1.0, help="Wall-clock budget in seconds (default: 1.0)")
+    parser.add_argument('--repeats', type=int, default=3, help="Number of runs, the fastest is reported")
+    parser.add_argument('--top', type=int, default=15, help="Number of top-level imports to list")
+    parser.add_argument('--allow', action='append', default=[], help="Heavy module allowed to be imported")
+    parser.add_argument('run_args', nargs=argparse.REMAINDER,
+                        help="Arguments for initial_run.py (default: --only evaluate --force evaluate)")
+    args = parser.parse_args(argv)
+
+    run_args = [arg for arg in args.run_args if arg != '--'] or ['--only', 'evaluate', '--force', 'evaluate']
+    elapsed, entries = measure_startup(run_args, repeats=args.repeats)
+
+    top_level = sorted((entry for entry in entries if entry[3] == 0), key=lambda entry: entry[2], reverse=True)
+    print(f"{'module':<40} {'self ms':>10} {'cumulative ms':>15}")
+    for module, self_us, cumulative_us, _ in top_level[:args.top]:
+        print(f"{module:<40} {self_us / 1000:>10.1f} {cumulative_us / 1000:>15.1f}")
+    total_import_ms = sum(entry[2] for entry in top_level) / 1000
+    print(f"\nTotal import time: {total_import_ms:.1f} ms, wall clock: {elapsed * 1000:.1f} ms "
+          f"(budget {args.budget * 1000:.0f} ms)")
+
+    failures = []
+    unexpected = [module for module in heavy_imports(entries) if module not in args.allow]
+    if unexpected:
+        failures.append(f"heavy modules imported: {', '.join(unexpected)}")
+    if elapsed > args.budget:
+        failures.append(f"wall clock {elapsed:.3f}s exceeds the {args.budget:.3f}s budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
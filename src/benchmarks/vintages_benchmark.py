@@ -0,0 +1,97 @@
+"""
+Measures the size of a delta-encoded revision history against storing every vintage in full, and the time of
+an as-of query per series, on a simulated monthly series revised by every release and by an annual benchmark
+revision of its whole history.
+
+    python src/benchmarks/vintages_benchmark.py --months 900 --revisions 3 --queries 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from managers.vintages import SeriesVintages, VintageStore  # noqa: E402
+
+
+def simulate(n_months, n_revisions, seed=0):
+    """
+    :return: Tuple of (SeriesVintages, number of rows of a store holding every vintage in full)
+    """
+    rng = np.random.default_rng(seed)
+    months = np.arange(np.datetime64('1950-01', 'M'), np.datetime64('1950-01', 'M') + n_months)
+    releases = months.astype('datetime64[D]') + 45
+    dates, starts, values = [], [], []
+    snapshot_rows = 0
+    for k, release in enumerate(releases):
+        revised = np.arange(max(0, k - n_revisions), k + 1)
+        if k % 12 == 11:
+            # Annual benchmark revision: the whole history changes.
+            revised = np.arange(k + 1)
+        dates.append(months[revised].astype('datetime64[D]'))
+        starts.append(np.full(len(revised), release))
+        values.append(rng.normal(size=len(revised)))
+        snapshot_rows += k + 1
+    dates, starts, values = np.concatenate(dates), np.concatenate(starts), np.concatenate(values)
+
+    # A record stays current until the next record of the same observation starts.
+    order = np.lexsort((starts, dates))
+    dates, starts, values = dates[order], starts[order], values[order]
+    ends = np.full(len(dates), np.datetime64('9999-12-31', 'D'))
+    same = dates[1:] == dates[:-1]
+    ends[:-1][same] = starts[1:][same] - 1
+    return SeriesVintages(dates, starts, ends, values), snapshot_rows
+
+
+def scan_as_of(vintages, day):
+    # Without the index: test the validity period of every record.
+    known = (vintages.realtime_start <= day) & (vintages.realtime_end >= day)
+    return vintages.dates[known], vintages.values[known]
+
+
+def time_queries(func, days):
+    start = time.perf_counter()
+    for day in days:
+        func(day)
+    return (time.perf_counter() - start) / len(days)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--months', type=int, default=900)
+    parser.add_argument('--revisions', type=int, default=3, help="Earlier months revised by every release")
+    parser.add_argument('--queries', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    vintages, snapshot_rows = simulate(args.months, args.revisions)
+    with tempfile.TemporaryDirectory() as directory:
+        VintageStore(directory).save('SERIES', vintages)
+        on_disk = os.path.getsize(os.path.join(directory, 'SERIES' + VintageStore.SUFFIX))
+        store = VintageStore(directory)
+        start = time.perf_counter()
+        vintages = store.load('SERIES')
+        load_seconds = time.perf_counter() - start
+
+    # Dates plus values, as a table of (vintage, date, value) rows would hold them.
+    snapshot_bytes = snapshot_rows * 24
+    print(f"{args.months} months, {len(vintages.vintage_dates())} vintages")
+    print(f"every vintage in full: {snapshot_rows:>9} rows {snapshot_bytes / 2 ** 20:8.2f} MiB")
+    print(f"revision records:      {len(vintages):>9} rows {vintages.nbytes / 2 ** 20:8.2f} MiB in memory, "
+          f"{on_disk / 2 ** 20:.2f} MiB on disk (loaded in {load_seconds * 1000:.1f}ms)")
+
+    rng = np.random.default_rng(1)
+    first, last = vintages.realtime_start.min().astype(np.int64), vintages.realtime_start.max().astype(np.int64)
+    days = rng.integers(first, last + 1, size=args.queries).astype('datetime64[D]')
+    scan = time_queries(lambda day: scan_as_of(vintages, day), days)
+    indexed = time_queries(vintages.known_records, days)
+    series = time_queries(vintages.as_of, days)
+    print(f"as-of query per series over the full history ({args.queries} random days): scanning every record "
+          f"{scan * 1e6:.0f}us, indexed {indexed * 1e6:.0f}us, indexed as a pandas Series {series * 1e6:.0f}us")
+
+
+if __name__ == '__main__':
+    main()
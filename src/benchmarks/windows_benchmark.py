@@ -0,0 +1,71 @@
+"""
+Compares the memory of (samples x lookback x features) inputs built with pandas shift against
+managers.windows' strided views as the lookback grows, and the throughput of the batch generator with and
+without background prefetching when the consumer takes time per batch.
+
+    python src/benchmarks/windows_benchmark.py --rows 4000 --features 50 --lookbacks 12 60 250
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from managers.windows import WindowBuilder  # noqa: E402
+
+
+def make_frame(n_rows, n_features, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.normal(size=(n_rows, n_features)).astype(np.float32),
+                        index=pd.date_range('1950-01-01', periods=n_rows, freq='D'))
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak / 2 ** 20
+
+
+def shifted(frame, lookback):
+    # The usual pandas construction: one shifted copy of the frame per lag.
+    return pd.concat([frame.shift(k) for k in range(lookback)], axis=1).dropna().to_numpy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=4000)
+    parser.add_argument('--features', type=int, default=50)
+    parser.add_argument('--lookbacks', type=int, nargs='+', default=[12, 60, 250])
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--consumer-ms', type=float, default=2.0, help="Simulated model time per batch")
+    args = parser.parse_args(argv)
+
+    frame = make_frame(args.rows, args.features)
+    print(f"{args.rows} rows x {args.features} features (float32, {frame.to_numpy().nbytes / 2 ** 20:.1f} MiB)")
+    for lookback in args.lookbacks:
+        _, shift_peak = peak_memory(lambda: shifted(frame, lookback))
+        _, view_peak = peak_memory(lambda: WindowBuilder(frame).windows(lookback))
+        print(f"lookback {lookback:>4}: pandas shift peak {shift_peak:8.1f} MiB   strided view peak {view_peak:6.1f} MiB")
+
+    builder = WindowBuilder(frame)
+    lookback = args.lookbacks[-1]
+    for prefetch in (0, 2):
+        start = time.perf_counter()
+        n_batches = 0
+        for X, _ in builder.batches(lookback, batch_size=args.batch_size, shuffle=True, seed=0, prefetch=prefetch):
+            time.sleep(args.consumer_ms / 1000)
+            n_batches += 1
+        seconds = time.perf_counter() - start
+        print(f"prefetch={prefetch}: {n_batches} batches of {X.shape[1:]} in {seconds:.2f}s "
+              f"({n_batches / seconds:.0f} batches/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+# Having a conftest.py here puts src/ on sys.path, so tests can import `managers` and `models` the same way
+# initial_run.py does.
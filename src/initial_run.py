@@ -1,81 +1,61 @@
-from managers.data_manager import FREDDataManager
-from managers.data_manager import YahooDataManager
-from managers.data_manager import DataFusion
-from managers.data_processing import DataProcessor
+import argparse
 import json
-import pandas as pd
-from managers.cross_validation import TimeSeriesCrossValidator
-from models.xgb import XGBoostRegressor
-import numpy as np
-
-
-USE_SAVED_CSV = True
-USE_SAVED_PROCESSED_CSV = True
-
-if not USE_SAVED_CSV:
-    api_key = 'b7bc70213173b5217454a063e86b72ce'
-    start_date = '1998-01-01'
-    series_ids = [value for value in json.load(open('src/managers/data/fred-tickers.json')).values() if value is not None]
-    # Pull FRED Data.
-    fred_manager = FREDDataManager(api_key)
-    fred_data = fred_manager.get_all_data(series_ids, start_date)
-    # Pull Yahoo data
-    yahoo_manager = YahooDataManager()
-    yahoo_data = yahoo_manager.get_data('SPY')
-    # Fuse the data
-    fusion = DataFusion(fred_data, yahoo_data)
-    fused_data = fusion.fuse_data()
-    fusion.save_to_csv(fused_data, 'src/managers/data/merged_data.csv')
-else:
-    # Read the CSV file, setting 'Date' as the index and parsing dates
-    fused_data = pd.read_csv('src/managers/data/merged_data.csv', index_col='Date', parse_dates=True)
-
-if not USE_SAVED_PROCESSED_CSV:
-    processor = DataProcessor(fused_data)
-    target_columns = ['BAMLHYH0A0HYM2TRIV', 'BAMLCC0A0CMTRIV', "DGS10", "DGS2", "DGS30", "DGS5", "DGS7", "DGS1", "DGS20"]
-
-    processed_data = processor.process_data(target_columns, save_csv=True, csv_filename='src/managers/data/processed_data.csv')
-    print(processed_data.describe())
-    print("Shape of the processed data: ", processed_data.shape)
-else:
-    processed_data = pd.read_csv('src/managers/data/processed_data.csv', index_col='Date', parse_dates=True)
-    print(processed_data.describe())
-    print("Shape of the processed data: ", processed_data.shape)
-
-# Perform cross-validation
-cv = TimeSeriesCrossValidator(processed_data)
-
-# For rolling window
-rolling_splits = cv.perform_cross_validation(method='rolling', initial_train_size=10, step_size=10, test_size=5)
-
-# For sliding window
-sliding_splits = cv.perform_cross_validation(method='sliding', window_size=25, step_size=10, test_size=5)
-
-# Print information about the splits
-print(f"Number of rolling window splits: {len(rolling_splits)}")
-print(f"Number of sliding window splits: {len(sliding_splits)}")
-
-# Use the XGB model and train/test using the rolling splits.
-xgb_model = XGBoostRegressor()
-target_col = "BAMLHYH0A0HYM2TRIV"
-# Find the column index of the target column
-target_col_index = processed_data.columns.get_loc(target_col)
-
-for i, (train, test) in enumerate(rolling_splits):
-    # Fit on the training data.
-    xgb_model.fit(train.iloc[:, :target_col_index], train.iloc[:, target_col_index])
-    # Predict on the test data.
-    predictions = xgb_model.predict(test.iloc[:, :target_col_index])
-    # Calculate the RMSE of the predictions.
-    rmse = np.sqrt(np.mean((test.iloc[:, target_col_index] - predictions) ** 2))
-    print(f"Rolling split {i+1} RMSE: {rmse}")
-
-for i, (train, test) in enumerate(sliding_splits):
-    # Fit on the training data.
-    xgb_model.fit(train.iloc[:, :target_col_index], train.iloc[:, target_col_index])
-    # Predict on the test data.
-    predictions = xgb_model.predict(test.iloc[:, :target_col_index])
-    # Calculate the RMSE of the predictions.
-    rmse = np.sqrt(np.mean((test.iloc[:, target_col_index] - predictions) ** 2))
-    print(f"Sliding split {i+1} RMSE: {rmse}")
-    
\ No newline at end of file
+import logging
+import os
+
+from managers.pipeline import DATA_DIR, STAGES, Pipeline
+from managers.resources import set_cores
+
+
+def parse_args(argv=None):
+    stage_names = [stage.name for stage in STAGES]
+    parser = argparse.ArgumentParser(description="Run the fetch -> fuse -> process -> split -> train -> evaluate "
+                                                 "pipeline, re-executing only the stages that are out of date.")
+    parser.add_argument('--until', choices=stage_names, help="Last stage to run (default: evaluate)")
+    parser.add_argument('--only', choices=stage_names, help="Run only this stage")
+    parser.add_argument('--force', choices=stage_names, action='append', default=[],
+                        help="Re-run this stage even if it is up to date (repeatable)")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directory holding the stage inputs and outputs")
+    parser.add_argument('--config', help="JSON file overriding the default stage configuration")
+    parser.add_argument('--api-key', default=os.environ.get('FRED_API_KEY'),
+                        help="FRED API key (default: $FRED_API_KEY)")
+    parser.add_argument('--status', action='store_true', help="Print the status of every stage and exit")
+    parser.add_argument('--cores', type=int, help="Number of cores to use (default: all available)")
+    parser.add_argument('--describe', metavar='DATASET',
+                        help="Print the summary statistics of a dataset (e.g. processed_data.csv) from its sidecar "
+                             "and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    config = None
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+    pipeline = Pipeline(STAGES, data_dir=args.data_dir, config=config, api_key=args.api_key)
+
+    if args.status:
+        for name, status in pipeline.status().items():
+            print(f"{name:<10} {status}")
+        return
+
+    if args.describe:
+        import pandas as pd
+
+        from managers.dataset_stats import write_sidecar
+
+        with pd.option_context('display.max_rows', None, 'display.width', 200):
+            print(write_sidecar(pipeline.path(args.describe)).describe())
+        return
+
+    if args.cores:
+        set_cores(args.cores)
+    executed = pipeline.run(until=args.until, only=args.only, force=args.force)
+    logging.info(f"Executed stages: {executed if executed else 'none, everything is up to date'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_MEMORY_BUDGET = 256 * 2 ** 20
+# pandas operations on a block (reindex, resample, pct_change, ...) hold a few copies of it at once.
+WORKING_COPIES = 4
+
+
+def block_width(n_rows, memory_budget=DEFAULT_MEMORY_BUDGET, itemsize=8):
+    """
+    :return: Number of columns of n_rows values that can be processed at once within memory_budget bytes
+    """
+    return max(1, int(memory_budget // (max(n_rows, 1) * itemsize * WORKING_COPIES)))
+
+
+class ColumnStore:
+    """
+    On-disk, column-blocked store of a date-indexed frame. Every block is a 2-D .npy file of one dtype holding
+    a group of columns for all rows, so a block can be read (or memory-mapped) on its own and wide universes are
+    processed a few columns at a time. The date index is stored once in index.npy and the block layout in
+    meta.json.
+
+    :param directory: Directory of an existing store
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self._index = None
+
+    @classmethod
+    def create(cls, directory, index):
+        """
+        Create an empty store (replacing any store already in directory) for the given date index.
+        """
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        os.makedirs(directory)
+        index = pd.DatetimeIndex(index)
+        np.save(os.path.join(directory, 'index.npy'), index.values.astype('datetime64[ns]'))
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({'index_name': index.name, 'blocks': []}, f)
+        return cls(directory)
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = pd.DatetimeIndex(np.load(os.path.join(self.directory, 'index.npy')),
+                                           name=self.meta['index_name'])
+        return self._index
+
+    @property
+    def columns(self):
+        return [column for block in self.meta['blocks'] for column in block['columns']]
+
+    @property
+    def shape(self):
+        return len(self.index), len(self.columns)
+
+    def _save_meta(self):
+        with open(os.path.join(self.directory, 'meta.json.tmp'), 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(os.path.join(self.directory, 'meta.json.tmp'), os.path.join(self.directory, 'meta.json'))
+
+    def append_block(self, frame):
+        """
+        Write the columns of frame as a new block. The frame must share the store's index and have one dtype.
+        """
+        if not frame.index.equals(self.index):
+            raise ValueError("Block index does not match the store index")
+        dtypes = set(frame.dtypes)
+        if len(dtypes) > 1:
+            raise ValueError(f"A block must have a single dtype, got {sorted(map(str, dtypes))}")
+        duplicated = set(frame.columns) & set(self.columns)
+        if duplicated:
+            raise ValueError(f"Columns already in the store: {sorted(duplicated)}")
+        filename = f"block_{len(self.meta['blocks']):05d}.npy"
+        np.save(os.path.join(self.directory, filename), frame.to_numpy())
+        self.meta['blocks'].append({'file': filename, 'columns': [str(c) for c in frame.columns],
+                                    'dtype': str(frame.to_numpy().dtype) if frame.shape[1] else 'float64'})
+        self._save_meta()
+
+    def _load(self, block, rows=slice(None)):
+        path = os.path.join(self.directory, block['file'])
+        # Row slices are read through a memory map so only the requested rows are touched.
+        values = np.load(path) if rows == slice(None) else np.array(np.load(path, mmap_mode='r')[rows])
+        return pd.DataFrame(values, index=self.index[rows], columns=block['columns'])
+
+    def read_columns(self, columns, rows=slice(None)):
+        """
+        Read some columns (in the given order) into a DataFrame; only the blocks holding them are touched.
+        """
+        wanted = set(columns)
+        frames = [self._load(block, rows)[[c for c in block['columns'] if c in wanted]]
+                  for block in self.meta['blocks'] if wanted.intersection(block['columns'])]
+        frame = pd.concat(frames, axis=1) if frames else pd.DataFrame(index=self.index[rows])
+        return frame[list(columns)]
+
+    def iter_frames(self, width):
+        """
+        Yield DataFrames of at most width consecutive columns, covering every column once.
+        """
+        columns = self.columns
+        for start in range(0, len(columns), width):
+            yield self.read_columns(columns[start:start + width])
+
+    def to_frame(self):
+        return self.read_columns(self.columns)
+
+    @classmethod
+    def from_frame(cls, frame, directory, memory_budget=DEFAULT_MEMORY_BUDGET):
+        store = cls.create(directory, frame.index)
+        width = block_width(len(frame), memory_budget)
+        for start in range(0, frame.shape[1], width):
+            store.append_block(frame.iloc[:, start:start + width])
+        return store
+
+    @classmethod
+    def from_csv(cls, path, directory, memory_budget=DEFAULT_MEMORY_BUDGET, index_col='Date'):
+        """
+        Convert a date-indexed CSV of numeric columns into a store in one streaming pass. Rows are read in
+        chunks sized to the memory budget and written straight into memory-mapped float64 blocks.
+        """
+        columns = [c for c in pd.read_csv(path, nrows=0).columns if c != index_col]
+        with open(path) as f:
+            n_rows = sum(1 for _ in f) - 1
+        width = block_width(n_rows, memory_budget)
+        chunk_rows = max(1, int(memory_budget // (max(len(columns), 1) * 8 * WORKING_COPIES)))
+
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        os.makedirs(directory)
+        blocks = [{'file': f"block_{i:05d}.npy", 'columns': columns[start:start + width], 'dtype': 'float64'}
+                  for i, start in enumerate(range(0, len(columns), width))]
+        # Blocks are C-ordered (rows x columns), so every row chunk is appended to the end of each block file.
+        # Plain writes keep the block files out of the resident set, unlike writing through a memory map.
+        files = [open(os.path.join(directory, block['file']), 'wb') for block in blocks]
+        index = np.empty(n_rows, dtype='datetime64[ns]')
+        position = 0
+        try:
+            for block, f in zip(blocks, files):
+                np.lib.format.write_array_header_1_0(f, {'descr': np.lib.format.dtype_to_descr(np.dtype(np.float64)),
+                                                         'fortran_order': False,
+                                                         'shape': (n_rows, len(block['columns']))})
+            for chunk in pd.read_csv(path, index_col=index_col, parse_dates=True, chunksize=chunk_rows):
+                index[position:position + len(chunk)] = chunk.index.values
+                for block, f in zip(blocks, files):
+                    f.write(np.ascontiguousarray(chunk[block['columns']].to_numpy(dtype=np.float64)).tobytes())
+                position += len(chunk)
+        finally:
+            for f in files:
+                f.close()
+        if position != n_rows:
+            raise ValueError(f"{path} has {position} data rows but {n_rows} lines; quoted newlines are not supported")
+
+        np.save(os.path.join(directory, 'index.npy'), index[:position])
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({'index_name': index_col, 'blocks': blocks}, f)
+        logging.info(f"Converted {path} into {len(blocks)} block(s) of up to {width} columns")
+        return cls(directory)
+
+    def to_csv(self, path, columns=None, memory_budget=DEFAULT_MEMORY_BUDGET):
+        """
+        Write the store to CSV in row chunks; the file is identical to DataFrame.to_csv of the whole frame.
+
+        :param columns: Column order of the file (default: store order)
+        """
+        columns = list(columns) if columns is not None else self.columns
+        chunk_rows = max(1, int(memory_budget // (max(len(columns), 1) * 8 * WORKING_COPIES)))
+        with open(path, 'w', newline='') as f:
+            for start in range(0, len(self.index), chunk_rows):
+                chunk = self.read_columns(columns, rows=slice(start, start + chunk_rows))
+                chunk.to_csv(f, header=start == 0, index=True)
+            if not len(self.index):
+                self.read_columns(columns).to_csv(f, index=True)
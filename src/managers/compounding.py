@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+
+NAN_POLICIES = ('skip', 'propagate', 'raise')
+METHODS = ('log', 'cumprod')
+ANCHORS = ('start', 'end')
+
+
+def _group_sums(codes, values, n_groups):
+    """
+    Sum every column of values within each group in a single bincount call.
+
+    :param codes: Integer group code for every row
+    :param values: 2-D array (rows x columns)
+    :param n_groups: Number of groups
+    :return: Array of shape (n_groups, columns)
+    """
+    n_cols = values.shape[1]
+    flat_codes = (codes[:, None] * n_cols + np.arange(n_cols)).ravel()
+    sums = np.bincount(flat_codes, weights=values.ravel(), minlength=n_groups * n_cols)
+    return sums.reshape(n_groups, n_cols)
+
+
+def compound_returns(returns, freq='M', method='log', nan_policy='skip', anchor='end', min_periods=1, scale=1.0):
+    """
+    Compound periodic (e.g. daily) simple returns into lower frequency returns for all columns at once.
+
+    :param returns: pandas DataFrame or Series of simple returns with a DatetimeIndex
+    :param freq: pandas period alias of the output frequency ('M', 'Q', 'W', 'Y', ...)
+    :param method: 'log' sums log1p returns per period, 'cumprod' differences a running growth index
+    :param nan_policy: 'skip' treats missing observations as a zero return, 'propagate' makes any period with
+                       a missing observation NaN and 'raise' raises a ValueError on missing data
+    :param anchor: Label each period with its first ('start', like resample('MS')) or last ('end', like
+                   resample('M')) calendar day
+    :param min_periods: Minimum number of non-missing observations for a period to get a value
+    :param scale: Units of the returns, e.g. 100 when they are quoted in percent; the output uses the same units
+    :return: pandas DataFrame (or Series) with one row per period between the first and last observation
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    if nan_policy not in NAN_POLICIES:
+        raise ValueError(f"nan_policy must be one of {NAN_POLICIES}")
+    if anchor not in ANCHORS:
+        raise ValueError(f"anchor must be one of {ANCHORS}")
+
+    is_series = isinstance(returns, pd.Series)
+    frame = returns.to_frame() if is_series else returns
+    frame = frame.sort_index() if not frame.index.is_monotonic_increasing else frame
+    if frame.empty:
+        return returns.iloc[:0]
+    values = frame.to_numpy(dtype=float) / scale
+    missing = np.isnan(values)
+    if nan_policy == 'raise' and missing.any():
+        raise ValueError("returns contain missing values")
+
+    # Period ordinals are consecutive, so they double as dense group codes that also cover empty periods.
+    ordinals = frame.index.to_period(freq).asi8
+    codes = ordinals - ordinals[0]
+    n_groups = int(codes[-1]) + 1
+    periods = pd.period_range(start=frame.index[0], periods=n_groups, freq=freq)
+
+    observed = _group_sums(codes, (~missing).astype(float), n_groups)
+    if method == 'log':
+        log_growth = np.log1p(np.where(missing, 0.0, values))
+        compounded = np.expm1(_group_sums(codes, log_growth, n_groups))
+    else:
+        growth_index = np.cumprod(np.where(missing, 1.0, 1.0 + values), axis=0)
+        # Growth index at the last row of every period, carried over empty periods.
+        last_rows = np.searchsorted(codes, np.arange(n_groups), side='right') - 1
+        period_end = growth_index[last_rows]
+        period_start = np.vstack([np.ones((1, values.shape[1])), period_end[:-1]])
+        compounded = period_end / period_start - 1.0
+
+    compounded = compounded * scale
+    compounded[observed < max(min_periods, 1)] = np.nan
+    if nan_policy == 'propagate':
+        rows_per_period = np.bincount(codes, minlength=n_groups)
+        compounded[observed < rows_per_period[:, None]] = np.nan
+
+    index = periods.to_timestamp(how=anchor).normalize()
+    index.name = frame.index.name
+    result = pd.DataFrame(compounded, index=index, columns=frame.columns)
+    return result.iloc[:, 0] if is_series else result
@@ -1,13 +1,144 @@
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import TimeSeriesSplit
 import logging
+import warnings
+
+import numpy as np
+
+
+class _RangeExtremes:
+    """
+    Column-wise minimum (or maximum) of any range of rows, ignoring NaN. Rows are grouped into blocks whose
+    extremes are kept in a sparse table, so a query combines two overlapping power-of-two runs of whole blocks
+    with at most two partial blocks at the edges: the cost is bounded by the block size, not the range length.
+    """
+
+    def __init__(self, values, reduce, block_size):
+        self.values = values
+        self.reduce = reduce
+        self.block_size = block_size
+        n_blocks = len(values) // block_size
+        level = reduce.reduce(values[:n_blocks * block_size].reshape(n_blocks, block_size, values.shape[1]), axis=1)
+        self.table = [level]
+        width = 1
+        while 2 * width <= n_blocks:
+            level = reduce(level[:-width], level[width:])
+            self.table.append(level)
+            width *= 2
+
+    def query(self, start, end):
+        first_block = -(-start // self.block_size)
+        last_block = end // self.block_size
+        if first_block >= last_block:
+            return self.reduce.reduce(self.values[start:end], axis=0)
+        level = int(np.log2(last_block - first_block))
+        result = self.reduce(self.table[level][first_block], self.table[level][last_block - (1 << level)])
+        edges = np.concatenate([self.values[start:first_block * self.block_size],
+                                self.values[last_block * self.block_size:end]])
+        return self.reduce(result, self.reduce.reduce(edges, axis=0)) if len(edges) else result
+
+
+class FoldStatistics:
+    """
+    Column statistics of any window of rows in O(1), for fitting scalers inside each training window without
+    rescanning it. Counts, sums and sums of squares are accumulated once over the whole array, so a window's
+    moments are differences of two prefix rows. The sums are taken on values shifted by the column means (and
+    clamped at zero variance), which avoids the cancellation of the textbook sum-of-squares formula. Minima and
+    maxima come from a blocked sparse table (see _RangeExtremes). Missing values (NaN) are skipped.
+
+    :param data: pandas DataFrame or 2-D array (rows x columns)
+    :param block_size: Rows per block of the min/max tables
+    """
+
+    def __init__(self, data, block_size=64):
+        self.columns = list(data.columns) if hasattr(data, 'columns') else None
+        values = np.asarray(data, dtype=np.float64)
+        observed = ~np.isnan(values)
+        with warnings.catch_warnings():
+            # Columns without any observation get a center of 0.
+            warnings.simplefilter('ignore', RuntimeWarning)
+            self.center = np.nan_to_num(np.nanmean(values, axis=0))
+        shifted = np.where(observed, values - self.center, 0.0)
+        zeros = np.zeros((1, values.shape[1]))
+        self._count = np.concatenate([zeros, np.cumsum(observed, axis=0)])
+        self._sum = np.concatenate([zeros, np.cumsum(shifted, axis=0)])
+        self._sum_sq = np.concatenate([zeros, np.cumsum(shifted ** 2, axis=0)])
+        self._min = _RangeExtremes(values, np.fmin, block_size)
+        self._max = _RangeExtremes(values, np.fmax, block_size)
+
+    def count(self, start, end):
+        """
+        :return: Number of observed values of every column in rows [start, end)
+        """
+        return self._count[end] - self._count[start]
+
+    def mean(self, start, end):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.center + (self._sum[end] - self._sum[start]) / self.count(start, end)
+
+    def var(self, start, end, ddof=1):
+        """
+        :return: Variance of every column in rows [start, end); NaN with fewer than ddof + 1 observations
+        """
+        n = self.count(start, end)
+        total = self._sum[end] - self._sum[start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            squares = np.maximum(self._sum_sq[end] - self._sum_sq[start] - total ** 2 / n, 0.0)
+            return np.where(n > ddof, squares / (n - ddof), np.nan)
+
+    def std(self, start, end, ddof=1):
+        return np.sqrt(self.var(start, end, ddof))
+
+    def min(self, start, end):
+        return self._min.query(start, end)
+
+    def max(self, start, end):
+        return self._max.query(start, end)
+
+    def winsorize_bounds(self, start, end, n_std=3.0):
+        """
+        :return: Tuple of (lower, upper) clipping bounds of every column: the window mean plus or minus n_std
+                 window standard deviations, within the window's observed range
+        """
+        mean, std = self.mean(start, end), self.std(start, end)
+        return np.fmax(mean - n_std * std, self.min(start, end)), np.fmin(mean + n_std * std, self.max(start, end))
+
+    def scaler(self, start, end, method='standard'):
+        """
+        Offset and scale fitted on rows [start, end), applied as (values - offset) / scale. Columns without
+        spread in the window get a scale of 1.
+
+        :param method: 'standard' (mean and standard deviation) or 'minmax' (minimum and range)
+        :return: Tuple of (offset, scale) arrays
+        """
+        if method == 'standard':
+            offset, scale = self.mean(start, end), self.std(start, end)
+        elif method == 'minmax':
+            offset = self.min(start, end)
+            scale = self.max(start, end) - offset
+        else:
+            raise ValueError("method must be either 'standard' or 'minmax'")
+        return offset, np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+
+    def transform(self, values, start, end, method='standard'):
+        """
+        Scale values (e.g. a fold's train or test rows) with the scaler fitted on rows [start, end).
+        """
+        offset, scale = self.scaler(start, end, method)
+        return (np.asarray(values, dtype=np.float64) - offset) / scale
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class TimeSeriesCrossValidator:
     def __init__(self, data):
         self.data = data
+        self._statistics = None
+
+    def statistics(self):
+        """
+        FoldStatistics of the data, computed on first use, to fit fold-local scaling on the bounds returned by
+        split_bounds, e.g. statistics().transform(X_test, train_start, train_end).
+        """
+        if self._statistics is None:
+            self._statistics = FoldStatistics(self.data.select_dtypes('number'))
+        return self._statistics
 
     def rolling_window_split(self, initial_train_size, step_size, test_size):
         """
@@ -57,6 +188,28 @@ class TimeSeriesCrossValidator:
 
             yield train_index, test_index
 
+    def split_bounds(self, method='rolling', **kwargs):
+        """
+        Compute the positional bounds of every split without materialising the data.
+
+        :param method: 'rolling' or 'sliding'
+        :param kwargs: Additional arguments for the specific method
+        :return: List of (train_start, train_end, test_start, test_end) integer tuples
+        """
+        if method == 'rolling':
+            split_generator = self.rolling_window_split(**kwargs)
+        elif method == 'sliding':
+            split_generator = self.sliding_window_split(**kwargs)
+        else:
+            raise ValueError("Invalid method. Choose 'rolling' or 'sliding'.")
+
+        bounds = []
+        for train_index, test_index in split_generator:
+            train_start = self.data.index.get_loc(train_index[0])
+            test_start = self.data.index.get_loc(test_index[0])
+            bounds.append((train_start, train_start + len(train_index), test_start, test_start + len(test_index)))
+        return bounds
+
     def perform_cross_validation(self, method='rolling', **kwargs):
         """
         Perform cross-validation using the specified method.
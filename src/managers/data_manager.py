@@ -1,17 +1,177 @@
 import pandas as pd
-from fredapi import Fred
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+import json
 import logging
-import yfinance as yf
+import os
+import shutil
 
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+class FetchCheckpoint:
+    """
+    Directory holding the series fetched so far by FREDDataManager.get_all_data, one pickle per series, and a
+    manifest of their earliest dates and fetch start dates. A checkpoint only holds data fetched today, so a
+    rerun on the same day resumes where the failed run stopped, while a rerun on a later day starts afresh.
+
+    :param directory: Checkpoint directory (created if missing)
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.today = datetime.now().strftime('%Y-%m-%d')
+        os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self._manifest_path()) as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+        if self.manifest.get('end_date') != self.today:
+            self.clear()
+            os.makedirs(directory)
+            self.manifest = {'end_date': self.today, 'earliest': {}, 'series': {}}
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, 'manifest.json')
+
+    def _series_path(self, series_id):
+        return os.path.join(self.directory, f'{series_id}.pkl')
+
+    def _save_manifest(self):
+        with open(self._manifest_path() + '.tmp', 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(self._manifest_path() + '.tmp', self._manifest_path())
+
+    def earliest_date(self, series_id):
+        earliest = self.manifest['earliest'].get(series_id)
+        return pd.Timestamp(earliest) if earliest is not None else None
+
+    def set_earliest_date(self, series_id, earliest):
+        self.manifest['earliest'][series_id] = pd.Timestamp(earliest).isoformat()
+        self._save_manifest()
+
+    def load(self, series_id, start_date):
+        """
+        :return: The checkpointed DataFrame of a series fetched from start_date, or None
+        """
+        if self.manifest['series'].get(series_id) != pd.Timestamp(start_date).isoformat():
+            return None
+        try:
+            return pd.read_pickle(self._series_path(series_id))
+        except (OSError, ValueError, EOFError):
+            return None
+
+    def save(self, series_id, start_date, data):
+        # The file is complete before the manifest points to it, so a crash never leaves a torn checkpoint.
+        data.to_pickle(self._series_path(series_id) + '.tmp')
+        os.replace(self._series_path(series_id) + '.tmp', self._series_path(series_id))
+        self.manifest['series'][series_id] = pd.Timestamp(start_date).isoformat()
+        self._save_manifest()
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
 
 class FREDDataManager:
-    def __init__(self, api_key):
-        self.fred = Fred(api_key=api_key)
+    API_ROOT = 'https://api.stlouisfed.org/fred'
+    # FRED only lists updates made during the last two weeks.
+    UPDATES_WINDOW = timedelta(days=13)
+
+    def __init__(self, api_key, session=None):
+        """
+        :param api_key: FRED API key
+        :param session: requests.Session to send the requests through (default: the shared pooled session)
+        """
+        self.api_key = api_key
+        self.session = session
+
+    def _get_json(self, endpoint, **params):
+        from managers.http_session import get_json
+
+        return get_json(f'{self.API_ROOT}/{endpoint}', params={'api_key': self.api_key, 'file_type': 'json', **params},
+                        session=self.session)
+
+    def get_last_updated(self, series_ids, since=None, filter_value='all'):
+        """
+        Find when the given series were last updated. When since is recent enough, FRED's series/updates listing
+        is used, which answers for every series in one request per 1000 updates; otherwise the metadata of each
+        series is requested.
+
+        :param series_ids: List of FRED series IDs
+        :param since: Only report series updated after this timezone-aware datetime (default: report all)
+        :param filter_value: 'macro', 'regional' or 'all' series, as accepted by series/updates
+        :return: Dictionary mapping series ID to its last updated timestamp, for the series updated since `since`
+        """
+        wanted = set(series_ids)
+        now = datetime.now(timezone.utc)
+        if since is None or now - since > self.UPDATES_WINDOW:
+            last_updated = {}
+            for series_id in series_ids:
+                info = self._get_json('series', series_id=series_id)['seriess'][0]
+                last_updated[series_id] = pd.Timestamp(info['last_updated'])
+            return {series_id: ts for series_id, ts in last_updated.items() if since is None or ts > since}
+
+        last_updated = {}
+        offset, limit = 0, 1000
+        while True:
+            page = self._get_json('series/updates', filter_value=filter_value, limit=limit, offset=offset,
+                                  start_time=since.strftime('%Y%m%d%H%M'), end_time=now.strftime('%Y%m%d%H%M'))
+            for series in page.get('seriess', []):
+                if series['id'] in wanted:
+                    last_updated[series['id']] = pd.Timestamp(series['last_updated'])
+            offset += limit
+            if offset >= int(page.get('count', 0)):
+                break
+        return {series_id: ts for series_id, ts in last_updated.items() if ts > since}
         
+    def get_series(self, series_id, start_date=None, end_date=None):
+        """
+        Fetch the observations of a series; FRED's missing values ('.') become NaN.
+
+        :return: pandas Series indexed by date
+        """
+        params = {'series_id': series_id}
+        if start_date is not None:
+            params['observation_start'] = pd.Timestamp(start_date).strftime('%Y-%m-%d')
+        if end_date is not None:
+            params['observation_end'] = pd.Timestamp(end_date).strftime('%Y-%m-%d')
+        observations, offset, limit = [], 0, 100000
+        while True:
+            page = self._get_json('series/observations', limit=limit, offset=offset, **params)
+            observations.extend(page.get('observations', []))
+            offset += limit
+            if offset >= int(page.get('count', 0)):
+                break
+        dates = pd.to_datetime([observation['date'] for observation in observations])
+        values = pd.to_numeric([observation['value'] for observation in observations], errors='coerce')
+        return pd.Series(values, index=dates, name=series_id, dtype=float)
+
+    def get_vintages(self, series_id, start_date=None):
+        """
+        Fetch the full revision history of a series from ALFRED: every value ever published, with the realtime
+        period during which it was the published one (see managers.vintages).
+
+        :return: pandas DataFrame with 'date', 'realtime_start', 'realtime_end' and 'value' columns (strings as
+                 returned by the API)
+        """
+        from managers.vintages import REALTIME_END, REALTIME_START
+
+        params = {'series_id': series_id, 'realtime_start': REALTIME_START, 'realtime_end': REALTIME_END}
+        if start_date is not None:
+            params['observation_start'] = pd.Timestamp(start_date).strftime('%Y-%m-%d')
+        observations, offset, limit = [], 0, 100000
+        while True:
+            page = self._get_json('series/observations', limit=limit, offset=offset, **params)
+            observations.extend(page.get('observations', []))
+            offset += limit
+            if offset >= int(page.get('count', 0)):
+                break
+        return pd.DataFrame(observations, columns=['date', 'realtime_start', 'realtime_end', 'value'])
+
+    def get_earliest_date(self, series_id):
+        """
+        :return: Date of the first observation of a series, from its metadata
+        """
+        return pd.Timestamp(self._get_json('series', series_id=series_id)['seriess'][0]['observation_start'])
+
     def get_data(self, series_id, start_date):
         """
         Fetch data for a given series from FRED API
@@ -21,72 +181,131 @@ class FREDDataManager:
         :return: pandas DataFrame with the requested data
         """
         end_date = datetime.now().strftime('%Y-%m-%d')
-        data = self.fred.get_series(series_id, observation_start=start_date, observation_end=end_date)
+        data = self.get_series(series_id, start_date=start_date, end_date=end_date)
         df = pd.DataFrame(data, columns=[series_id])
         df.index.name = 'Date'
         return df
     
-    def get_all_data(self, series_ids, start_date):
+    def get_all_data(self, series_ids, start_date, csv_filename='src/managers/data/fred_data.csv',
+                     checkpoint_dir=None, allow_partial=False):
         """
-        Fetch data for multiple series from FRED API and merge them
-        
+        Fetch data for multiple series from FRED API and merge them. Every series is checkpointed to disk as soon
+        as it arrives, so when some series fail, rerunning the same day only fetches the missing ones. The
+        outcome of the run is logged and kept in self.summary.
+
         :param series_ids: List of FRED series IDs
         :param start_date: Start date for data retrieval (format: 'YYYY-MM-DD')
-        :param save_csv: Flag to save the data as a CSV file
-        :param csv_filename: Name of the CSV file to save (default: 'fred_data.csv')
+        :param csv_filename: Name of the CSV file to save (default: 'src/managers/data/fred_data.csv')
+        :param checkpoint_dir: Checkpoint directory (default: <csv_filename without extension>_checkpoint)
+        :param allow_partial: Write the series that succeeded instead of raising when some series failed
         :return: pandas DataFrame with all requested data merged
         """
+        checkpoint = FetchCheckpoint(checkpoint_dir or os.path.splitext(csv_filename)[0] + '_checkpoint')
+        self.summary = {'fetched': [], 'resumed': [], 'failed': {}}
 
         logging.info("Checking the earliest dates for each series...")
         earliest_dates = {}
         for series_id in series_ids:
+            earliest_dates[series_id] = checkpoint.earliest_date(series_id)
+            if earliest_dates[series_id] is not None:
+                continue
             try:    
-                data = self.fred.get_series(series_id)
-                earliest_dates[series_id] = data.index[0]
+                earliest_dates[series_id] = self.get_earliest_date(series_id)
+                checkpoint.set_earliest_date(series_id, earliest_dates[series_id])
             except Exception as e:
                 logging.error(f"Error fetching data for {series_id}: {e}")
-                earliest_dates[series_id] = None
-    
-        # Find the maximum earliest date and the ticker associated.
-        max_earliest_date = max(max(earliest_dates.values()), datetime.strptime(start_date, '%Y-%m-%d').date())
+                self.summary['failed'][series_id] = str(e)
+                del earliest_dates[series_id]
+        if not earliest_dates:
+            raise RuntimeError("Could not reach FRED for any series")
+
+        # Find the maximum earliest date and the ticker associated, among the series that answered.
         ticker_earliest_date = max(earliest_dates, key=earliest_dates.get)
-        logging.info(f"Earliest date is {max_earliest_date} for {ticker_earliest_date}")
+        max_earliest_date = max(earliest_dates[ticker_earliest_date], pd.Timestamp(start_date))
+        logging.info(f"Earliest date is {max_earliest_date.date()} for {ticker_earliest_date}")
 
         logging.info("Loading data from FRED...")
         dfs = []
-        for series_id in series_ids:
-            df = self.get_data(series_id, max_earliest_date)
+        for series_id in earliest_dates:
+            df = checkpoint.load(series_id, max_earliest_date)
+            if df is not None:
+                self.summary['resumed'].append(series_id)
+            else:
+                try:
+                    df = self.get_data(series_id, max_earliest_date)
+                except Exception as e:
+                    logging.error(f"Error fetching data for {series_id}: {e}")
+                    self.summary['failed'][series_id] = str(e)
+                    continue
+                checkpoint.save(series_id, max_earliest_date, df)
+                self.summary['fetched'].append(series_id)
             dfs.append(df)
-        
+
+        failed = self.summary['failed']
+        logging.info(f"FRED ingestion: {len(self.summary['fetched'])} fetched, {len(self.summary['resumed'])} resumed "
+                     f"from checkpoint, {len(failed)} failed" + (f" ({', '.join(failed)})" if failed else ""))
+        if failed and not allow_partial:
+            raise RuntimeError(f"{len(failed)} of {len(series_ids)} FRED series failed ({', '.join(failed)}); "
+                               f"rerun to fetch only those, the others are checkpointed in {checkpoint.directory}")
+
         merged_df = pd.concat(dfs, axis=1)
         logging.info("FRED data loaded")
 
-        merged_df.to_csv("src/managers/data/fred_data.csv", index=True)
+        merged_df.to_csv(csv_filename, index=True)
+        if not failed:
+            checkpoint.clear()
 
         return merged_df
 
 
 class YahooDataManager:
-    def __init__(self):
-        pass
+    def __init__(self, session=None):
+        """
+        :param session: requests.Session to send the requests through (default: the shared pooled session)
+        """
+        self.session = session
+
+    def _session(self):
+        from managers.http_session import get_session
 
-    def get_data(self, ticker):
+        return self.session or get_session()
+
+    def get_data(self, ticker, csv_filename='src/managers/data/yahoo_data.csv'):
         """
         Fetch data for a given ticker from Yahoo Finance API
         
         :param ticker: Yahoo Finance ticker symbol
-        :param start_date: Start date for data retrieval (format: 'YYYY-MM-DD')
+        :param csv_filename: Name of the CSV file to save (default: 'src/managers/data/yahoo_data.csv')
         :return: pandas DataFrame with the requested data
         """
-        data = yf.download(ticker, period='max', interval='1d')
+        import yfinance as yf
+
+        data = yf.download(ticker, period='max', interval='1d', session=self._session())
         data.index.name = 'Date'
         close_data = data["Close"].to_frame()
         # rename the column to the ticker symbol
         close_data.columns = [ticker]
-        close_data.to_csv("src/managers/data/yahoo_data.csv", index=True)
+        close_data.to_csv(csv_filename, index=True)
         return close_data
     
 
+    def get_latest_dates(self, tickers):
+        """
+        Find the date of the latest close of each ticker with a single request for the whole batch.
+
+        :param tickers: List of Yahoo Finance ticker symbols
+        :return: Dictionary mapping ticker to the date of its latest available close
+        """
+        import yfinance as yf
+
+        data = yf.download(list(tickers), period='5d', interval='1d', progress=False, group_by='column',
+                           session=self._session())
+        close = data["Close"]
+        if isinstance(close, pd.Series):
+            close = close.to_frame(tickers[0])
+        return {ticker: close[ticker].last_valid_index() for ticker in tickers if ticker in close}
+
+
 class DataFusion:
     def __init__(self, fred_data, yahoo_data):
         self.fred_data = fred_data
@@ -109,6 +328,33 @@ class DataFusion:
 
         # Then, fuse the data.
         return pd.concat([self.fred_data, self.yahoo_data], axis=1)
+
+    def fuse_to_store(self, directory, memory_budget=None):
+        """
+        Out-of-core version of fuse_data for universes too wide to hold in memory: fred_data and yahoo_data are
+        ColumnStores, and the fused columns are reindexed and written a block at a time to a new ColumnStore.
+        The result holds the same values as fuse_data.
+
+        :param directory: Directory of the fused store
+        :param memory_budget: Bytes available for one block (default: column_store.DEFAULT_MEMORY_BUDGET)
+        :return: ColumnStore with the fused data
+        """
+        from managers.column_store import DEFAULT_MEMORY_BUDGET, ColumnStore, block_width
+
+        fred_index, yahoo_index = self.fred_data.index, self.yahoo_data.index
+        common_start_date = max(fred_index.min(), yahoo_index.min())
+        common_end_date = min(fred_index.max(), yahoo_index.max())
+        date_range = pd.date_range(start=common_start_date, end=common_end_date, name=fred_index.name)
+
+        fused = ColumnStore.create(directory, date_range)
+        # The widest source index bounds the size of a block before it is reindexed.
+        width = block_width(max(len(fred_index), len(yahoo_index), len(date_range)),
+                            memory_budget or DEFAULT_MEMORY_BUDGET)
+        for source in (self.fred_data, self.yahoo_data):
+            for block in source.iter_frames(width):
+                fused.append_block(block.reindex(date_range))
+        logging.info(f"Fused {fused.shape[1]} columns into {len(fused.meta['blocks'])} block(s)")
+        return fused
     
     def save_to_csv(self, data, filename):
         """
@@ -2,17 +2,27 @@ import pandas as pd
 import numpy as np
 import logging
 
+from managers.compounding import compound_returns
+
 
 class DataProcessor:
     def __init__(self, data):
         self.data = data
 
-    def transform_to_eom(self):
+    def transform_to_eom(self, compound_columns=None, **compound_kwargs):
         """
         Transform all data to End of Month (EOM).
+
+        :param compound_columns: Columns holding daily returns that are compounded over the month instead of
+                                 taking the last value
+        :param compound_kwargs: Additional arguments passed to compound_returns (method, nan_policy, scale, ...)
         """
-        self.data = self.data.resample('M').last()
-        self.data.index = self.data.index + pd.offsets.MonthEnd(0)
+        eom_data = self.data.resample('M').last()
+        eom_data.index = eom_data.index + pd.offsets.MonthEnd(0)
+        if compound_columns:
+            compounded = compound_returns(self.data[compound_columns], freq='M', anchor='end', **compound_kwargs)
+            eom_data[compound_columns] = compounded.reindex(eom_data.index)
+        self.data = eom_data
         logging.info("Data transformed to End of Month")
 
     def calculate_returns(self, target_columns):
@@ -47,16 +57,17 @@ class DataProcessor:
         
         logging.info("Generated direction indicators for return columns")
 
-    def process_data(self, target_columns, save_csv=False, csv_filename='processed_data.csv'):
+    def process_data(self, target_columns, save_csv=False, csv_filename='processed_data.csv', compound_columns=None):
         """
         Main method to process the data.
         
         :param target_columns: List of column names to calculate returns for
         :param save_csv: Flag to save the processed data as a CSV file
         :param csv_filename: Name of the CSV file to save (default: 'processed_data.csv')
+        :param compound_columns: Daily return columns to compound into monthly returns (default: None)
         :return: Processed DataFrame
         """
-        self.transform_to_eom()
+        self.transform_to_eom(compound_columns)
         self.calculate_returns(target_columns)
         self.generate_direction_indicators(target_columns)
         if save_csv:
@@ -64,6 +75,62 @@ class DataProcessor:
         
         return self.data
 
+    def process_store(self, target_columns, directory, csv_filename=None, compound_columns=None,
+                      memory_budget=None):
+        """
+        Out-of-core version of process_data for universes too wide to hold in memory. self.data is a
+        ColumnStore; its columns are processed in blocks sized to the memory budget, and every block's end of
+        month values, returns and direction indicators are written to a new ColumnStore as soon as the block is
+        done. The store holds the same columns as process_data's result and the CSV is identical to its CSV.
+
+        :param target_columns: List of column names to calculate returns for
+        :param directory: Directory of the processed store
+        :param csv_filename: If given, also write the processed data to this CSV file
+        :param compound_columns: Daily return columns to compound into monthly returns (default: None)
+        :param memory_budget: Bytes available for one block (default: column_store.DEFAULT_MEMORY_BUDGET)
+        :return: ColumnStore with the processed data
+        """
+        from managers.column_store import DEFAULT_MEMORY_BUDGET, ColumnStore, block_width
+
+        store = self.data
+        if not store.columns:
+            raise ValueError(f"The store in {store.directory} has no columns to process")
+        # process_data fails on a misspelt compound column too; the result must not depend on the budget.
+        missing = [col for col in compound_columns or [] if col not in store.columns]
+        if missing:
+            raise KeyError(f"{missing} not in index")
+        memory_budget = memory_budget or DEFAULT_MEMORY_BUDGET
+        processed = None
+        found_targets = []
+        for block in store.iter_frames(block_width(len(store.index), memory_budget)):
+            processor = DataProcessor(block)
+            processor.transform_to_eom([c for c in compound_columns or [] if c in block.columns])
+            block_targets = [col for col in target_columns if col in block.columns]
+            processor.calculate_returns(block_targets)
+            processor.generate_direction_indicators(block_targets)
+            found_targets += block_targets
+
+            if processed is None:
+                processed = ColumnStore.create(directory, processor.data.index)
+            # Base columns, returns and direction indicators go to separate blocks because their dtypes differ.
+            derived = [f'{col}_{period}_return' for col in block_targets for period in ['1_mo', '3_mo', '6_mo']]
+            directions = [f'{col}_direction' for col in derived]
+            for columns in (list(block.columns), derived, directions):
+                if columns:
+                    processed.append_block(processor.data[columns])
+
+        for col in target_columns:
+            if col not in found_targets:
+                logging.warning(f"Column {col} not found in the data. Skipping return calculation for this column.")
+        # Same column order as process_data: the data, then every return, then every direction indicator.
+        targets = [col for col in target_columns if col in found_targets]
+        returns = [f'{col}_{period}_return' for col in targets for period in ['1_mo', '3_mo', '6_mo']]
+        order = store.columns + returns + [f'{col}_direction' for col in returns]
+        if csv_filename:
+            processed.to_csv(csv_filename, columns=order, memory_budget=memory_budget)
+            logging.info(f"Processed data saved to {csv_filename}")
+        return processed
+
     def save_to_csv(self, filename):
         """
         Save the processed data to a CSV file
@@ -0,0 +1,305 @@
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+
+# Relative accuracy of the quantile sketches: every quantile is within 1% of a value of the column.
+SKETCH_ACCURACY = 0.01
+# Magnitudes below this fall in the sketch's zero bucket.
+SKETCH_MIN_VALUE = 1e-12
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+# Shifts the log buckets of SKETCH_MIN_VALUE .. 1e300 above zero so that a signed key orders like its value.
+_KEY_OFFSET = 1 - int(np.floor(np.log(SKETCH_MIN_VALUE) / np.log(_GAMMA)))
+SIDECAR_SUFFIX = '.stats.json'
+PREFIX_HASH_CHUNK = 1 << 20
+
+
+def sidecar_path(path):
+    """
+    :return: Path of the statistics sidecar of a dataset, e.g. processed_data.stats.json for processed_data.csv
+    """
+    return os.path.splitext(path)[0] + SIDECAR_SUFFIX
+
+
+def _sketch_keys(values):
+    # Logarithmic buckets in the style of DDSketch: a value v > 0 falls in bucket ceil(log_gamma(v)).
+    magnitude = np.abs(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bucket = np.ceil(np.log(np.maximum(magnitude, SKETCH_MIN_VALUE)) / np.log(_GAMMA))
+    keys = np.sign(values) * (bucket + _KEY_OFFSET)
+    return np.where(magnitude < SKETCH_MIN_VALUE, 0, keys)
+
+
+def _key_value(key):
+    bucket = np.abs(key) - _KEY_OFFSET
+    return np.where(key == 0, 0.0, np.sign(key) * 2 * _GAMMA ** bucket / (_GAMMA + 1))
+
+
+def _label(value):
+    return str(value.date()) if hasattr(value, 'date') else int(value)
+
+
+def _prefix_hash(path, n_bytes):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        remaining = n_bytes
+        while remaining > 0:
+            chunk = f.read(min(PREFIX_HASH_CHUNK, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+class DatasetStats:
+    """
+    Per-column statistics of a date-indexed dataset: counts, missing values, min/max, the first four central
+    moments, first/last valid dates and a logarithmic quantile sketch of every column. Statistics of two row
+    ranges merge exactly (moments with Chan/Pebay's pairwise formulas, sketches by adding bucket counts), so
+    appending rows only costs a pass over the new rows.
+
+    :param columns: Column names
+    """
+
+    MOMENTS = ('count', 'mean', 'm2', 'm3', 'm4', 'min', 'max')
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        n_columns = len(self.columns)
+        self.n_rows = 0
+        self.count = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.m3 = np.zeros(n_columns)
+        self.m4 = np.zeros(n_columns)
+        self.min = np.full(n_columns, np.nan)
+        self.max = np.full(n_columns, np.nan)
+        self.first_valid = [None] * n_columns
+        self.last_valid = [None] * n_columns
+        self.sketches = [{} for _ in range(n_columns)]
+        self.source = None
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Statistics of a DataFrame; non-numeric columns only get counts and first/last valid dates.
+        """
+        stats = cls(frame.columns)
+        stats.n_rows = len(frame)
+        numeric = np.array([dtype.kind in 'biuf' for dtype in frame.dtypes], dtype=bool)
+        values = np.full(frame.shape, np.nan)
+        if numeric.any():
+            values[:, numeric] = frame.loc[:, numeric].to_numpy(dtype=float)
+        # Infinite values are counted as observed but kept out of the moments and sketches.
+        values[np.isinf(values)] = np.nan
+        observed = frame.notna().to_numpy()
+        stats.count = observed.sum(axis=0).astype(float)
+
+        valid = ~np.isnan(values)
+        n = valid.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, np.where(valid, values, 0).sum(axis=0) / np.maximum(n, 1), 0.0)
+            deviation = np.where(valid, values - mean, 0)
+        stats.mean = mean
+        stats.m2 = (deviation ** 2).sum(axis=0)
+        stats.m3 = (deviation ** 3).sum(axis=0)
+        stats.m4 = (deviation ** 4).sum(axis=0)
+        has_values = n > 0
+        stats.min[has_values] = np.nanmin(values[:, has_values], axis=0)
+        stats.max[has_values] = np.nanmax(values[:, has_values], axis=0)
+
+        index = frame.index
+        any_observed = observed.any(axis=0)
+        first = observed.argmax(axis=0)
+        last = len(frame) - 1 - observed[::-1].argmax(axis=0)
+        for column in np.flatnonzero(any_observed):
+            stats.first_valid[column] = _label(index[first[column]])
+            stats.last_valid[column] = _label(index[last[column]])
+
+        keys = _sketch_keys(values)
+        for column in np.flatnonzero(has_values & numeric):
+            column_keys, counts = np.unique(keys[valid[:, column], column], return_counts=True)
+            stats.sketches[column] = dict(zip(column_keys.astype(int).tolist(), counts.tolist()))
+        return stats
+
+    @classmethod
+    def from_csv(cls, path, chunksize=50_000, skiprows=None, index_col='Date'):
+        """
+        Statistics of a dated CSV, read and merged a chunk of rows at a time.
+
+        :param skiprows: Number of data rows (after the header) to skip
+        """
+        import pandas as pd
+
+        header = list(pd.read_csv(path, nrows=0).columns)
+        if index_col not in header:
+            # Tables without a date column (e.g. metrics.csv) are summarised by row number.
+            index_col = None
+        rows = range(1, skiprows + 1) if skiprows else None
+        stats = None
+        for chunk in pd.read_csv(path, index_col=index_col, parse_dates=index_col is not None, chunksize=chunksize,
+                                 skiprows=rows):
+            if index_col is None and skiprows:
+                chunk.index = chunk.index + skiprows
+            chunk_stats = cls.from_frame(chunk)
+            stats = chunk_stats if stats is None else stats.merge(chunk_stats)
+        if stats is None:
+            stats = cls([c for c in header if c != index_col])
+        return stats
+
+    def merge(self, other):
+        """
+        :return: New statistics of the rows of self followed by the rows of other (same columns)
+        """
+        if other.columns != self.columns:
+            raise ValueError("Only statistics of the same columns can be merged")
+        merged = DatasetStats(self.columns)
+        merged.n_rows = self.n_rows + other.n_rows
+        merged.count = self.count + other.count
+        na, nb = self._numeric_count(), other._numeric_count()
+        n = na + nb
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = other.mean - self.mean
+            safe_n = np.maximum(n, 1)
+            merged.mean = np.where(n > 0, self.mean + delta * nb / safe_n, 0.0)
+            merged.m2 = self.m2 + other.m2 + delta ** 2 * na * nb / safe_n
+            merged.m3 = (self.m3 + other.m3 + delta ** 3 * na * nb * (na - nb) / safe_n ** 2
+                         + 3 * delta * (na * other.m2 - nb * self.m2) / safe_n)
+            merged.m4 = (self.m4 + other.m4 + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / safe_n ** 3
+                         + 6 * delta ** 2 * (na ** 2 * other.m2 + nb ** 2 * self.m2) / safe_n ** 2
+                         + 4 * delta * (na * other.m3 - nb * self.m3) / safe_n)
+        merged.min = np.fmin(self.min, other.min)
+        merged.max = np.fmax(self.max, other.max)
+        merged.first_valid = [min((v for v in pair if v is not None), default=None)
+                              for pair in zip(self.first_valid, other.first_valid)]
+        merged.last_valid = [max((v for v in pair if v is not None), default=None)
+                             for pair in zip(self.last_valid, other.last_valid)]
+        for column, (a, b) in enumerate(zip(self.sketches, other.sketches)):
+            sketch = dict(a)
+            for key, value in b.items():
+                sketch[key] = sketch.get(key, 0) + value
+            merged.sketches[column] = sketch
+        return merged
+
+    def _numeric_count(self):
+        return np.array([sum(sketch.values()) for sketch in self.sketches], dtype=float)
+
+    def quantiles(self, q):
+        """
+        :param q: Quantile level(s) in [0, 1]
+        :return: Array (columns x levels) of approximate quantiles: within SKETCH_ACCURACY relative error of the
+                 value at rank floor(q * (count - 1)), i.e. numpy's method='lower'
+        """
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        result = np.full((len(self.columns), len(q)), np.nan)
+        for column, sketch in enumerate(self.sketches):
+            if not sketch:
+                continue
+            keys = np.array(sorted(sketch))
+            cumulative = np.cumsum([sketch[key] for key in keys])
+            ranks = q * (cumulative[-1] - 1)
+            values = _key_value(keys[np.searchsorted(cumulative, ranks, side='right')])
+            result[column] = np.clip(values, self.min[column], self.max[column])
+        return result
+
+    def describe(self):
+        """
+        Summary comparable to DataFrame.describe() (transposed), plus missing values, skewness, excess kurtosis
+        and first/last valid dates, computed from the statistics alone.
+
+        :return: pandas DataFrame with one row per column
+        """
+        import pandas as pd
+
+        n = self._numeric_count()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.where(n > 1, np.sqrt(self.m2 / (n - 1)), np.nan)
+            # Bias-adjusted like pandas' skew() and kurt().
+            g1 = np.sqrt(n) * self.m3 / self.m2 ** 1.5
+            g2 = n * self.m4 / self.m2 ** 2 - 3
+            skew = np.where(n > 2, g1 * np.sqrt(n * (n - 1)) / (n - 2), np.nan)
+            kurtosis = np.where(n > 3, ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3)), np.nan)
+        quartiles = self.quantiles([0.25, 0.5, 0.75])
+        return pd.DataFrame({
+            'count': self.count.astype(int), 'missing': (self.n_rows - self.count).astype(int),
+            'missing_fraction': (self.n_rows - self.count) / max(self.n_rows, 1),
+            'mean': np.where(n > 0, self.mean, np.nan), 'std': std, 'min': self.min, '25%': quartiles[:, 0],
+            '50%': quartiles[:, 1], '75%': quartiles[:, 2], 'max': self.max, 'skew': skew, 'kurtosis': kurtosis,
+            'first_valid': self.first_valid, 'last_valid': self.last_valid,
+        }, index=pd.Index(self.columns, name='column'))
+
+    def to_dict(self):
+        data = {'columns': self.columns, 'n_rows': self.n_rows, 'first_valid': self.first_valid,
+                'last_valid': self.last_valid, 'source': self.source,
+                'sketch': {'accuracy': SKETCH_ACCURACY, 'min_value': SKETCH_MIN_VALUE,
+                           'keys': [list(sketch) for sketch in self.sketches],
+                           'counts': [list(sketch.values()) for sketch in self.sketches]}}
+        for name in self.MOMENTS:
+            # JSON has no NaN; columns without values are stored as null.
+            data[name] = [None if np.isnan(value) else float(value) for value in getattr(self, name)]
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data['columns'])
+        stats.n_rows = data['n_rows']
+        for name in cls.MOMENTS:
+            setattr(stats, name, np.array([np.nan if value is None else value for value in data[name]], dtype=float))
+        stats.first_valid = list(data['first_valid'])
+        stats.last_valid = list(data['last_valid'])
+        stats.sketches = [dict(zip(keys, counts)) for keys, counts in zip(data['sketch']['keys'],
+                                                                         data['sketch']['counts'])]
+        stats.source = data.get('source')
+        return stats
+
+    def save(self, path):
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def write_sidecar(path, index_col='Date'):
+    """
+    Write (or bring up to date) the statistics sidecar of a dated CSV. When the existing sidecar describes a
+    prefix of the file, i.e. rows were only appended since, just the new rows are read and merged in;
+    otherwise the whole file is summarised in chunks.
+
+    :param path: Path of the CSV file
+    :return: DatasetStats of the file
+    """
+    stats_path = sidecar_path(path)
+    size = os.path.getsize(path)
+    previous = None
+    if os.path.exists(stats_path):
+        try:
+            previous = DatasetStats.load(stats_path)
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable statistics sidecar {stats_path}: {e}")
+    source = previous.source if previous is not None else None
+    if source and source['bytes'] <= size and _prefix_hash(path, source['bytes']) == source['prefix_sha256']:
+        if source['bytes'] == size:
+            return previous
+        appended = DatasetStats.from_csv(path, skiprows=previous.n_rows, index_col=index_col)
+        stats = previous.merge(appended)
+        logging.info(f"Merged statistics of {appended.n_rows} appended rows into {stats_path}")
+    else:
+        stats = DatasetStats.from_csv(path, index_col=index_col)
+    stats.source = {'bytes': size, 'prefix_sha256': _prefix_hash(path, size)}
+    stats.save(stats_path)
+    return stats
+
+
+def read_stats(path):
+    """
+    :return: DatasetStats from the sidecar of a dataset
+    """
+    return DatasetStats.load(sidecar_path(path))
@@ -0,0 +1,202 @@
+import hashlib
+import logging
+import os
+import pickle
+
+import pandas as pd
+
+
+# Columns of the UST Daily Data.xlsx sheets that hold no usable data for the models.
+UST_DROP_COLUMNS = ['Return Type', 'MTD Paydown Return', 'MTD Currency Return', 'Currency', 'Current Yield',
+                    'Average Life', 'Blended Treasury Spread', 'Stripped Yield', 'Stripped Treasury Spread',
+                    'Stripped Sovereign Duration', 'Stripped Spread Duration', 'Stripped Treasury Duration',
+                    'Duration (Mod. to Worst)', 'Time to Worst', 'Excess Return']
+
+UST_SHEETS = ['UST', 'UST1-3', 'UST3-5', 'UST1-5', 'UST5-7', 'UST7-10', 'UST10-20', 'UST 20+', 'UST Int',
+              'UST Long']
+
+
+def parse_workbook(path, sheets, read_kwargs=None):
+    """
+    Parse several sheets of a workbook in a single pass, opening and reading the file only once.
+
+    :param path: Path to the Excel workbook
+    :param sheets: List of sheet names to read
+    :param read_kwargs: Additional keyword arguments passed to pandas.read_excel (e.g. skiprows)
+    :return: Dictionary mapping sheet name to pandas DataFrame
+    """
+    return pd.read_excel(path, sheet_name=list(sheets), **(read_kwargs or {}))
+
+
+class WorkbookCache:
+    """
+    Binary cache of parsed workbooks. An entry is reused only while the workbook's modification time and size
+    are unchanged, so editing the workbook transparently invalidates it.
+
+    :param cache_dir: Directory the pickled entries are written to
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _entry_path(self, path, sheets, read_kwargs):
+        key = repr((os.path.abspath(path), list(sheets), sorted((read_kwargs or {}).items())))
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(path))[0].replace(' ', '_')
+        return os.path.join(self.cache_dir, f'{stem}-{digest}.pkl')
+
+    @staticmethod
+    def _signature(path):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path, sheets, read_kwargs=None):
+        """
+        :return: Dictionary of cached DataFrames, or None if there is no valid entry
+        """
+        entry_path = self._entry_path(path, sheets, read_kwargs)
+        if not os.path.exists(entry_path):
+            return None
+        try:
+            with open(entry_path, 'rb') as f:
+                entry = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError) as e:
+            logging.warning(f"Ignoring unreadable cache entry {entry_path}: {e}")
+            return None
+        if entry['signature'] != self._signature(path):
+            return None
+        return entry['frames']
+
+    def put(self, path, sheets, frames, read_kwargs=None):
+        """
+        Store the parsed sheets of a workbook, replacing any previous entry.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self._entry_path(path, sheets, read_kwargs)
+        tmp_path = f'{entry_path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'signature': self._signature(path), 'frames': frames}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry_path)
+
+
+class ExcelDataLoader:
+    """
+    Loads the macro, return and treasury datasets used by the legacy models (see old_dir/modelData - v2.py).
+    Every workbook is parsed once for all of its sheets, independent workbooks are parsed in parallel worker
+    processes and the parsed frames are cached on disk so repeated runs skip Excel parsing entirely.
+
+    Attributes:
+
+         | **macro_var_data** DataFrame read from macro_path & macro_path_sht
+         | **HY_excess_return_data** DataFrame read from ret_path & hy_ret_path_sht
+         | **IG_excess_return_data** DataFrame read from ret_path & ig_ret_path_sht
+         | **vix_data** DataFrame read from vix_path
+         | **cape_data** DataFrame read from cape_path
+         | **fred_data** DataFrame read from fred_path & fred_path_sht
+         | **treasury_data** dictionary mapping each sheet of treasury_path_sht_list to its DataFrame
+    """
+
+    def __init__(self, macro_path, macro_path_sht, ret_path, hy_ret_path_sht, ig_ret_path_sht, vix_path,
+                 cape_path, fred_path, fred_path_sht, treasury_path=None, treasury_path_sht_list=None,
+                 cache_dir=None, max_workers=None):
+        self.macro_path = macro_path
+        self.macro_path_sht = macro_path_sht
+        self.ret_path = ret_path
+        self.HY_ret_path_sht = hy_ret_path_sht
+        self.IG_ret_path_sht = ig_ret_path_sht
+        self.vix_path = vix_path
+        self.cape_path = cape_path
+        self.fred_path = fred_path
+        self.fred_path_sht = fred_path_sht
+        self.treasury_path = treasury_path
+        self.treasury_path_sht_list = treasury_path_sht_list if treasury_path_sht_list is not None else UST_SHEETS
+        self.cache = WorkbookCache(cache_dir) if cache_dir is not None else None
+        self.max_workers = max_workers
+
+        self.macro_var_data = None
+        self.HY_excess_return_data = None
+        self.IG_excess_return_data = None
+        self.vix_data = None
+        self.cape_data = None
+        self.fred_data = None
+        self.treasury_data = {}
+
+    def _workbook_requests(self):
+        """
+        Group the sheets to read by workbook so each file is opened once.
+
+        :return: List of (path, sheets, read_kwargs) tuples
+        """
+        requests = {}
+        for path, sheet in [(self.macro_path, self.macro_path_sht), (self.ret_path, self.HY_ret_path_sht),
+                            (self.ret_path, self.IG_ret_path_sht), (self.fred_path, self.fred_path_sht)]:
+            sheets = requests.setdefault(path, [])
+            if sheet not in sheets:
+                sheets.append(sheet)
+        workbooks = [(path, sheets, {}) for path, sheets in requests.items()]
+        if self.treasury_path is not None:
+            # The treasury sheets carry 8 rows of report header above the column titles.
+            workbooks.append((self.treasury_path, list(self.treasury_path_sht_list), {'skiprows': 8}))
+        return workbooks
+
+    def read_workbooks(self):
+        """
+        Parse every required workbook, reusing cached results where the file has not changed.
+
+        :return: Dictionary mapping workbook path to a dictionary of sheet name -> DataFrame
+        """
+        workbooks = self._workbook_requests()
+        parsed = {}
+        to_parse = []
+        for path, sheets, read_kwargs in workbooks:
+            frames = self.cache.get(path, sheets, read_kwargs) if self.cache is not None else None
+            if frames is None:
+                to_parse.append((path, sheets, read_kwargs))
+            else:
+                logging.info(f"Loaded {len(sheets)} sheet(s) of {path} from cache")
+                parsed[path] = frames
+
+        if len(to_parse) > 1 and self.max_workers != 1:
+            from managers.resources import get_manager
+
+            with get_manager().process_pool(len(to_parse), self.max_workers) as executor:
+                futures = {path: executor.submit(parse_workbook, path, sheets, read_kwargs)
+                           for path, sheets, read_kwargs in to_parse}
+                results = {path: future.result() for path, future in futures.items()}
+        else:
+            results = {path: parse_workbook(path, sheets, read_kwargs) for path, sheets, read_kwargs in to_parse}
+
+        for path, sheets, read_kwargs in to_parse:
+            logging.info(f"Parsed {len(sheets)} sheet(s) of {path}")
+            if self.cache is not None:
+                self.cache.put(path, sheets, results[path], read_kwargs)
+            parsed[path] = results[path]
+        return parsed
+
+    def load_data(self):
+        """
+        Load all necessary data files for running ML or neural nets on Corporate bonds and related data.
+
+        :return: self, with the DataFrame attributes populated
+        """
+        parsed = self.read_workbooks()
+
+        # Excel transformations required before loading: delete the second row of titles, and then rename the
+        # first column of the data - Dates
+        self.macro_var_data = parsed[self.macro_path][self.macro_path_sht]
+        self.HY_excess_return_data = parsed[self.ret_path][self.HY_ret_path_sht].drop(columns='Daily Total Return')
+        self.IG_excess_return_data = parsed[self.ret_path][self.IG_ret_path_sht].drop(columns='Daily Total Return')
+        # Excel transformations required before loading: there is no date column label, name the first column Date
+        self.fred_data = parsed[self.fred_path][self.fred_path_sht]
+
+        # Volume column has no data --> all 0's. Put VIX in front of each column name to ease reading the macro data
+        self.vix_data = pd.read_csv(self.vix_path).drop(columns='Volume')
+        self.vix_data.columns = ['Date', 'VIX Open', 'VIX High', 'VIX Low', 'VIX Close', 'VIX Adj Close']
+
+        # Dates are originally reported as YYYY.MM, the helper columns used to convert them are dropped
+        self.cape_data = pd.read_csv(self.cape_path).drop(columns=['Bad Date', 'Intermediate Date'])
+
+        if self.treasury_path is not None:
+            self.treasury_data = {sheet: frame.drop(columns=UST_DROP_COLUMNS, errors='ignore')
+                                  for sheet, frame in parsed[self.treasury_path].items()}
+        return self
@@ -0,0 +1,162 @@
+import logging
+
+import numpy as np
+
+
+class RunningCorrelation:
+    """
+    Pairwise-complete correlation statistics over a window of rows that can be updated incrementally as rows
+    enter and leave the window. Missing values (NaN) are excluded pair by pair, like pandas.DataFrame.corr.
+
+    :param n_columns: Number of columns tracked
+    """
+
+    def __init__(self, n_columns):
+        self.n_columns = n_columns
+        self.reset()
+
+    def reset(self):
+        self.center = None
+        shape = (self.n_columns, self.n_columns)
+        self.count = np.zeros(shape)     # rows where both i and j are observed
+        self.sum_x = np.zeros(shape)     # sum of column i over those rows
+        self.sum_xx = np.zeros(shape)    # sum of squares of column i over those rows
+        self.sum_xy = np.zeros(shape)    # sum of products of columns i and j
+
+    def _update(self, rows, sign):
+        rows = np.asarray(rows, dtype=float)
+        if rows.size == 0:
+            return
+        if self.center is None:
+            # Shifting by a rough mean keeps the sums small and avoids catastrophic cancellation.
+            self.center = np.nan_to_num(np.nanmean(rows, axis=0)) if not np.isnan(rows).all() else \
+                np.zeros(self.n_columns)
+        observed = ~np.isnan(rows)
+        mask = observed.astype(float)
+        shifted = np.where(observed, rows - self.center, 0.0)
+        self.count += sign * (mask.T @ mask)
+        self.sum_x += sign * (shifted.T @ mask)
+        self.sum_xx += sign * ((shifted ** 2).T @ mask)
+        self.sum_xy += sign * (shifted.T @ shifted)
+
+    def add(self, rows):
+        """
+        Add rows (2-D array, rows x columns) to the window.
+        """
+        self._update(rows, 1.0)
+
+    def remove(self, rows):
+        """
+        Remove rows previously added to the window.
+        """
+        self._update(rows, -1.0)
+
+    def correlation(self):
+        """
+        :return: Correlation matrix; NaN where a pair has fewer than two joint observations or no variance
+        """
+        n = self.count
+        sum_y = self.sum_x.T
+        covariance = n * self.sum_xy - self.sum_x * sum_y
+        variance_x = n * self.sum_xx - self.sum_x ** 2
+        variance_y = variance_x.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = covariance / np.sqrt(variance_x * variance_y)
+        corr[(n < 2) | (variance_x <= 1e-12 * np.abs(n * self.sum_xx)) |
+             (variance_y <= 1e-12 * np.abs(n * self.sum_xx.T))] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+
+class CorrelationPruner:
+    """
+    Selects features from a correlation matrix whose last row/column is the target.
+
+    'cluster' groups features whose absolute correlation exceeds the threshold and keeps the member most
+    correlated with the target as the representative of each group. 'filter' only ranks features by their
+    absolute correlation with the target. In both modes max_features caps the number of features kept.
+
+    :param threshold: Absolute correlation above which two features belong to the same cluster
+    :param max_features: Maximum number of features to keep (default: no limit)
+    :param method: 'cluster' or 'filter'
+    """
+
+    def __init__(self, threshold=0.95, max_features=None, method='cluster'):
+        if method not in ('cluster', 'filter'):
+            raise ValueError("method must be either 'cluster' or 'filter'")
+        self.threshold = threshold
+        self.max_features = max_features
+        self.method = method
+
+    def select(self, corr):
+        """
+        :param corr: (n_features + 1) x (n_features + 1) correlation matrix, target last
+        :return: Sorted array of the indices of the features to keep
+        """
+        feature_corr = np.abs(corr[:-1, :-1])
+        target_corr = np.abs(corr[:-1, -1])
+        # Features without variance (or overlap with the target) in the window carry no information.
+        candidates = np.flatnonzero(~np.isnan(target_corr))
+        order = candidates[np.argsort(-target_corr[candidates], kind='stable')]
+
+        if self.method == 'filter':
+            kept = list(order)
+        else:
+            kept = []
+            assigned = np.zeros(len(target_corr), dtype=bool)
+            for feature in order:
+                if assigned[feature]:
+                    continue
+                kept.append(feature)
+                assigned |= np.nan_to_num(feature_corr[feature]) >= self.threshold
+        if self.max_features is not None:
+            kept = kept[:self.max_features]
+        if not kept:
+            logging.warning("No feature is correlated with the target in this window, keeping all of them")
+            kept = range(len(target_corr))
+        return np.sort(np.asarray(kept, dtype=int))
+
+
+class FoldFeatureSelector:
+    """
+    Runs a CorrelationPruner inside each training window of a walk-forward split. The correlation statistics
+    are updated incrementally from one window to the next, so only rows entering or leaving the window are
+    touched, and only training rows are ever used, so the selection does not leak test data.
+
+    :param X: Feature matrix (rows x features) covering the whole history
+    :param y: Target vector aligned with X
+    :param pruner: CorrelationPruner used on every window (default: CorrelationPruner())
+    """
+
+    def __init__(self, X, y, pruner=None):
+        self.data = np.column_stack([np.asarray(X, dtype=float), np.asarray(y, dtype=float)])
+        self.pruner = pruner if pruner is not None else CorrelationPruner()
+        self.stats = RunningCorrelation(self.data.shape[1])
+        self.window = (0, 0)
+
+    def _move_window(self, start, end):
+        old_start, old_end = self.window
+        overlap = max(0, min(end, old_end) - max(start, old_start))
+        changed = (end - start) + (old_end - old_start) - 2 * overlap
+        if overlap == 0 or changed > end - start:
+            self.stats.reset()
+            self.stats.add(self.data[start:end])
+        else:
+            self.stats.add(self.data[start:old_start])
+            self.stats.remove(self.data[old_start:start])
+            self.stats.add(self.data[old_end:end])
+            self.stats.remove(self.data[end:old_end])
+        self.window = (start, end)
+
+    def select(self, train_start, train_end):
+        """
+        Select features using only the rows of the training window.
+
+        :param train_start: First row of the training window
+        :param train_end: End (exclusive) of the training window
+        :return: Sorted array of the indices of the selected features
+        """
+        self._move_window(train_start, train_end)
+        selected = self.pruner.select(self.stats.correlation())
+        logging.debug(f"Kept {len(selected)} of {self.data.shape[1] - 1} features for rows "
+                      f"{train_start}:{train_end}")
+        return selected
@@ -0,0 +1,58 @@
+import logging
+import threading
+
+
+# Responses worth retrying: rate limiting and transient server errors.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def make_session(pool_size=10, retries=5, backoff_factor=0.5, backoff_max=30.0, backoff_jitter=0.5):
+    """
+    Create a requests.Session that keeps connections alive in a pool and retries failed requests. Connection
+    errors and RETRY_STATUSES responses are retried up to `retries` times, sleeping
+    backoff_factor * 2^(attempt - 1) seconds (capped at backoff_max) plus up to backoff_jitter seconds of random
+    jitter, or as long as a 429's Retry-After header asks. Responses are requested gzip-compressed.
+
+    :param pool_size: Connections kept open per host; set it to the number of threads sharing the session
+    :param retries: Maximum number of retries of one request
+    :return: requests.Session
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util import Retry
+
+    retry = Retry(total=retries, status_forcelist=RETRY_STATUSES, allowed_methods=('GET', 'HEAD'),
+                  backoff_factor=backoff_factor, backoff_max=backoff_max, backoff_jitter=backoff_jitter,
+                  respect_retry_after_header=True, raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept': 'application/json', 'Accept-Encoding': 'gzip, deflate'})
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    :return: The process-wide session shared by the data fetchers
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session()
+            logging.debug("Created the shared HTTP session")
+        return _session
+
+
+def get_json(url, params=None, session=None, timeout=30):
+    """
+    GET a JSON document through the shared (or given) session, raising requests.HTTPError once the retries
+    are exhausted.
+    """
+    response = (session or get_session()).get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
@@ -0,0 +1,324 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_until REAL,
+    worker TEXT,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until);
+"""
+
+
+class Job:
+    """
+    A job claimed from the queue.
+    """
+
+    def __init__(self, id, task, payload, attempts):
+        self.id = id
+        self.task = task
+        self.payload = payload
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Job(id={self.id}, task={self.task!r}, attempts={self.attempts})"
+
+
+class JobQueue:
+    """
+    Job queue backed by a SQLite file. Any number of worker processes, on this host or on other hosts sharing
+    the file system, can claim jobs. A claimed job is leased to one worker for lease_seconds; if the worker dies
+    the lease expires and the job is handed to another worker. Failed jobs are retried up to max_attempts times.
+
+    The default rollback journal is used because SQLite's WAL mode does not work on network file systems.
+
+    :param path: Path of the SQLite database file
+    :param lease_seconds: How long a claimed job stays reserved without a heartbeat
+    :param max_attempts: Default number of attempts before a job is marked as failed
+    :param journal_mode: SQLite journal mode ('DELETE' is safe on shared file systems, 'WAL' is faster locally)
+    """
+
+    def __init__(self, path, lease_seconds=300, max_attempts=3, journal_mode='DELETE'):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.journal_mode = journal_mode
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        return _Connection(conn)
+
+    def enqueue(self, task, payload, max_attempts=None):
+        """
+        Add a job to the queue.
+
+        :param task: Name of the task in TASKS that will run the job
+        :param payload: JSON-serialisable job arguments
+        :param max_attempts: Number of attempts before giving up (default: the queue's max_attempts)
+        :return: Id of the new job
+        """
+        return self.enqueue_many(task, [payload], max_attempts)[0]
+
+    def enqueue_many(self, task, payloads, max_attempts=None):
+        """
+        Add several jobs for the same task in one transaction.
+
+        :return: List of the ids of the new jobs
+        """
+        now = time.time()
+        max_attempts = max_attempts or self.max_attempts
+        ids = []
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for payload in payloads:
+                cursor = conn.execute("INSERT INTO jobs (task, payload, max_attempts, created, updated) "
+                                      "VALUES (?, ?, ?, ?, ?)", (task, json.dumps(payload), max_attempts, now, now))
+                ids.append(cursor.lastrowid)
+            conn.execute("COMMIT")
+        return ids
+
+    def claim(self, worker_id):
+        """
+        Lease the oldest pending job, or a running job whose lease has expired.
+
+        :param worker_id: Identifier of the claiming worker
+        :return: Job, or None if there is nothing to do
+        """
+        with self._connect() as conn:
+            # BEGIN IMMEDIATE takes the write lock up front, so two workers can never claim the same job.
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            # Jobs whose lease expired on their last attempt are given up on rather than retried forever.
+            conn.execute("UPDATE jobs SET status = 'failed', error = 'lease expired', updated = ? "
+                         "WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts", (now, now))
+            row = conn.execute("SELECT id, task, payload, attempts FROM jobs "
+                               "WHERE status = 'pending' OR (status = 'running' AND lease_until < ?) "
+                               "ORDER BY id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            job_id, task, payload, attempts = row
+            conn.execute("UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, "
+                         "worker = ?, updated = ? WHERE id = ?", (now + self.lease_seconds, worker_id, now, job_id))
+            conn.execute("COMMIT")
+        return Job(job_id, task, json.loads(payload), attempts + 1)
+
+    def heartbeat(self, job_id, worker_id):
+        """
+        Extend the lease of a running job.
+
+        :return: False if the job is no longer leased to this worker
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE jobs SET lease_until = ?, updated = ? "
+                                  "WHERE id = ? AND worker = ? AND status = 'running'",
+                                  (now + self.lease_seconds, now, job_id, worker_id))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id, result):
+        """
+        Store the result of a job. Results from a worker that lost its lease are ignored.
+
+        :return: True if the result was recorded
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE jobs SET status = 'done', result = ?, error = NULL, updated = ? "
+                                  "WHERE id = ? AND worker = ? AND status = 'running'",
+                                  (json.dumps(result), time.time(), job_id, worker_id))
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker_id, error):
+        """
+        Record a failed attempt; the job goes back to pending unless it has used up its attempts.
+        """
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END, "
+                         "error = ?, lease_until = NULL, updated = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                         (error, time.time(), job_id, worker_id))
+
+    def counts(self):
+        """
+        :return: Dictionary mapping status to number of jobs
+        """
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def results(self, task=None):
+        """
+        :return: List of (job id, payload, result) tuples of the finished jobs
+        """
+        query = "SELECT id, payload, result FROM jobs WHERE status = 'done'"
+        params = ()
+        if task is not None:
+            query += " AND task = ?"
+            params = (task,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY id", params).fetchall()
+        return [(job_id, json.loads(payload), json.loads(result)) for job_id, payload, result in rows]
+
+    def failures(self):
+        """
+        :return: List of (job id, payload, error) tuples of the jobs that exhausted their attempts
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, payload, error FROM jobs WHERE status = 'failed' ORDER BY id").fetchall()
+        return [(job_id, json.loads(payload), error) for job_id, payload, error in rows]
+
+
+class _Connection:
+    """
+    Context manager that closes the SQLite connection (sqlite3's own only ends the transaction).
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self.conn.in_transaction:
+            self.conn.execute("ROLLBACK")
+        self.conn.close()
+
+
+_DATA_CACHE = {}
+
+
+def _load_processed_data(path):
+    # Every fold of a search reads the same file; parse it once per worker process.
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    if key not in _DATA_CACHE:
+        from managers.pipeline import read_dated_csv
+        _DATA_CACHE.clear()
+        _DATA_CACHE[key] = read_dated_csv(path)
+    return _DATA_CACHE[key]
+
+
+def fit_fold(payload):
+    """
+    Fit an XGBoostModel on one walk-forward fold and predict its test window.
+
+    :param payload: Dictionary with 'data' (path to processed_data.csv), 'target_col', 'bounds'
+                    ([train_start, train_end, test_start, test_end]) and 'model_params'
+    :return: Dictionary with the test dates, actual and predicted values and the number of boosting rounds used
+    """
+    from models.xgb import XGBoostRegressor
+
+    data = _load_processed_data(payload['data'])
+    target_col_index = data.columns.get_loc(payload['target_col'])
+    X = data.iloc[:, :target_col_index]
+    y = data.iloc[:, target_col_index]
+    train_start, train_end, test_start, test_end = payload['bounds']
+
+    model = XGBoostRegressor(**payload.get('model_params', {}))
+    model.fit(X.iloc[train_start:train_end], y.iloc[train_start:train_end])
+    predictions = model.predict(X.iloc[test_start:test_end])
+    return {'dates': [date.isoformat() for date in y.index[test_start:test_end]],
+            'actual': y.iloc[test_start:test_end].tolist(), 'predicted': [float(p) for p in predictions],
+            'n_estimators': model.best_n_estimators}
+
+
+TASKS = {'fit_fold': fit_fold}
+
+
+def enqueue_search(queue, data_path, target_col, splits, configs):
+    """
+    Enqueue one fit_fold job per (configuration, scheme, fold).
+
+    :param queue: JobQueue to fill
+    :param data_path: Path to processed_data.csv, as seen by the workers
+    :param target_col: Target column
+    :param splits: Dictionary mapping scheme name to a list of fold bounds (see TimeSeriesCrossValidator.split_bounds)
+    :param configs: Dictionary mapping configuration name to XGBoostModel parameters
+    :return: List of job ids
+    """
+    payloads = [{'data': data_path, 'target_col': target_col, 'bounds': list(bounds), 'model_params': params,
+                 'config': name, 'scheme': scheme, 'fold': fold}
+                for name, params in configs.items()
+                for scheme, scheme_bounds in splits.items()
+                for fold, bounds in enumerate(scheme_bounds)]
+    return queue.enqueue_many('fit_fold', payloads)
+
+
+def collect_results(queue):
+    """
+    Gather the finished fit_fold jobs into a WalkForwardResults store.
+    """
+    from managers.results_store import WalkForwardResults
+
+    results = WalkForwardResults()
+    for _, payload, result in queue.results(task='fit_fold'):
+        results.append(payload['fold'], result['dates'], result['actual'], result['predicted'],
+                       model=payload['config'], scheme=payload['scheme'], target=payload['target_col'])
+    return results
+
+
+def run_worker(queue, worker_id=None, poll_interval=1.0, exit_when_empty=True, max_jobs=None, tasks=None):
+    """
+    Claim and run jobs until the queue is drained (or forever when exit_when_empty is False).
+
+    :param queue: JobQueue to pull from
+    :param worker_id: Identifier recorded on claimed jobs (default: hostname-pid)
+    :param poll_interval: Seconds to wait before polling an empty queue again
+    :param exit_when_empty: Return once no job can be claimed
+    :param max_jobs: Stop after running this many jobs
+    :param tasks: Dictionary of task name to callable (default: TASKS)
+    :return: Number of jobs run
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    tasks = tasks or TASKS
+    n_jobs = 0
+    while max_jobs is None or n_jobs < max_jobs:
+        job = queue.claim(worker_id)
+        if job is None:
+            if exit_when_empty:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        # Keep the lease alive while the job runs, so only dead workers lose their jobs.
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=_heartbeat, args=(queue, job.id, worker_id, stop), daemon=True)
+        heartbeat.start()
+        try:
+            result = tasks[job.task](job.payload)
+        except Exception:
+            logging.error(f"Worker {worker_id} failed {job} on attempt {job.attempts}")
+            queue.fail(job.id, worker_id, traceback.format_exc())
+        else:
+            queue.complete(job.id, worker_id, result)
+        finally:
+            stop.set()
+            heartbeat.join()
+        n_jobs += 1
+    logging.info(f"Worker {worker_id} ran {n_jobs} jobs")
+    return n_jobs
+
+
+def _heartbeat(queue, job_id, worker_id, stop):
+    while not stop.wait(queue.lease_seconds / 3):
+        if not queue.heartbeat(job_id, worker_id):
+            break
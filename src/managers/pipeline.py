@@ -0,0 +1,493 @@
+import contextlib
+import copy
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+META_DIRNAME = '.pipeline'
+
+DEFAULT_CONFIG = {
+    'fetch': {
+        'start_date': '1998-01-01',
+        'yahoo_ticker': 'SPY',
+    },
+    'fuse': {},
+    'process': {
+        'target_columns': ['BAMLHYH0A0HYM2TRIV', 'BAMLCC0A0CMTRIV', "DGS10", "DGS2", "DGS30", "DGS5", "DGS7",
+                           "DGS1", "DGS20"],
+    },
+    'split': {
+        'rolling': {'initial_train_size': 10, 'step_size': 10, 'test_size': 5},
+        'sliding': {'window_size': 25, 'step_size': 10, 'test_size': 5},
+    },
+    'train': {
+        'target_col': 'BAMLHYH0A0HYM2TRIV',
+        'model_params': {},
+        # Runs are logged to <data dir>/runs by default; set to null to disable tracking.
+        'tracking': {'backend': 'local'},
+    },
+    'evaluate': {},
+}
+
+
+def merge_config(base, overrides):
+    """
+    Recursively merge a dictionary of overrides into a copy of the base configuration.
+
+    :param base: Base configuration dictionary
+    :param overrides: Dictionary with the values to override
+    :return: New merged configuration dictionary
+    """
+    merged = copy.deepcopy(base)
+    for key, value in (overrides or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 digest of a file's contents.
+
+    :param path: Path of the file to hash
+    :param chunk_size: Number of bytes read at a time
+    :return: Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_dated_csv(path):
+    """
+    Read a CSV written by the pipeline, setting 'Date' as the index and parsing dates.
+
+    :param path: Path of the CSV file
+    :return: pandas DataFrame indexed by date
+    """
+    import pandas as pd
+    return pd.read_csv(path, index_col='Date', parse_dates=True)
+
+
+class Stage:
+    """
+    A single step of the pipeline. A stage reads its input files from the data directory, writes its output
+    files back to it and is considered up to date when the hashes of its inputs and config match the ones
+    recorded the last time it ran.
+
+    :param name: Name of the stage, also used as its config section
+    :param func: Callable taking (pipeline, config) that produces the outputs
+    :param inputs: File names (relative to the data directory) the stage reads
+    :param outputs: File names (relative to the data directory) the stage writes
+    :param adopt_existing: Treat outputs found on disk without a record as up to date, provided every stage
+                           producing its inputs is unrecorded too or was adopted in the same run; they are
+                           recorded when adopted, so later changes to the stage's inputs make it stale
+    """
+
+    def __init__(self, name, func, inputs, outputs, adopt_existing=False):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.adopt_existing = adopt_existing
+
+
+class Pipeline:
+    """
+    Runs a linear sequence of stages, re-executing only those whose inputs, config or outputs have changed.
+    """
+
+    def __init__(self, stages, data_dir=DATA_DIR, config=None, api_key=None):
+        self.stages = list(stages)
+        self.data_dir = data_dir
+        self.config = merge_config(DEFAULT_CONFIG, config)
+        self.api_key = api_key
+
+    @property
+    def stage_names(self):
+        return [stage.name for stage in self.stages]
+
+    def path(self, filename):
+        """
+        Resolve a file name relative to the data directory.
+        """
+        return os.path.join(self.data_dir, filename)
+
+    def _meta_path(self, stage):
+        return os.path.join(self.data_dir, META_DIRNAME, f'{stage.name}.json')
+
+    def _read_meta(self, stage):
+        meta_path = self._meta_path(stage)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def fingerprint(self, stage):
+        """
+        Hash the stage's config section together with the hashes of its input files.
+
+        :param stage: Stage to fingerprint
+        :return: Tuple of (fingerprint, dict of input hashes), or (None, None) if an input is missing
+        """
+        input_hashes = {}
+        for name in stage.inputs:
+            path = self.path(name)
+            if not os.path.exists(path):
+                return None, None
+            input_hashes[name] = file_hash(path)
+        payload = json.dumps({'stage': stage.name, 'config': self.config.get(stage.name, {}),
+                              'inputs': input_hashes}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest(), input_hashes
+
+    def stage_status(self, stage):
+        """
+        Work out whether a stage has to run.
+
+        :param stage: Stage to check
+        :return: One of 'up-to-date', 'stale', 'missing-outputs', 'missing-inputs' or 'new'
+        """
+        fingerprint, _ = self.fingerprint(stage)
+        if fingerprint is None:
+            return 'missing-inputs'
+        if not all(os.path.exists(self.path(name)) for name in stage.outputs):
+            return 'missing-outputs'
+        meta = self._read_meta(stage)
+        if meta is None:
+            return 'up-to-date' if stage.adopt_existing else 'new'
+        if meta.get('fingerprint') != fingerprint:
+            return 'stale'
+        for name, recorded in meta.get('outputs', {}).items():
+            if file_hash(self.path(name)) != recorded:
+                return 'stale'
+        return 'up-to-date'
+
+    def status(self):
+        """
+        :return: Dictionary mapping every stage name to its status
+        """
+        return {stage.name: self.stage_status(stage) for stage in self.stages}
+
+    def _record(self, stage):
+        fingerprint, input_hashes = self.fingerprint(stage)
+        meta = {
+            'stage': stage.name,
+            'fingerprint': fingerprint,
+            'config': self.config.get(stage.name, {}),
+            'inputs': input_hashes,
+            'outputs': {name: file_hash(self.path(name)) for name in stage.outputs},
+        }
+        os.makedirs(os.path.join(self.data_dir, META_DIRNAME), exist_ok=True)
+        with open(self._meta_path(stage), 'w') as f:
+            json.dump(meta, f, indent=2, sort_keys=True)
+
+    def mark_up_to_date(self, name):
+        """
+        Record the current inputs and outputs of a stage as up to date, for outputs that were updated outside the
+        stage (e.g. the refresh daemon's partial fetches), so the next run does not execute it again.
+        """
+        stage = self._select(only=name)[0]
+        self._record(stage)
+
+    def _producers(self, stage):
+        return [other for other in self.stages if set(other.outputs) & set(stage.inputs)]
+
+    def _select(self, until=None, only=None):
+        names = self.stage_names
+        for name in (until, only):
+            if name is not None and name not in names:
+                raise ValueError(f"Unknown stage '{name}'. Choose one of {names}.")
+        if only is not None:
+            return [stage for stage in self.stages if stage.name == only]
+        if until is not None:
+            return self.stages[:names.index(until) + 1]
+        return list(self.stages)
+
+    def run(self, until=None, only=None, force=()):
+        """
+        Execute the stale stages of the pipeline in order.
+
+        :param until: Name of the last stage to run (default: run every stage)
+        :param only: Run just this stage, provided its inputs already exist
+        :param force: Names of stages to re-execute even if they are up to date
+        :return: List of the names of the stages that were executed
+        """
+        for name in force:
+            if name not in self.stage_names:
+                raise ValueError(f"Unknown stage '{name}'. Choose one of {self.stage_names}.")
+
+        executed, adopted_stages = [], set()
+        for stage in self._select(until, only):
+            status = self.stage_status(stage)
+            if status == 'missing-inputs':
+                missing = [name for name in stage.inputs if not os.path.exists(self.path(name))]
+                raise FileNotFoundError(f"Stage '{stage.name}' is missing its inputs: {missing}")
+            adopted = status == 'up-to-date' and self._read_meta(stage) is None
+            if adopted and not all(producer.name in adopted_stages or self._read_meta(producer) is None
+                                   for producer in self._producers(stage)):
+                # Outputs shipped with the checkout predate inputs an upstream stage has since recorded.
+                status = 'new'
+            if status == 'up-to-date' and stage.name not in force:
+                if adopted:
+                    logging.info(f"Stage '{stage.name}' adopts its existing outputs")
+                    self._record(stage)
+                    adopted_stages.add(stage.name)
+                else:
+                    logging.info(f"Stage '{stage.name}' is up to date, skipping")
+                self._write_stats(stage)
+                continue
+
+            logging.info(f"Running stage '{stage.name}' ({status})")
+            stage.func(self, self.config.get(stage.name, {}))
+            self._record(stage)
+            self._write_stats(stage)
+            executed.append(stage.name)
+        return executed
+
+    def _write_stats(self, stage):
+        # Every dataset gets a statistics sidecar; unchanged files are skipped and appended rows merged in.
+        from managers.dataset_stats import write_sidecar
+
+        for name in stage.outputs:
+            if name.endswith('.csv') and os.path.exists(self.path(name)):
+                write_sidecar(self.path(name))
+
+
+def fetch_stage(pipeline, config):
+    from managers.data_manager import FREDDataManager, YahooDataManager
+
+    if not pipeline.api_key:
+        raise ValueError("The fetch stage needs a FRED API key. Set FRED_API_KEY or pass --api-key.")
+    with open(pipeline.path('fred-tickers.json')) as f:
+        series_ids = [value for value in json.load(f).values() if value is not None]
+    # Pull FRED Data.
+    fred_manager = FREDDataManager(pipeline.api_key)
+    fred_manager.get_all_data(series_ids, config['start_date'], csv_filename=pipeline.path('fred_data.csv'))
+    if config.get('vintages'):
+        # Point-in-time revision histories, for backtests that must not see later revisions.
+        from managers.vintages import VintageStore
+        VintageStore(pipeline.path('fred_vintages')).fetch(fred_manager, series_ids, config['start_date'])
+    # Pull Yahoo data
+    yahoo_manager = YahooDataManager()
+    yahoo_manager.get_data(config['yahoo_ticker'], csv_filename=pipeline.path('yahoo_data.csv'))
+
+
+def fuse_stage(pipeline, config):
+    from managers.data_manager import DataFusion
+
+    if config.get('memory_budget'):
+        # Out-of-core path for very wide universes: the CSVs are converted to column-block stores first.
+        from managers.column_store import ColumnStore
+
+        budget = config['memory_budget']
+        with _scratch_dir(pipeline, 'fuse') as scratch:
+            fusion = DataFusion(ColumnStore.from_csv(pipeline.path('fred_data.csv'), os.path.join(scratch, 'fred'),
+                                                     budget),
+                                ColumnStore.from_csv(pipeline.path('yahoo_data.csv'),
+                                                     os.path.join(scratch, 'yahoo'), budget))
+            fusion.fuse_to_store(os.path.join(scratch, 'merged'), budget).to_csv(pipeline.path('merged_data.csv'),
+                                                                               memory_budget=budget)
+        logging.info(f"Data saved to {pipeline.path('merged_data.csv')}")
+        return
+
+    fusion = DataFusion(read_dated_csv(pipeline.path('fred_data.csv')),
+                        read_dated_csv(pipeline.path('yahoo_data.csv')))
+    fused_data = fusion.fuse_data()
+    fused_data.index.name = 'Date'
+    fusion.save_to_csv(fused_data, pipeline.path('merged_data.csv'))
+
+
+def process_stage(pipeline, config):
+    from managers.data_processing import DataProcessor
+
+    if config.get('memory_budget'):
+        from managers.column_store import ColumnStore
+
+        budget = config['memory_budget']
+        with _scratch_dir(pipeline, 'process') as scratch:
+            processor = DataProcessor(ColumnStore.from_csv(pipeline.path('merged_data.csv'),
+                                                           os.path.join(scratch, 'merged'), budget))
+            processed = processor.process_store(config['target_columns'], os.path.join(scratch, 'processed'),
+                                                csv_filename=pipeline.path('processed_data.csv'),
+                                                compound_columns=config.get('compound_columns'),
+                                                memory_budget=budget)
+            logging.info(f"Shape of the processed data: {processed.shape}")
+        return
+
+    processor = DataProcessor(read_dated_csv(pipeline.path('merged_data.csv')))
+    processed_data = processor.process_data(config['target_columns'], save_csv=True,
+                                            csv_filename=pipeline.path('processed_data.csv'),
+                                            compound_columns=config.get('compound_columns'))
+    logging.info(f"Shape of the processed data: {processed_data.shape}")
+
+
+@contextlib.contextmanager
+def _scratch_dir(pipeline, stage_name):
+    # Column stores are intermediate; only the stage's CSV outputs are kept.
+    directory = os.path.join(pipeline.path(META_DIRNAME), f'{stage_name}-scratch')
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory)
+    try:
+        yield directory
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def split_stage(pipeline, config):
+    from managers.cross_validation import TimeSeriesCrossValidator
+
+    cv = TimeSeriesCrossValidator(read_dated_csv(pipeline.path('processed_data.csv')))
+    splits = {method: cv.split_bounds(method=method, **kwargs) for method, kwargs in config.items()}
+    for method, bounds in splits.items():
+        logging.info(f"Number of {method} window splits: {len(bounds)}")
+    with open(pipeline.path('splits.json'), 'w') as f:
+        json.dump(splits, f, indent=2)
+
+
+def make_tracker(pipeline, tracking):
+    """
+    Create the ExperimentTracker described by a stage's 'tracking' config, or None when tracking is disabled.
+    """
+    if not tracking:
+        return None
+    from managers.tracking import ExperimentTracker
+
+    tracking = dict(tracking)
+    return ExperimentTracker(tracking.pop('root', pipeline.path('runs')), **tracking)
+
+
+def train_stage(pipeline, config):
+    import time
+
+    import numpy as np
+
+    from managers.results_store import WalkForwardResults
+    from models.xgb import XGBoostRegressor
+    from models.zoo import FoldCache, ModelZoo, make_models
+
+    processed_data = read_dated_csv(pipeline.path('processed_data.csv'))
+    with open(pipeline.path('splits.json')) as f:
+        splits = json.load(f)
+
+    # Every column before the target is used as a feature.
+    target_col = config['target_col']
+    target_col_index = processed_data.columns.get_loc(target_col)
+    X = processed_data.iloc[:, :target_col_index]
+    y = processed_data.iloc[:, target_col_index]
+
+    selector = None
+    if config.get('feature_selection'):
+        from managers.feature_selection import CorrelationPruner, FoldFeatureSelector
+        selector = FoldFeatureSelector(X, y, CorrelationPruner(**config['feature_selection']))
+
+    model_name = config.get('name', 'xgboost')
+    if model_name in (config.get('zoo') or {}):
+        # Predictions are grouped by label, so two models under one name would be blended in the metrics.
+        raise ValueError(f"Zoo model label {model_name!r} is the train stage's own model name; rename the zoo "
+                         f"entry, e.g. {{'{model_name}_zoo': {{'estimator': ...}}}}, or set the stage's 'name'")
+    # Fold matrices (and feature selections) are built once and shared by XGBoost and the model zoo.
+    cache = FoldCache(X, y, splits, selector)
+    zoo = ModelZoo(make_models(config.get('zoo') or {}), n_jobs=config.get('zoo_jobs'))
+    xgb_model = XGBoostRegressor(**config['model_params'])
+    results = WalkForwardResults(capacity=(1 + len(zoo.models)) * sum(
+        bounds[3] - bounds[2] for scheme in splits.values() for bounds in scheme) or 1)
+    tracker = make_tracker(pipeline, config.get('tracking'))
+    if tracker is not None:
+        tracker.log_params({key: value for key, value in config.items() if key != 'tracking'})
+    fold_rounds = {}
+    for scheme, bounds in splits.items():
+        fold_rounds[scheme] = []
+        for fold in range(len(bounds)):
+            start = time.perf_counter()
+            # Features were chosen on the training window only, so the test rows never influence the selection.
+            data = cache[scheme, fold]
+            xgb_model.fit(data['X_train'], data['y_train'])
+            fold_rounds[scheme].append(xgb_model.best_n_estimators)
+            predictions = xgb_model.predict(data['X_test'])
+            results.append(fold, data['dates'], data['y_test'], predictions, model=model_name,
+                           scheme=scheme, target=target_col)
+            if tracker is not None:
+                errors = predictions - data['y_test']
+                tracker.log_metrics({'scheme': scheme, 'fold': fold, 'rmse': float(np.sqrt(np.mean(errors ** 2))),
+                                     'n_estimators': xgb_model.best_n_estimators,
+                                     'n_features': data['X_train'].shape[1],
+                                     'seconds': time.perf_counter() - start})
+    if zoo.models:
+        zoo.run(cache, results, target=target_col)
+        if tracker is not None:
+            tracker.log_metrics({f'zoo_seconds_{name}': seconds for name, seconds in zoo.seconds.items()})
+    results.save(pipeline.path('predictions.npz'))
+    logging.info(f"{len(results)} out-of-sample predictions saved to {pipeline.path('predictions.npz')}")
+
+    # Refit on the full history so the latest month can be scored without re-running the walk-forward.
+    columns = selector.select(0, len(X)) if selector is not None else slice(None)
+    model_params = dict(config['model_params'])
+    if model_params.pop('validation_fraction', None):
+        # Early stopping chose a round count per fold; the final model reuses their median instead of
+        # giving up the latest rows to another validation tail.
+        rounds = [n for scheme_rounds in fold_rounds.values() for n in scheme_rounds]
+        model_params['n_estimators'] = int(np.median(rounds)) if rounds else model_params.get('n_estimators', 100)
+        model_params.pop('early_stopping_rounds', None)
+        model_params.pop('refit_full_window', None)
+        logging.info(f"Refitting on the full history with {model_params['n_estimators']} rounds")
+    final_model = XGBoostRegressor(**model_params).fit(X.iloc[:, columns], y)
+    with open(pipeline.path('model.pkl'), 'wb') as f:
+        pickle.dump({'model': final_model, 'features': list(X.columns[columns]), 'target_col': target_col,
+                     'fold_rounds': fold_rounds}, f)
+    if tracker is not None:
+        tracker.log_artifact(pipeline.path('predictions.npz'))
+        tracker.log_metrics({'tracking_overhead_seconds': tracker.overhead})
+        tracker.close()
+        logging.info(f"Run {tracker.run_id} logged to {tracker.store.__class__.__name__}")
+
+
+def load_model(pipeline):
+    """
+    Load the model refitted on the full history by the train stage.
+
+    :return: Dictionary with the fitted 'model', its 'features', the 'target_col' and the boosting rounds
+             used by every fold ('fold_rounds', per scheme)
+    """
+    with open(pipeline.path('model.pkl'), 'rb') as f:
+        return pickle.load(f)
+
+
+def evaluate_stage(pipeline, config):
+    from managers.results_store import WalkForwardResults
+
+    results = WalkForwardResults.load(pipeline.path('predictions.npz'))
+    metrics = results.metrics(by=config.get('by', ['model', 'scheme', 'target', 'fold']),
+                              n_bootstrap=config.get('n_bootstrap', 0))
+    metrics.to_csv(pipeline.path('metrics.csv'), index=False)
+    if 'fold' in metrics:
+        # Name the model and target of every line once there are several to tell apart.
+        labels = [column for column in ('model', 'target') if column in metrics and metrics[column].nunique() > 1]
+        for row in metrics.itertuples():
+            label = ''.join(f" ({getattr(row, column)})" for column in labels)
+            print(f"{row.scheme.capitalize()} split {row.fold + 1}{label} RMSE: {row.rmse}")
+    else:
+        print(metrics.to_string(index=False))
+
+
+STAGES = [
+    Stage('fetch', fetch_stage, inputs=['fred-tickers.json'], outputs=['fred_data.csv', 'yahoo_data.csv'],
+          adopt_existing=True),
+    Stage('fuse', fuse_stage, inputs=['fred_data.csv', 'yahoo_data.csv'], outputs=['merged_data.csv'],
+          adopt_existing=True),
+    Stage('process', process_stage, inputs=['merged_data.csv'], outputs=['processed_data.csv'],
+          adopt_existing=True),
+    Stage('split', split_stage, inputs=['processed_data.csv'], outputs=['splits.json']),
+    Stage('train', train_stage, inputs=['processed_data.csv', 'splits.json'],
+          outputs=['predictions.npz', 'model.pkl']),
+    Stage('evaluate', evaluate_stage, inputs=['predictions.npz'], outputs=['metrics.csv']),
+]
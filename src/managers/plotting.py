@@ -0,0 +1,203 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+def minmax_downsample(x, y, n_buckets):
+    """
+    Keep the minimum and the maximum of every one of n_buckets equal-count buckets (plus the first and last
+    points), in time order. Every peak and trough of the series survives, so the drawn envelope is exact at
+    one bucket per pixel column.
+
+    :return: Tuple of (x, y) arrays of at most 2 * n_buckets + 2 points
+    """
+    n = len(y)
+    if n <= 2 * n_buckets + 2:
+        return x, y
+    size = -(-n // n_buckets)
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    used = ~np.isnan(buckets).all(axis=1)
+    offsets = np.arange(n_buckets)[used] * size
+    low = offsets + np.nanargmin(buckets[used], axis=1)
+    high = offsets + np.nanargmax(buckets[used], axis=1)
+    keep = np.unique(np.concatenate([[0, n - 1], low, high]))
+    return x[keep], y[keep]
+
+
+def lttb_downsample(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: keep the first and last points and, from each of n_out - 2 buckets, the
+    point forming the largest triangle with the point kept from the previous bucket and the mean of the next
+    bucket. Preserves the visual shape with exactly n_out points.
+
+    :return: Tuple of (x, y) arrays of n_out points
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return x, y
+    t = _as_float(x)
+    v = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Mean of every bucket, used as the third corner of the triangles of the bucket before it.
+    sums_t = np.add.reduceat(t[1:n - 1], edges[:-1] - 1)
+    sums_v = np.add.reduceat(v[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_t = np.append(sums_t / counts, t[-1])
+    mean_v = np.append(sums_v / counts, v[-1])
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        area = np.abs((t[previous] - mean_t[bucket + 1]) * (v[start:end] - v[previous]) -
+                      (t[previous] - t[start:end]) * (mean_v[bucket + 1] - v[previous]))
+        previous = start + int(np.argmax(area))
+        keep[bucket + 1] = previous
+    return x[keep], y[keep]
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.view(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+METHODS = {'minmax': minmax_downsample, 'lttb': lttb_downsample}
+
+
+class DownsampleCache:
+    """
+    Least-recently-used cache of downsampled series, keyed by series name, visible x range, target number of
+    points and method. Zooming back to a range seen before (e.g. with the home button) costs a lookup.
+
+    :param method: 'minmax' or 'lttb'
+    :param max_entries: Number of downsampled series kept
+    """
+
+    def __init__(self, method='minmax', max_entries=256):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {sorted(METHODS)}")
+        self.method = method
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, x, y, n_points, start=None, end=None):
+        """
+        :param name: Key of the series; series with the same name must have the same data
+        :param x: Sorted x values (e.g. datetime64)
+        :param y: y values, NaN for missing (missing points are dropped)
+        :param n_points: Target number of points, e.g. the pixel width of the axes
+        :param start: First x value of the visible range (default: beginning of the series)
+        :param end: Last x value of the visible range (default: end of the series)
+        :return: Tuple of (x, y) arrays to draw
+        """
+        key = (name, len(y), start, end, n_points, self.method)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        # One point beyond each edge keeps the lines running to the border of the axes.
+        first = max(0, np.searchsorted(x, start, side='left') - 1) if start is not None else 0
+        last = min(len(x), np.searchsorted(x, end, side='right') + 1) if end is not None else len(x)
+        x, y = x[first:last], np.asarray(y[first:last], dtype=np.float64)
+        observed = ~np.isnan(y)
+        x, y = x[observed], y[observed]
+        if self.method == 'minmax':
+            result = minmax_downsample(x, y, max(1, n_points // 2))
+        else:
+            result = lttb_downsample(x, y, n_points)
+        self.entries[key] = result
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return result
+
+
+_default_cache = None
+
+
+def default_cache():
+    """
+    :return: The process-wide DownsampleCache used when plot_series is not given one
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DownsampleCache()
+    return _default_cache
+
+
+class DownsampledPlot:
+    """
+    Lines on a matplotlib Axes drawn from downsampled copies of long series. The number of points follows the
+    pixel width of the axes, and zooming or panning re-downsamples only the visible range, so dozens of long
+    daily series stay responsive.
+
+    :param ax: matplotlib Axes
+    :param series: Dictionary mapping label to pandas Series, or a DataFrame (one line per column)
+    :param cache: DownsampleCache (default: the process-wide one)
+    :param points_per_pixel: Points drawn per horizontal pixel
+    :param plot_kwargs: Passed to every ax.plot call
+    """
+
+    def __init__(self, ax, series, cache=None, points_per_pixel=1, **plot_kwargs):
+        self.ax = ax
+        self.cache = cache or default_cache()
+        self.points_per_pixel = points_per_pixel
+        items = series.items() if hasattr(series, 'items') else series
+        self.series = {str(label): (s.index.to_numpy(), s.to_numpy(dtype=np.float64)) for label, s in items}
+        self.lines = {}
+        n_points = self.n_points()
+        for label, (x, y) in self.series.items():
+            self.lines[label], = ax.plot(*self.cache.get(self._key(label, x), x, y, n_points), label=label,
+                                         **plot_kwargs)
+        ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    def _key(self, label, x):
+        # Label plus the span of the data, so that two plots reusing a label do not share entries.
+        return (label, x[0] if len(x) else None, x[-1] if len(x) else None)
+
+    def n_points(self):
+        width = self.ax.get_window_extent().width
+        return max(16, int(width * self.points_per_pixel))
+
+    def _on_xlim_changed(self, ax):
+        start, end = ax.get_xlim()
+        n_points = self.n_points()
+        for label, (x, y) in self.series.items():
+            lo, hi = _to_x(start, x), _to_x(end, x)
+            self.lines[label].set_data(*self.cache.get(self._key(label, x), x, y, n_points, lo, hi))
+
+
+def _to_x(value, x):
+    # Axes limits of date axes are matplotlib date numbers (days since the epoch).
+    if np.issubdtype(x.dtype, np.datetime64):
+        return np.datetime64(int(round(value * 86400e6)), 'us').astype(x.dtype)
+    return value
+
+
+def plot_series(series, ax=None, cache=None, title=None, ylabel=None, **plot_kwargs):
+    """
+    Plot long series downsampled to the width of the axes (see DownsampledPlot).
+
+    :param series: Dictionary mapping label to pandas Series, or a DataFrame
+    :param ax: matplotlib Axes (default: a new 12 x 8 figure)
+    :return: DownsampledPlot; keep a reference to it while the figure is open so zooming keeps working
+    """
+    import matplotlib.pyplot as plt
+
+    if ax is None:
+        _, ax = plt.subplots(figsize=(12, 8))
+    plot = DownsampledPlot(ax, series, cache=cache, **plot_kwargs)
+    if title:
+        ax.set_title(title)
+    if ylabel:
+        ax.set_ylabel(ylabel)
+    ax.legend()
+    ax.grid(True)
+    return plot
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from managers.pipeline import load_model, read_dated_csv
+
+
+class RefreshDaemon:
+    """
+    Long-running loop that keeps the pipeline's data current. Each poll asks FRED and Yahoo Finance which series
+    changed since the previous poll (one lightweight request per batch), downloads only those series, pushes
+    them through the fuse and process stages and re-scores the latest month with the model persisted by the
+    train stage. Polls with no new releases do nothing else.
+
+    :param pipeline: Pipeline whose data directory is refreshed
+    :param fred_manager: FREDDataManager used to poll and fetch FRED series
+    :param yahoo_manager: YahooDataManager used to poll and fetch the Yahoo ticker
+    :param interval: Seconds between polls
+    :param max_concurrent_fetches: Maximum number of series downloaded at the same time
+    """
+
+    STATE_FILE = 'refresh_state.json'
+    SCORES_FILE = 'latest_scores.csv'
+
+    def __init__(self, pipeline, fred_manager, yahoo_manager, interval=3600, max_concurrent_fetches=4):
+        self.pipeline = pipeline
+        self.fred_manager = fred_manager
+        self.yahoo_manager = yahoo_manager
+        self.interval = interval
+        self.max_concurrent_fetches = max_concurrent_fetches
+        self.state = self._load_state()
+
+    def _load_state(self):
+        path = self.pipeline.path(self.STATE_FILE)
+        if not os.path.exists(path):
+            return {'last_poll': None, 'last_updated': {}, 'yahoo_last_date': None}
+        with open(path) as f:
+            return json.load(f)
+
+    def _save_state(self):
+        path = self.pipeline.path(self.STATE_FILE)
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(f'{path}.tmp', path)
+
+    def _series_ids(self):
+        with open(self.pipeline.path('fred-tickers.json')) as f:
+            return [value for value in json.load(f).values() if value is not None]
+
+    async def _changed_series(self):
+        since = datetime.fromisoformat(self.state['last_poll']) if self.state['last_poll'] else None
+        ticker = self.pipeline.config['fetch']['yahoo_ticker']
+        fred_updates, yahoo_dates = await asyncio.gather(
+            asyncio.to_thread(self.fred_manager.get_last_updated, self._series_ids(), since),
+            asyncio.to_thread(self.yahoo_manager.get_latest_dates, [ticker]))
+
+        changed_fred = {series_id: ts.isoformat() for series_id, ts in fred_updates.items()
+                        if ts.isoformat() != self.state['last_updated'].get(series_id)}
+        latest_yahoo = yahoo_dates.get(ticker)
+        yahoo_changed = latest_yahoo is not None and \
+            pd.Timestamp(latest_yahoo).isoformat() != self.state['yahoo_last_date']
+        return changed_fred, (pd.Timestamp(latest_yahoo).isoformat() if yahoo_changed else None)
+
+    async def _fetch_fred(self, series_ids):
+        fred_data = read_dated_csv(self.pipeline.path('fred_data.csv'))
+        start_date = fred_data.index.min().strftime('%Y-%m-%d')
+        semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+
+        async def fetch(series_id):
+            async with semaphore:
+                return await asyncio.to_thread(self.fred_manager.get_data, series_id, start_date)
+
+        frames = await asyncio.gather(*(fetch(series_id) for series_id in series_ids))
+        for frame in frames:
+            frame.index = pd.to_datetime(frame.index)
+            fred_data = fred_data.reindex(fred_data.index.union(frame.index))
+            fred_data[frame.columns[0]] = frame.iloc[:, 0]
+        fred_data.index.name = 'Date'
+        fred_data.to_csv(self.pipeline.path('fred_data.csv'), index=True)
+
+    def score_latest(self):
+        """
+        Score the latest month of processed_data.csv with the persisted model and append it to latest_scores.csv.
+
+        :return: Dictionary with the scored date, target and prediction
+        """
+        persisted = load_model(self.pipeline)
+        processed_data = read_dated_csv(self.pipeline.path('processed_data.csv'))
+        latest = processed_data[persisted['features']].iloc[[-1]]
+        score = {'Date': latest.index[0].strftime('%Y-%m-%d'), 'target': persisted['target_col'],
+                 'prediction': float(persisted['model'].predict(latest)[0]),
+                 'scored_at': datetime.now(timezone.utc).isoformat()}
+        path = self.pipeline.path(self.SCORES_FILE)
+        pd.DataFrame([score]).to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+        logging.info(f"Scored {score['Date']} for {score['target']}: {score['prediction']}")
+        return score
+
+    async def poll_once(self):
+        """
+        Run one poll: detect changed series, fetch them, refresh the processed data and re-score.
+
+        :return: List of the series that were refreshed (empty when nothing changed)
+        """
+        polled_at = datetime.now(timezone.utc).isoformat()
+        changed_fred, yahoo_last_date = await self._changed_series()
+        refreshed = list(changed_fred)
+
+        if changed_fred:
+            await self._fetch_fred(list(changed_fred))
+        if yahoo_last_date is not None:
+            ticker = self.pipeline.config['fetch']['yahoo_ticker']
+            await asyncio.to_thread(self.yahoo_manager.get_data, ticker, self.pipeline.path('yahoo_data.csv'))
+            refreshed.append(ticker)
+
+        if refreshed:
+            logging.info(f"New releases for {refreshed}, refreshing processed data")
+            # The fetch stage's outputs were updated in place; without this it would look stale and download
+            # every series again. What was built from them has to be rebuilt, even outputs with no record yet.
+            self.pipeline.mark_up_to_date('fetch')
+            await asyncio.to_thread(self.pipeline.run, until='process', force=['fuse', 'process'])
+            if os.path.exists(self.pipeline.path('model.pkl')):
+                await asyncio.to_thread(self.score_latest)
+        else:
+            logging.info("No new releases")
+
+        self.state['last_poll'] = polled_at
+        self.state['last_updated'].update(changed_fred)
+        if yahoo_last_date is not None:
+            self.state['yahoo_last_date'] = yahoo_last_date
+        self._save_state()
+        return refreshed
+
+    async def run(self, stop_event=None):
+        """
+        Poll every `interval` seconds until stop_event is set. Errors in a poll are logged and the loop goes on.
+        """
+        stop_event = stop_event or asyncio.Event()
+        while not stop_event.is_set():
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logging.error(f"Refresh poll failed: {e}")
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
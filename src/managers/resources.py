@@ -0,0 +1,137 @@
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+# Child processes inherit the core budget through this environment variable.
+CORES_ENV_VAR = 'CAPSTONE_CORES'
+
+
+def available_cores():
+    """
+    :return: Number of cores this process may run on (respects CPU affinity, e.g. under taskset or cgroups)
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+@contextmanager
+def limit_blas(threads):
+    """
+    Cap the threads of the BLAS/OpenMP libraries numpy and scipy use, for the duration of the block.
+    """
+    from threadpoolctl import threadpool_limits
+
+    with threadpool_limits(limits=threads):
+        yield
+
+
+class ResourceManager:
+    """
+    Single source of the process' core budget. Every component that runs threads asks it how many to use:
+    XGBoostModel sizes XGBoost's n_jobs with threads(), and fold, search and loader pools are created with
+    thread_pool() / process_pool(), which split the budget between their workers so that pool workers x
+    XGBoost threads x BLAS threads never exceeds the cores we were given.
+
+    :param cores: Number of cores to use (default: $CAPSTONE_CORES, else every available core)
+    """
+
+    def __init__(self, cores=None):
+        self.cores = max(1, int(cores or os.environ.get(CORES_ENV_VAR) or available_cores()))
+        self._local = threading.local()
+
+    def threads(self):
+        """
+        :return: Threads the calling thread may use, i.e. its share of the budget inside a pool worker
+        """
+        return getattr(self._local, 'threads', self.cores)
+
+    def split(self, n_tasks, max_workers=None):
+        """
+        Divide the calling thread's budget between parallel tasks.
+
+        :param n_tasks: Number of tasks to run
+        :param max_workers: Upper bound on the number of workers
+        :return: Tuple of (number of workers, threads per worker)
+        """
+        budget = self.threads()
+        workers = max(1, min(n_tasks, budget, max_workers or budget))
+        return workers, max(1, budget // workers)
+
+    def _set_threads(self, threads):
+        self._local.threads = threads
+
+    @contextmanager
+    def thread_pool(self, n_tasks, max_workers=None):
+        """
+        ThreadPoolExecutor whose workers each get an equal share of the budget. BLAS libraries are capped to
+        that share while the pool is open.
+        """
+        workers, per_worker = self.split(n_tasks, max_workers)
+        with limit_blas(per_worker), \
+                ThreadPoolExecutor(max_workers=workers, initializer=self._set_threads, initargs=(per_worker,)) as pool:
+            yield pool
+
+    @contextmanager
+    def process_pool(self, n_tasks, max_workers=None):
+        """
+        ProcessPoolExecutor whose worker processes each run with an equal share of the budget.
+        """
+        workers, per_worker = self.split(n_tasks, max_workers)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_process,
+                                 initargs=(per_worker,)) as pool:
+            yield pool
+
+    def child_env(self, n_children, env=None):
+        """
+        Environment for subprocesses started side by side, each limited to an equal share of the budget.
+
+        :param n_children: Number of subprocesses that will run at the same time
+        :param env: Base environment (default: os.environ)
+        :return: Tuple of (environment dictionary, cores per child)
+        """
+        _, per_child = self.split(n_children)
+        env = dict(os.environ if env is None else env)
+        env[CORES_ENV_VAR] = str(per_child)
+        # Libraries read these at import time, before the child has a chance to call set_cores().
+        for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+            env[name] = str(per_child)
+        return env, per_child
+
+
+_manager = None
+_blas_limits = None
+
+
+def get_manager():
+    """
+    :return: The process-wide ResourceManager
+    """
+    global _manager
+    if _manager is None:
+        _manager = ResourceManager()
+    return _manager
+
+
+def set_cores(cores):
+    """
+    Set the process-wide core budget (the --cores option of the command line tools). Subprocesses inherit it
+    and BLAS libraries are capped to it.
+
+    :param cores: Number of cores, or None for every available core
+    """
+    global _manager, _blas_limits
+    _manager = ResourceManager(cores or available_cores())
+    os.environ[CORES_ENV_VAR] = str(_manager.cores)
+    from threadpoolctl import threadpool_limits
+
+    _blas_limits = threadpool_limits(limits=_manager.cores)
+    logging.debug(f"Using {_manager.cores} cores")
+    return _manager
+
+
+def _init_worker_process(cores):
+    set_cores(cores)
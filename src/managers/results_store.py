@@ -0,0 +1,291 @@
+import warnings
+
+import numpy as np
+
+
+LABEL_FIELDS = ('model', 'scheme', 'target')
+METRICS = ('rmse', 'hit_rate', 'ic')
+
+
+class WalkForwardResults:
+    """
+    Array-backed store of out-of-sample walk-forward predictions. Every row is one prediction, described by
+    categorical labels (model configuration, split scheme, target), the fold id and the date. Labels are kept as
+    integer codes into per-field label lists, and the arrays are preallocated and grown geometrically, so
+    appending a fold is a slice assignment.
+
+    :param capacity: Number of rows to preallocate
+    """
+
+    def __init__(self, capacity=1024):
+        self.size = 0
+        self.labels = {field: [] for field in LABEL_FIELDS}
+        self._codes = {field: np.empty(capacity, dtype=np.int32) for field in LABEL_FIELDS}
+        self._fold = np.empty(capacity, dtype=np.int32)
+        self._date = np.empty(capacity, dtype='datetime64[ns]')
+        self._actual = np.empty(capacity, dtype=np.float64)
+        self._predicted = np.empty(capacity, dtype=np.float64)
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, n_rows):
+        capacity = len(self._fold)
+        if self.size + n_rows <= capacity:
+            return
+        new_capacity = max(2 * capacity, self.size + n_rows)
+        for field in LABEL_FIELDS:
+            self._codes[field] = np.resize(self._codes[field], new_capacity)
+        self._fold = np.resize(self._fold, new_capacity)
+        self._date = np.resize(self._date, new_capacity)
+        self._actual = np.resize(self._actual, new_capacity)
+        self._predicted = np.resize(self._predicted, new_capacity)
+
+    def _code(self, field, label):
+        labels = self.labels[field]
+        if label not in labels:
+            labels.append(label)
+        return labels.index(label)
+
+    def append(self, fold, dates, actual, predicted, model='default', scheme='default', target='default'):
+        """
+        Add the predictions of one fold.
+
+        :param fold: Fold id
+        :param dates: Dates of the test rows
+        :param actual: Realised target values
+        :param predicted: Predicted target values
+        :param model: Label of the model configuration
+        :param scheme: Label of the split scheme (e.g. 'rolling')
+        :param target: Name of the target column
+        """
+        actual = np.asarray(actual, dtype=np.float64)
+        n_rows = len(actual)
+        self._reserve(n_rows)
+        rows = slice(self.size, self.size + n_rows)
+        for field, label in zip(LABEL_FIELDS, (model, scheme, target)):
+            self._codes[field][rows] = self._code(field, label)
+        self._fold[rows] = fold
+        self._date[rows] = np.asarray(dates, dtype='datetime64[ns]')
+        self._actual[rows] = actual
+        self._predicted[rows] = np.asarray(predicted, dtype=np.float64)
+        self.size += n_rows
+
+    def codes(self, field):
+        return self._codes[field][:self.size]
+
+    @property
+    def fold(self):
+        return self._fold[:self.size]
+
+    @property
+    def date(self):
+        return self._date[:self.size]
+
+    @property
+    def actual(self):
+        return self._actual[:self.size]
+
+    @property
+    def predicted(self):
+        return self._predicted[:self.size]
+
+    def column(self, field):
+        """
+        :return: Array of the values of a field; label fields are decoded to their labels
+        """
+        if field in LABEL_FIELDS:
+            return np.asarray(self.labels[field], dtype=object)[self.codes(field)]
+        return getattr(self, field)
+
+    def select(self, **filters):
+        """
+        Return a new store with the rows matching every filter, e.g. select(scheme='rolling', fold=[0, 1]).
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for field, wanted in filters.items():
+            wanted = np.atleast_1d(wanted)
+            if field in LABEL_FIELDS:
+                wanted_codes = [self.labels[field].index(label) for label in wanted if label in self.labels[field]]
+                mask &= np.isin(self.codes(field), wanted_codes)
+            else:
+                mask &= np.isin(getattr(self, field), wanted)
+        n_rows = int(mask.sum())
+        subset = WalkForwardResults(capacity=max(n_rows, 1))
+        subset.labels = {field: list(labels) for field, labels in self.labels.items()}
+        for field in LABEL_FIELDS:
+            subset._codes[field][:n_rows] = self.codes(field)[mask]
+        subset._fold[:n_rows] = self.fold[mask]
+        subset._date[:n_rows] = self.date[mask]
+        subset._actual[:n_rows] = self.actual[mask]
+        subset._predicted[:n_rows] = self.predicted[mask]
+        subset.size = n_rows
+        return subset
+
+    def extend(self, other):
+        """
+        Append every row of another store, remapping its label codes.
+        """
+        self._reserve(len(other))
+        rows = slice(self.size, self.size + len(other))
+        for field in LABEL_FIELDS:
+            # Only labels that actually occur in the other store are registered.
+            mapping = np.zeros(len(other.labels[field]), dtype=np.int32)
+            for code in np.unique(other.codes(field)):
+                mapping[code] = self._code(field, other.labels[field][code])
+            self._codes[field][rows] = mapping[other.codes(field)]
+        self._fold[rows] = other.fold
+        self._date[rows] = other.date
+        self._actual[rows] = other.actual
+        self._predicted[rows] = other.predicted
+        self.size += len(other)
+
+    def save(self, path):
+        """
+        Persist the store to a compressed .npz file.
+        """
+        arrays = {f'{field}_code': self.codes(field) for field in LABEL_FIELDS}
+        arrays.update({f'{field}_labels': np.asarray(self.labels[field], dtype=str) for field in LABEL_FIELDS})
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, fold=self.fold, date=self.date.astype(np.int64), actual=self.actual,
+                                predicted=self.predicted, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a store written by save().
+        """
+        with np.load(path) as data:
+            store = cls(capacity=max(len(data['fold']), 1))
+            store.size = len(data['fold'])
+            for field in LABEL_FIELDS:
+                store.labels[field] = [str(label) for label in data[f'{field}_labels']]
+                store._codes[field][:store.size] = data[f'{field}_code']
+            store._fold[:store.size] = data['fold']
+            store._date[:store.size] = data['date'].astype('datetime64[ns]')
+            store._actual[:store.size] = data['actual']
+            store._predicted[:store.size] = data['predicted']
+        return store
+
+    def to_frame(self):
+        """
+        :return: pandas DataFrame with one row per prediction
+        """
+        import pandas as pd
+        columns = {field: self.column(field) for field in LABEL_FIELDS}
+        columns.update(fold=self.fold, Date=self.date, actual=self.actual, predicted=self.predicted)
+        return pd.DataFrame(columns)
+
+    def _groups(self, by):
+        columns = [self.codes(field) if field in LABEL_FIELDS else getattr(self, field).view(np.int64)
+                   if field == 'date' else getattr(self, field) for field in by]
+        keys = np.column_stack(columns) if columns else np.zeros((self.size, 1), dtype=np.int64)
+        unique_keys, group = np.unique(keys, axis=0, return_inverse=True)
+        return unique_keys, group.ravel()
+
+    def metrics(self, by=('model', 'scheme', 'target', 'fold'), n_bootstrap=0, confidence=0.95, seed=0):
+        """
+        Compute RMSE, hit rate (share of predictions with the same sign as the actual value, meaningful for
+        return targets) and information coefficient (Pearson correlation of predicted and actual values) for
+        every group, all groups at once.
+
+        :param by: Fields to group by
+        :param n_bootstrap: Number of bootstrap resamples used for confidence intervals (0 disables them)
+        :param confidence: Confidence level of the bootstrap intervals
+        :param seed: Seed of the bootstrap random generator
+        :return: pandas DataFrame with one row per group
+        """
+        import pandas as pd
+
+        by = list(by)
+        unique_keys, group = self._groups(by)
+        n_groups = len(unique_keys)
+        values = group_metrics(group, self.actual, self.predicted, n_groups)
+
+        result = {}
+        for position, field in enumerate(by):
+            column = unique_keys[:, position]
+            if field in LABEL_FIELDS:
+                column = np.asarray(self.labels[field], dtype=object)[column]
+            elif field == 'date':
+                column = column.astype('datetime64[ns]')
+            result[field] = column
+        result['n'] = np.bincount(group, minlength=n_groups)
+        result.update(values)
+
+        if n_bootstrap:
+            lower, upper = bootstrap_intervals(group, self.actual, self.predicted, n_groups, n_bootstrap,
+                                               confidence, seed)
+            for metric in METRICS:
+                result[f'{metric}_lower'] = lower[metric]
+                result[f'{metric}_upper'] = upper[metric]
+        return pd.DataFrame(result)
+
+
+def group_metrics(group, actual, predicted, n_groups):
+    """
+    Vectorized per-group RMSE, hit rate and information coefficient.
+
+    :param group: Group id of every row (0 .. n_groups - 1); may be 2-D to evaluate several resamples at once
+    :param actual: Realised values, same shape as group
+    :param predicted: Predicted values, same shape as group
+    :param n_groups: Total number of groups
+    :return: Dictionary mapping metric name to an array of length n_groups
+    """
+    group = np.ravel(group)
+    actual = np.ravel(actual)
+    predicted = np.ravel(predicted)
+    # Centering on the global means keeps the sums of squares well conditioned.
+    a = actual - actual.mean()
+    p = predicted - predicted.mean()
+
+    def sums(weights):
+        return np.bincount(group, weights=weights, minlength=n_groups)
+
+    n = np.bincount(group, minlength=n_groups).astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rmse = np.sqrt(sums((actual - predicted) ** 2) / n)
+        hit_rate = sums((np.sign(actual) == np.sign(predicted)).astype(float)) / n
+        sum_a, sum_p = sums(a), sums(p)
+        covariance = n * sums(a * p) - sum_a * sum_p
+        variance_a = n * sums(a * a) - sum_a ** 2
+        variance_p = n * sums(p * p) - sum_p ** 2
+        ic = covariance / np.sqrt(variance_a * variance_p)
+    ic[(n < 2) | (variance_a <= 0) | (variance_p <= 0)] = np.nan
+    return {'rmse': rmse, 'hit_rate': hit_rate, 'ic': ic}
+
+
+def bootstrap_intervals(group, actual, predicted, n_groups, n_bootstrap=1000, confidence=0.95, seed=0,
+                        batch_size=None):
+    """
+    Percentile bootstrap confidence intervals of the per-group metrics. Rows are resampled with replacement
+    within their group; resamples are evaluated in batches with a single bincount per metric.
+
+    :return: Tuple of (lower, upper) dictionaries mapping metric name to an array of length n_groups
+    """
+    rng = np.random.default_rng(seed)
+    order = np.argsort(group, kind='stable')
+    sorted_group = group[order]
+    sizes = np.bincount(sorted_group, minlength=n_groups)
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    n_rows = len(group)
+    batch_size = batch_size or max(1, min(n_bootstrap, 2_000_000 // max(n_rows, 1)))
+
+    draws = {metric: [] for metric in METRICS}
+    for start in range(0, n_bootstrap, batch_size):
+        batch = min(batch_size, n_bootstrap - start)
+        picks = offsets[sorted_group] + (rng.random((batch, n_rows)) * sizes[sorted_group]).astype(np.int64)
+        rows = order[picks]
+        batch_group = sorted_group + n_groups * np.arange(batch)[:, None]
+        values = group_metrics(batch_group, actual[rows], predicted[rows], n_groups * batch)
+        for metric in METRICS:
+            draws[metric].append(values[metric].reshape(batch, n_groups))
+
+    alpha = (1 - confidence) / 2
+    lower, upper = {}, {}
+    for metric in METRICS:
+        with warnings.catch_warnings():
+            # Groups too small for a metric (e.g. IC of a single row) are NaN in every resample.
+            warnings.simplefilter('ignore', RuntimeWarning)
+            lower[metric], upper[metric] = np.nanquantile(np.vstack(draws[metric]), [alpha, 1 - alpha], axis=0)
+    return lower, upper
@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+
+class LocalStore:
+    """
+    Offline experiment store: one directory per run holding params.json, metrics.jsonl (one JSON record per
+    line) and an artifacts/ folder. Every batch is written with a single append.
+
+    :param root: Directory holding the run directories
+    :param run_id: Name of this run's directory
+    """
+
+    def __init__(self, root, run_id):
+        self.run_dir = os.path.join(root, run_id)
+        os.makedirs(os.path.join(self.run_dir, 'artifacts'), exist_ok=True)
+        self.params = {}
+
+    def write(self, params, metrics, artifacts):
+        if params:
+            self.params.update(params)
+            with open(os.path.join(self.run_dir, 'params.json.tmp'), 'w') as f:
+                json.dump(self.params, f, indent=2, sort_keys=True, default=str)
+            os.replace(os.path.join(self.run_dir, 'params.json.tmp'), os.path.join(self.run_dir, 'params.json'))
+        if metrics:
+            with open(os.path.join(self.run_dir, 'metrics.jsonl'), 'a') as f:
+                f.write(''.join(json.dumps(record, default=str) + '\n' for record in metrics))
+        for path, name in artifacts:
+            shutil.copy2(path, os.path.join(self.run_dir, 'artifacts', name))
+
+    def close(self):
+        pass
+
+
+class WandbStore:
+    """
+    Weights & Biases backend. wandb is only imported when this backend is used; mode='offline' (the default)
+    writes to the local wandb directory for a later `wandb sync`.
+    """
+
+    def __init__(self, run_id, project='principal-capstone', mode='offline', **init_kwargs):
+        import wandb
+
+        self.wandb = wandb
+        self.run = wandb.init(project=project, name=run_id, mode=mode, **init_kwargs)
+
+    def write(self, params, metrics, artifacts):
+        if params:
+            self.run.config.update(params, allow_val_change=True)
+        for record in metrics:
+            record = dict(record)
+            step = record.pop('step', None)
+            record.pop('time', None)
+            self.run.log(record, step=step)
+        for path, name in artifacts:
+            self.run.save(path, policy='now')
+
+    def close(self):
+        self.run.finish()
+
+
+BACKENDS = {'local': LocalStore, 'wandb': WandbStore}
+
+
+class ExperimentTracker:
+    """
+    Non-blocking experiment tracker. log_params, log_metrics and log_artifact only put the record on a queue; a
+    background thread drains the queue and hands the records to the backend in batches, at most every
+    flush_interval seconds. A slow or unreachable backend therefore never stalls the fold loop, and backend
+    errors are logged instead of raised.
+
+    :param root: Directory of the local store (run directories are created inside it)
+    :param backend: 'local' (default, offline) or 'wandb'
+    :param run_id: Name of the run (default: UTC timestamp plus a random suffix)
+    :param flush_interval: Seconds between batched writes
+    :param backend_kwargs: Extra arguments of the backend, e.g. {'project': ..., 'mode': 'online'} for wandb
+    """
+
+    def __init__(self, root, backend='local', run_id=None, flush_interval=1.0, backend_kwargs=None):
+        self.run_id = run_id or f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.flush_interval = flush_interval
+        self.overhead = 0.0
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition()
+        self._n_enqueued = 0
+        self._n_written = 0
+        if backend == 'local':
+            self.store = LocalStore(root, self.run_id)
+        elif backend in BACKENDS:
+            self.store = BACKENDS[backend](self.run_id, **(backend_kwargs or {}))
+        else:
+            raise ValueError(f"Unknown tracking backend {backend!r}, expected one of {sorted(BACKENDS)}")
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer, name=f"tracker-{self.run_id}", daemon=True)
+        self._thread.start()
+
+    def _put(self, kind, payload):
+        start = time.perf_counter()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The tracker is closed")
+            self._n_enqueued += 1
+            n_enqueued = self._n_enqueued
+            self._queue.put((kind, payload))
+            self.overhead += time.perf_counter() - start
+        return n_enqueued
+
+    def log_params(self, params):
+        """
+        Record run parameters (model configuration, split settings, ...).
+        """
+        self._put('params', dict(params))
+
+    def log_metrics(self, metrics, step=None):
+        """
+        Record a dictionary of metrics, e.g. {'fold': 3, 'rmse': 1.2}.
+
+        :param step: Optional step (fold number, boosting round, ...) the metrics belong to
+        """
+        record = dict(metrics, time=time.time())
+        if step is not None:
+            record['step'] = step
+        self._put('metrics', record)
+
+    def log_artifact(self, path, name=None):
+        """
+        Record a file. It is copied when the batch is written, so it must not be removed before flush().
+        """
+        self._put('artifact', (os.path.abspath(path), name or os.path.basename(path)))
+
+    def _writer(self):
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Gather whatever else arrives before the deadline into the same batch.
+            while batch[-1][0] not in ('flush', 'stop'):
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            stop = any(kind == 'stop' for kind, _ in batch)
+            records = [(kind, payload) for kind, payload in batch if kind not in ('flush', 'stop')]
+            params = {}
+            for kind, payload in records:
+                if kind == 'params':
+                    params.update(payload)
+            try:
+                self.store.write(params, [payload for kind, payload in records if kind == 'metrics'],
+                                 [payload for kind, payload in records if kind == 'artifact'])
+            except Exception as e:
+                logging.error(f"Experiment tracker failed to write {len(records)} records: {e}")
+            with self._flushed:
+                self._n_written += len(batch)
+                self._flushed.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Block until everything logged so far has been written.
+
+        :return: False if the timeout expired first
+        """
+        target = self._put('flush', None)
+        with self._flushed:
+            return self._flushed.wait_for(lambda: self._n_written >= target, timeout=timeout)
+
+    def close(self, timeout=None):
+        """
+        Write the remaining records and stop the background thread.
+        """
+        if self._closed:
+            return
+        self._put('stop', None)
+        with self._lock:
+            self._closed = True
+        self._thread.join(timeout)
+        try:
+            self.store.close()
+        except Exception as e:
+            logging.error(f"Experiment tracker failed to close its backend: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
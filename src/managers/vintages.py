@@ -0,0 +1,223 @@
+import logging
+import os
+
+import numpy as np
+
+
+# ALFRED's realtime period covering every vintage, and the end date it gives values that are still current.
+REALTIME_START = '1776-07-04'
+REALTIME_END = '9999-12-31'
+_OPEN_END = np.datetime64(REALTIME_END, 'D')
+
+
+def _days(values):
+    return np.asarray(values, dtype='datetime64[D]')
+
+
+class SeriesVintages:
+    """
+    Revision history of one FRED series as published by ALFRED: one record per (observation date, value) with
+    the first and last day (inclusive) that value was the published one. A record is only added when a release
+    changes a value, so the history is the delta between successive vintages rather than a copy of each.
+
+    Records are sorted by observation date, then by vintage, and indexed by a composite (observation, vintage)
+    key. The value known on day D for an observation is its last record starting on or before D, provided that
+    record had not been superseded or withdrawn by D, so an as-of query is one vectorised binary search per
+    observation, O(observations x log(records)) whatever the number of vintages, and its result is already in
+    date order.
+
+    :param dates: Observation date of every record
+    :param realtime_start: First day each record was the published value
+    :param realtime_end: Last day each record was the published value (9999-12-31 while still current)
+    :param values: Published values (NaN for FRED's missing '.')
+    """
+
+    def __init__(self, dates, realtime_start, realtime_end, values):
+        dates, realtime_start, realtime_end = _days(dates), _days(realtime_start), _days(realtime_end)
+        values = np.asarray(values, dtype=np.float64)
+        order = np.lexsort((realtime_start, dates))
+        self.dates = dates[order]
+        self.realtime_start = realtime_start[order]
+        self.realtime_end = realtime_end[order]
+        self.values = values[order]
+        # Composite key (observation rank, vintage day): the records of an observation form one sorted run.
+        self.observations, rank = np.unique(self.dates, return_inverse=True)
+        self._rank = rank.astype(np.int64)
+        self._key = (self._rank << 32) + (self.realtime_start.astype(np.int64) + (1 << 31))
+        # pandas indexes are in nanoseconds; converting once keeps that out of every query.
+        self._index_dates = self.dates.astype('datetime64[ns]')
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        :param frame: pandas DataFrame with the 'date', 'realtime_start', 'realtime_end' and 'value' columns of
+                      ALFRED's observations (as returned by FREDDataManager.get_vintages)
+        """
+        import pandas as pd
+
+        return cls(frame['date'].to_numpy(dtype=str), frame['realtime_start'].to_numpy(dtype=str),
+                   frame['realtime_end'].to_numpy(dtype=str), pd.to_numeric(frame['value'], errors='coerce'))
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nbytes(self):
+        return self.dates.nbytes + self.realtime_start.nbytes + self.realtime_end.nbytes + self.values.nbytes
+
+    def vintage_dates(self):
+        """
+        :return: Sorted array of the days a release changed the series
+        """
+        return np.unique(self.realtime_start)
+
+    def known_records(self, date, start=None, end=None):
+        """
+        :param date: Day of the query; releases published after it are ignored
+        :param start: First observation date to return (default: the first one)
+        :param end: Last observation date to return (default: the last one)
+        :return: Array of the positions of the records that were the published values on date, in date order
+        """
+        date = np.datetime64(date, 'D')
+        lo = 0 if start is None else np.searchsorted(self.observations, np.datetime64(start, 'D'), side='left')
+        hi = len(self.observations) if end is None else np.searchsorted(self.observations,
+                                                                        np.datetime64(end, 'D'), side='right')
+        ranks = np.arange(lo, hi, dtype=np.int64)
+        # Last record of each observation starting on or before the day of the query.
+        records = np.searchsorted(self._key, (ranks << 32) + (date.astype(np.int64) + (1 << 31)), side='right') - 1
+        # An observation not yet published lands on the previous observation's records (or before the first).
+        records = records[(records >= 0) & (self._rank[records] == ranks)]
+        return records[self.realtime_end[records] >= date]
+
+    def as_of(self, date, start=None, end=None):
+        """
+        The series as it was known on a given day; see known_records for the arguments.
+
+        :return: pandas Series of the values published as of date, indexed by observation date
+        """
+        import pandas as pd
+
+        records = self.known_records(date, start, end)
+        return pd.Series(self.values[records], index=pd.DatetimeIndex(self._index_dates[records], name='Date'))
+
+    def latest(self):
+        """
+        :return: The series with every revision applied, as fred_data.csv holds it
+        """
+        return self.as_of(_OPEN_END)
+
+    def encode(self):
+        """
+        Delta-encode the records for storage: observation dates as gaps from the previous record, vintage starts
+        as the lag after the observation date and ends as the length of the validity period (-1 while current).
+        The integers are small and repetitive, so they compress to a fraction of the decoded arrays.
+
+        :return: Dictionary of arrays
+        """
+        dates = self.dates.astype(np.int64)
+        start = self.realtime_start.astype(np.int64)
+        end = self.realtime_end.astype(np.int64)
+        first = dates[0] if len(dates) else 0
+        return {'first_date': np.array([first]),
+                'date_gap': np.diff(dates, prepend=first).astype(np.int32),
+                'start_lag': (start - dates).astype(np.int32),
+                'length': np.where(self.realtime_end == _OPEN_END, -1, end - start).astype(np.int32),
+                'values': self.values}
+
+    @classmethod
+    def decode(cls, arrays):
+        dates = arrays['first_date'][0] + np.cumsum(arrays['date_gap'].astype(np.int64))
+        start = dates + arrays['start_lag']
+        end = np.where(arrays['length'] < 0, _OPEN_END.astype(np.int64), start + arrays['length'])
+        return cls(dates.astype('datetime64[D]'), start.astype('datetime64[D]'), end.astype('datetime64[D]'),
+                   arrays['values'])
+
+
+class VintageStore:
+    """
+    Directory of delta-encoded revision histories, one compressed <series id>.vintages.npz per series, kept
+    next to the FRED cache. Loaded series stay in memory, so repeated as-of queries (one per fold, say) only pay
+    for the query.
+
+    :param directory: Store directory (created if missing)
+    """
+
+    SUFFIX = '.vintages.npz'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._loaded = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, series_id):
+        return os.path.join(self.directory, series_id + self.SUFFIX)
+
+    def series_ids(self):
+        return sorted(name[:-len(self.SUFFIX)] for name in os.listdir(self.directory) if name.endswith(self.SUFFIX))
+
+    def save(self, series_id, vintages):
+        with open(self._path(series_id) + '.tmp', 'wb') as f:
+            np.savez_compressed(f, **vintages.encode())
+        os.replace(self._path(series_id) + '.tmp', self._path(series_id))
+        self._loaded[series_id] = vintages
+
+    def load(self, series_id):
+        """
+        :return: SeriesVintages of a series
+        """
+        if series_id not in self._loaded:
+            with np.load(self._path(series_id)) as arrays:
+                self._loaded[series_id] = SeriesVintages.decode(arrays)
+        return self._loaded[series_id]
+
+    def fetch(self, fred_manager, series_ids, start_date=None):
+        """
+        Download the full revision history of every series from ALFRED and store it. Series that fail are logged
+        and skipped.
+
+        :param fred_manager: FREDDataManager
+        :param series_ids: List of FRED series IDs
+        :param start_date: First observation date to keep
+        :return: Dictionary of series ID -> error message, for the series that failed
+        """
+        failed = {}
+        for series_id in series_ids:
+            try:
+                vintages = SeriesVintages.from_frame(fred_manager.get_vintages(series_id, start_date=start_date))
+            except Exception as e:
+                logging.error(f"Error fetching the vintages of {series_id}: {e}")
+                failed[series_id] = str(e)
+                continue
+            self.save(series_id, vintages)
+            logging.info(f"Stored {len(vintages)} revision records of {series_id}")
+        return failed
+
+    def as_of(self, series_ids, date, start=None, end=None):
+        """
+        Panel of several series as they were known on a given day.
+
+        :param series_ids: List of series IDs in the store
+        :param date: Day of the query
+        :param start: First observation date (default: each series' first)
+        :param end: Last observation date (default: each series' last)
+        :return: pandas DataFrame indexed by observation date, one column per series
+        """
+        import pandas as pd
+
+        columns = {series_id: self.load(series_id).as_of(date, start, end) for series_id in series_ids}
+        return pd.concat(columns, axis=1) if columns else pd.DataFrame()
+
+    def fold_panels(self, series_ids, index, bounds):
+        """
+        Point-in-time data of walk-forward folds: for every (train_start, train_end, test_start, test_end) bound,
+        the panel as known on the date of the fold's last training row, i.e. every observation the fold could
+        have been trained on.
+
+        :param series_ids: List of series IDs in the store
+        :param index: DatetimeIndex the bounds refer to (e.g. the processed data's)
+        :param bounds: List of positional bounds, as written by the split stage
+        :return: Generator of (fold, as-of date, panel) tuples
+        """
+        for fold, (train_start, train_end, _, _) in enumerate(bounds):
+            known_on = index[train_end - 1]
+            yield fold, known_on, self.as_of(series_ids, known_on, end=known_on)
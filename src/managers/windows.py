@@ -0,0 +1,182 @@
+import queue
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class WindowBuilder:
+    """
+    Lag features and rolling windows over a date-indexed frame, for sequence models. The frame is copied once
+    into a contiguous (rows x features) array; windows and lags are read-only strided views of it, so their
+    memory does not grow with the lookback. Only the batches handed to a model are materialised.
+
+    Sample i is the window of the `lookback` rows ending at row i + lookback - 1, and its target is the target
+    column `horizon` rows after that.
+
+    :param data: pandas DataFrame (or 2-D array) of features
+    :param target: Target values aligned with the rows of data (pandas Series, array or column name)
+    :param horizon: Rows between the last row of a window and its target
+    :param dtype: dtype of the contiguous array (float32 halves memory for deep learning frameworks)
+    """
+
+    def __init__(self, data, target=None, horizon=0, dtype=np.float32):
+        if isinstance(target, str):
+            target = data[target]
+        self.columns = list(data.columns) if hasattr(data, 'columns') else None
+        self.index = data.index if hasattr(data, 'index') else None
+        self.values = np.ascontiguousarray(np.asarray(data, dtype=dtype))
+        self.values.flags.writeable = False
+        self.target = None
+        if target is not None:
+            self.target = np.ascontiguousarray(np.asarray(target, dtype=dtype))
+            self.target.flags.writeable = False
+            if len(self.target) != len(self.values):
+                raise ValueError("target must have one value per row of data")
+        self.horizon = horizon
+        # Running count of rows with a missing value, so that any window can be checked in O(1).
+        self._missing = np.concatenate([[0], np.cumsum(np.isnan(self.values).any(axis=1))])
+
+    @property
+    def n_rows(self):
+        return len(self.values)
+
+    def n_samples(self, lookback):
+        return max(0, self.n_rows - lookback + 1 - self.horizon)
+
+    def windows(self, lookback):
+        """
+        :return: Read-only view (samples x lookback x features); windows[i, -1] is row i + lookback - 1
+        """
+        if not 1 <= lookback <= self.n_rows:
+            raise ValueError(f"lookback must be between 1 and {self.n_rows}")
+        view = sliding_window_view(self.values, lookback, axis=0).transpose(0, 2, 1)
+        return view[:self.n_samples(lookback)]
+
+    def lags(self, max_lag):
+        """
+        :return: Read-only view (samples x max_lag + 1 x features); lags[i, k] is row i + max_lag - k, i.e.
+                 lag k of the sample's last row (lag 0 is the row itself)
+        """
+        return self.windows(max_lag + 1)[:, ::-1, :]
+
+    def targets(self, lookback):
+        """
+        :return: Read-only view of the target of every sample
+        """
+        if self.target is None:
+            raise ValueError("No target was given")
+        return self.target[lookback - 1 + self.horizon:][:self.n_samples(lookback)]
+
+    def dates(self, lookback):
+        """
+        :return: Date of the last row of every sample's window
+        """
+        return self.index[lookback - 1:][:self.n_samples(lookback)]
+
+    def valid(self, lookback):
+        """
+        :return: Boolean array telling which samples have no missing value in their window or target
+        """
+        n = self.n_samples(lookback)
+        ok = (self._missing[lookback:lookback + n] - self._missing[:n]) == 0
+        if self.target is not None:
+            ok &= ~np.isnan(self.targets(lookback))
+        return ok
+
+    def sample_range(self, lookback, start, end):
+        """
+        :param start: First row (position in data) a sample's window may end on
+        :param end: Row position the windows must end before, e.g. a fold's train bounds
+        :return: Array of the indices of the valid samples whose window ends in [start, end) and whose target
+                 row is also before end
+        """
+        samples = np.arange(self.n_samples(lookback))
+        last_row = samples + lookback - 1
+        keep = (last_row >= start) & (last_row + self.horizon < end) & self.valid(lookback)
+        return samples[keep]
+
+    def batches(self, lookback, batch_size=256, samples=None, shuffle=False, seed=None, prefetch=2):
+        """
+        Batched generator over samples; see BatchGenerator.
+        """
+        return BatchGenerator(self, lookback, batch_size, samples, shuffle, seed, prefetch)
+
+
+class BatchGenerator:
+    """
+    Iterates over (X, y) batches of a WindowBuilder, with X a (batch x lookback x features) array gathered from
+    the windows view. A background thread assembles up to `prefetch` batches ahead, so the gather overlaps with
+    the model consuming the previous batch. Errors raised while assembling are re-raised in the consumer.
+
+    :param builder: WindowBuilder
+    :param lookback: Rows per window
+    :param batch_size: Samples per batch (the last batch may be smaller)
+    :param samples: Indices of the samples to iterate over (default: every valid sample)
+    :param shuffle: Visit the samples in a random order, reshuffled on every iteration
+    :param seed: Seed of the shuffling
+    :param prefetch: Number of batches assembled ahead
+    """
+
+    _DONE = object()
+
+    def __init__(self, builder, lookback, batch_size=256, samples=None, shuffle=False, seed=None, prefetch=2):
+        self.builder = builder
+        self.lookback = lookback
+        self.batch_size = batch_size
+        self.samples = np.flatnonzero(builder.valid(lookback)) if samples is None else np.asarray(samples)
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.prefetch = prefetch
+
+    def __len__(self):
+        return -(-len(self.samples) // self.batch_size)
+
+    def _batches(self):
+        windows = self.builder.windows(self.lookback)
+        targets = self.builder.targets(self.lookback) if self.builder.target is not None else None
+        order = self.rng.permutation(self.samples) if self.shuffle else self.samples
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            yield windows[indices], targets[indices] if targets is not None else None
+
+    @staticmethod
+    def _put(out, item, stop):
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _producer(self, out, stop):
+        try:
+            for batch in self._batches():
+                if not self._put(out, batch, stop):
+                    return
+            item = self._DONE
+        except Exception as e:
+            item = e
+        self._put(out, item, stop)
+
+    def __iter__(self):
+        if self.prefetch <= 0:
+            yield from self._batches()
+            return
+        out = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        thread = threading.Thread(target=self._producer, args=(out, stop), name='batch-prefetch', daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = out.get()
+                if item is self._DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Also reached when the consumer stops early; the producer notices and exits.
+            stop.set()
+            thread.join()
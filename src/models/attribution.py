@@ -0,0 +1,102 @@
+import numpy as np
+
+from managers.resources import get_manager
+
+
+class Attributions:
+    """
+    Per-date x per-feature SHAP contributions of a walk-forward run, stored as compact float32 arrays.
+
+    :param dates: Date of every explained prediction
+    :param folds: Fold id of every explained prediction
+    :param feature_names: Names of the feature columns
+    :param values: Array (rows x features) of contributions; features a fold did not use are 0
+    :param bias: Array (rows,) of the bias term of every prediction
+    :param interactions: Optional array (rows x features x features) of interaction values
+    """
+
+    def __init__(self, dates, folds, feature_names, values, bias, interactions=None):
+        self.dates = np.asarray(dates, dtype='datetime64[ns]')
+        self.folds = np.asarray(folds, dtype=np.int32)
+        self.feature_names = list(feature_names)
+        self.values = values
+        self.bias = bias
+        self.interactions = interactions
+
+    def summary(self):
+        """
+        :return: pandas DataFrame with the mean absolute, mean and standard deviation of every feature's
+                 contribution, sorted by mean absolute contribution
+        """
+        import pandas as pd
+        summary = pd.DataFrame({'mean_abs': np.abs(self.values).mean(axis=0), 'mean': self.values.mean(axis=0),
+                                'std': self.values.std(axis=0)}, index=pd.Index(self.feature_names, name='feature'))
+        return summary.sort_values('mean_abs', ascending=False)
+
+    def to_frame(self):
+        """
+        :return: pandas DataFrame of contributions indexed by date, with a 'bias' column
+        """
+        import pandas as pd
+        frame = pd.DataFrame(self.values, index=pd.DatetimeIndex(self.dates, name='Date'), columns=self.feature_names)
+        frame['bias'] = self.bias
+        return frame
+
+    def save(self, path):
+        arrays = {'dates': self.dates.astype(np.int64), 'folds': self.folds, 'values': self.values,
+                  'bias': self.bias, 'feature_names': np.asarray(self.feature_names, dtype=str)}
+        if self.interactions is not None:
+            arrays['interactions'] = self.interactions
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['dates'].astype('datetime64[ns]'), data['folds'], [str(n) for n in data['feature_names']],
+                       data['values'], data['bias'], data['interactions'] if 'interactions' in data else None)
+
+
+def explain_folds(fold_models, X, bounds, interactions=False, n_jobs=None, batch_size=None):
+    """
+    Explain every out-of-sample prediction of a walk-forward run. Each fold's test window is scored in one batched
+    contributions call and folds run in parallel threads (XGBoost releases the GIL while predicting).
+
+    :param fold_models: Fitted XGBoostModel of every fold, in the same order as bounds
+    :param X: pandas DataFrame with every feature column, covering the whole history
+    :param bounds: List of (train_start, train_end, test_start, test_end) positions, one per fold
+    :param interactions: Also compute pairwise interaction values
+    :param n_jobs: Maximum number of folds explained at the same time (default: one per core of the budget)
+    :param batch_size: Rows per contributions call, see XGBoostModel.contributions
+    :return: Attributions covering the test rows of every fold
+    """
+    feature_names = list(X.columns)
+    positions = {name: i for i, name in enumerate(feature_names)}
+
+    def explain(fold):
+        model = fold_models[fold]
+        _, _, test_start, test_end = bounds[fold]
+        used = list(model.model.get_booster().feature_names or feature_names)
+        X_test = X.iloc[test_start:test_end][used]
+        columns = [positions[name] for name in used]
+        contributions = model.contributions(X_test, batch_size=batch_size)
+        fold_values = np.zeros((len(X_test), len(feature_names)), dtype=np.float32)
+        fold_values[:, columns] = contributions[:, :-1]
+        fold_interactions = None
+        if interactions:
+            raw = model.contributions(X_test, interactions=True, batch_size=batch_size)
+            fold_interactions = np.zeros((len(X_test), len(feature_names), len(feature_names)), dtype=np.float32)
+            fold_interactions[np.ix_(np.arange(len(X_test)), columns, columns)] = raw[:, :-1, :-1]
+        return fold_values, contributions[:, -1].astype(np.float32), fold_interactions
+
+    # The pool splits the cores between the folds running at the same time; contributions() uses each share.
+    with get_manager().thread_pool(len(fold_models), n_jobs) as executor:
+        results = list(executor.map(explain, range(len(fold_models))))
+
+    test_rows = [np.arange(test_start, test_end) for _, _, test_start, test_end in bounds]
+    dates = X.index.values[np.concatenate(test_rows)] if test_rows else np.empty(0, dtype='datetime64[ns]')
+    folds = np.concatenate([np.full(len(rows), fold) for fold, rows in enumerate(test_rows)]) if test_rows else []
+    values = np.concatenate([r[0] for r in results]) if results else np.empty((0, len(feature_names)), np.float32)
+    bias = np.concatenate([r[1] for r in results]) if results else np.empty(0, np.float32)
+    interaction_values = np.concatenate([r[2] for r in results]) if interactions and results else None
+    return Attributions(dates, folds, feature_names, values, bias, interaction_values)
@@ -0,0 +1,168 @@
+import json
+
+import numpy as np
+
+
+TRANSFORMS = {
+    'reg:squarederror': None,
+    'reg:squaredlogerror': None,
+    'reg:pseudohubererror': None,
+    'reg:absoluteerror': None,
+    'reg:quantileerror': None,
+    'reg:logistic': 'sigmoid',
+    'binary:logistic': 'sigmoid',
+}
+
+
+class FlatForest:
+    """
+    Boosted trees flattened into contiguous numpy arrays, scored without xgboost. All trees share one set of node
+    arrays; child pointers are global node indices and leaves point to themselves, so a batch of rows walks every
+    tree at once with one gather per level.
+
+    :param feature: Array (nodes,) of the split feature index of every node
+    :param threshold: Array (nodes,) of the split thresholds; a row goes left when x < threshold
+    :param left: Array (nodes,) of the global index of the left child (the node itself for leaves)
+    :param right: Array (nodes,) of the global index of the right child (the node itself for leaves)
+    :param default_left: Array (nodes,) telling where missing values go
+    :param value: Array (nodes,) of the leaf values (0 for split nodes)
+    :param roots: Array (trees,) of the global index of every tree's root
+    :param depth: Maximum depth of the trees
+    :param base_score: Margin added to the sum of the leaves
+    :param transform: None for raw margins, 'sigmoid' for logistic objectives
+    :param feature_names: Names of the input columns, in the order the model was fitted on
+    """
+
+    ARRAYS = ('feature', 'threshold', 'left', 'right', 'default_left', 'value', 'roots')
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots, depth, base_score=0.0,
+                 transform=None, feature_names=None):
+        self.feature = np.ascontiguousarray(feature, dtype=np.int32)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float32)
+        self.left = np.ascontiguousarray(left, dtype=np.int32)
+        self.right = np.ascontiguousarray(right, dtype=np.int32)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.value = np.ascontiguousarray(value, dtype=np.float32)
+        self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+        self.depth = int(depth)
+        self.base_score = float(base_score)
+        self.transform = transform
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+    @classmethod
+    def from_booster(cls, booster, n_trees=None):
+        """
+        Flatten an xgboost Booster.
+
+        :param booster: Fitted xgboost.Booster using the gbtree booster and numerical splits
+        :param n_trees: Only export the first n_trees trees (e.g. up to the best early-stopping iteration)
+        :return: FlatForest
+        """
+        return cls.from_json(booster.save_raw(raw_format='json'), n_trees, booster.feature_names)
+
+    @classmethod
+    def from_json(cls, model_json, n_trees=None, feature_names=None):
+        """
+        Flatten a model saved in xgboost's JSON format (booster.save_raw('json') or a .json model file).
+        """
+        learner = json.loads(model_json)['learner']
+        objective = learner['objective']['name']
+        if objective not in TRANSFORMS:
+            raise ValueError(f"Objective {objective} is not supported by FlatForest")
+        if learner['gradient_booster']['name'] != 'gbtree':
+            raise ValueError("Only the gbtree booster can be flattened")
+        params = learner['learner_model_param']
+        if int(params.get('num_target', 1)) > 1 or int(params.get('num_class', 0)) > 1:
+            raise ValueError("Multi-output models are not supported by FlatForest")
+
+        trees = learner['gradient_booster']['model']['trees'][:n_trees]
+        sizes = [len(tree['left_children']) for tree in trees]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64) if trees else np.empty(0, np.int64)
+
+        def concat(key, dtype):
+            if not trees:
+                return np.empty(0, dtype=dtype)
+            return np.concatenate([np.asarray(tree[key], dtype=dtype) for tree in trees])
+
+        if trees and concat('split_type', np.int32).any():
+            raise ValueError("Categorical splits are not supported by FlatForest")
+        left = concat('left_children', np.int64)
+        right = concat('right_children', np.int64)
+        conditions = concat('split_conditions', np.float32)
+        is_leaf = left == -1
+        node = np.arange(len(left))
+        shift = np.repeat(offsets, sizes)
+        left = np.where(is_leaf, node, left + shift)
+        right = np.where(is_leaf, node, right + shift)
+
+        base_score = float(params['base_score'].strip('[]'))
+        transform = TRANSFORMS[objective]
+        if transform == 'sigmoid':
+            # Logistic objectives store the base score as a probability.
+            base_score = float(np.log(base_score / (1 - base_score)))
+        return cls(feature=np.where(is_leaf, 0, concat('split_indices', np.int64)),
+                   threshold=np.where(is_leaf, 0, conditions), left=left, right=right,
+                   default_left=concat('default_left', np.int8).astype(bool), value=np.where(is_leaf, conditions, 0),
+                   roots=offsets, depth=max((_depth(tree) for tree in trees), default=0), base_score=base_score,
+                   transform=transform, feature_names=feature_names)
+
+    def predict_margin(self, X, batch_size=4096):
+        """
+        :param X: Array (rows x features) with the columns in the order the model was fitted on
+        :param batch_size: Rows walked at once; memory is proportional to batch_size x number of trees
+        :return: Array (rows,) of raw margins
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        margin = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), batch_size):
+            batch = X[start:start + batch_size]
+            rows = np.arange(len(batch))[:, None]
+            node = np.broadcast_to(self.roots, (len(batch), len(self.roots))).copy()
+            for _ in range(self.depth):
+                x = batch[rows, self.feature[node]]
+                go_left = np.where(np.isnan(x), self.default_left[node], x < self.threshold[node])
+                node = np.where(go_left, self.left[node], self.right[node])
+            margin[start:start + batch_size] = self.value[node].sum(axis=1, dtype=np.float64)
+        return margin + self.base_score
+
+    def predict(self, X, batch_size=4096):
+        """
+        Score a batch of rows; matches XGBoostModel.predict within float32 tolerance.
+
+        :param X: Array (rows x features) or pandas DataFrame containing the fitted columns
+        :return: Array (rows,) of predictions
+        """
+        if hasattr(X, 'columns') and self.feature_names is not None:
+            X = X[self.feature_names].to_numpy()
+        margin = self.predict_margin(X, batch_size)
+        if self.transform == 'sigmoid':
+            margin = 1 / (1 + np.exp(-margin))
+        return margin.astype(np.float32)
+
+    def save(self, path):
+        """
+        Persist the arrays to an .npz file that load() reads without xgboost.
+        """
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        meta = {'depth': self.depth, 'base_score': self.base_score, 'transform': self.transform,
+                'feature_names': self.feature_names}
+        with open(path, 'wb') as f:
+            np.savez(f, meta=np.asarray(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(**{name: data[name] for name in cls.ARRAYS}, **meta)
+
+
+def _depth(tree):
+    left, right = tree['left_children'], tree['right_children']
+    depth, level = 0, [0]
+    while True:
+        level = [child for node in level if left[node] != -1 for child in (left[node], right[node])]
+        if not level:
+            return depth
+        depth += 1
@@ -0,0 +1,187 @@
+import numpy as np
+
+
+class Loss:
+    """
+    Base class of the custom XGBoost losses. An instance is both the training objective (called with
+    (y_true, y_pred) like XGBoost's scikit-learn objectives) and, through metric(), the matching evaluation
+    metric. Gradients and hessians are written into buffers allocated on the first boosting round and reused
+    on every later round, so a round allocates nothing. Subclasses keep any extra scratch buffers in
+    underscore attributes, which are dropped when the loss is pickled.
+    """
+
+    name = 'loss'
+
+    def __init__(self):
+        self._grad = None
+        self._hess = None
+
+    def _buffers(self, n_rows):
+        if self._grad is None or len(self._grad) != n_rows:
+            self._grad = np.empty(n_rows, dtype=np.float32)
+            self._hess = np.empty(n_rows, dtype=np.float32)
+        return self._grad, self._hess
+
+    def __call__(self, y_true, y_pred, sample_weight=None):
+        grad, hess = self._buffers(len(y_pred))
+        np.subtract(y_pred, y_true, out=grad)
+        self.gradient(y_true, grad, hess)
+        if sample_weight is not None and len(sample_weight):
+            grad *= sample_weight
+            hess *= sample_weight
+        return grad, hess
+
+    def gradient(self, y_true, grad, hess):
+        """
+        Overwrite grad, which holds the residuals y_pred - y_true on entry, with the gradient and fill hess.
+        """
+        raise NotImplementedError
+
+    def loss(self, y_true, residual):
+        """
+        :return: Array of the per-row losses for the residuals y_pred - y_true
+        """
+        raise NotImplementedError
+
+    def metric(self):
+        """
+        :return: Callable usable as XGBoost's eval_metric, reporting the mean loss under this loss's name
+        """
+        return LossMetric(self)
+
+    def __getstate__(self):
+        # The buffers are scratch space; pickled models should not carry them around.
+        state = self.__dict__.copy()
+        for key in state:
+            if key.startswith('_'):
+                state[key] = None
+        return state
+
+
+class LossMetric:
+    """
+    Mean (optionally weighted) loss of a Loss, in the (y_true, y_pred) form XGBoost expects of eval_metric.
+    """
+
+    def __init__(self, loss):
+        self.loss = loss
+        self.__name__ = loss.name
+
+    def __call__(self, y_true, y_pred, sample_weight=None):
+        y_true = np.asarray(y_true, dtype=np.float64)
+        values = self.loss.loss(y_true, np.asarray(y_pred, dtype=np.float64) - y_true)
+        return float(np.average(values, weights=sample_weight if sample_weight is not None and
+                                len(sample_weight) else None))
+
+
+class PseudoHuberLoss(Loss):
+    """
+    Pseudo-Huber loss delta^2 * (sqrt(1 + (r / delta)^2) - 1): quadratic for small residuals, linear for large
+    ones, so outlying months pull less on the fit (the vectorized form of old_dir/Model.py's huber_approx_obj).
+
+    :param delta: Residual size at which the loss turns from quadratic to linear
+    """
+
+    name = 'pseudo_huber'
+
+    def __init__(self, delta=1.0):
+        super().__init__()
+        self.delta = delta
+        self._scale = None
+
+    def gradient(self, y_true, grad, hess):
+        # With s = 1 + (r / delta)^2: grad = r / sqrt(s) and hess = 1 / (s * sqrt(s)), computed in place.
+        if self._scale is None or len(self._scale) != len(grad):
+            self._scale = np.empty_like(grad)
+        scale = self._scale
+        np.divide(grad, self.delta, out=scale)
+        np.square(scale, out=scale)
+        scale += 1
+        np.sqrt(scale, out=hess)
+        grad /= hess
+        hess *= scale
+        np.reciprocal(hess, out=hess)
+
+    def loss(self, y_true, residual):
+        return self.delta ** 2 * (np.sqrt(1 + (residual / self.delta) ** 2) - 1)
+
+
+class AsymmetricLoss(Loss):
+    """
+    Squared error that weighs over-predictions and under-predictions differently.
+
+    :param over: Weight of residuals where the prediction is above the actual value
+    :param under: Weight of residuals where the prediction is below the actual value
+    """
+
+    name = 'asymmetric'
+
+    def __init__(self, over=1.0, under=2.0):
+        super().__init__()
+        self.over = over
+        self.under = under
+
+    def gradient(self, y_true, grad, hess):
+        np.greater(grad, 0, out=hess)
+        hess *= self.over - self.under
+        hess += self.under
+        grad *= hess
+
+    def loss(self, y_true, residual):
+        return 0.5 * np.where(residual > 0, self.over, self.under) * residual ** 2
+
+
+class ReturnWeightedLoss(Loss):
+    """
+    Squared error weighted by the size of the realised return, so the fit concentrates on the months that move
+    the portfolio. Weights are |y_true|^power, floored so that flat months still count a little.
+
+    :param power: Exponent of the absolute return
+    :param floor: Smallest weight
+    """
+
+    name = 'return_weighted'
+
+    def __init__(self, power=1.0, floor=1e-3):
+        super().__init__()
+        self.power = power
+        self.floor = floor
+
+    def gradient(self, y_true, grad, hess):
+        np.abs(y_true, out=hess)
+        if self.power != 1:
+            np.power(hess, self.power, out=hess)
+        np.maximum(hess, self.floor, out=hess)
+        grad *= hess
+
+    def loss(self, y_true, residual):
+        return 0.5 * np.maximum(np.abs(y_true) ** self.power, self.floor) * residual ** 2
+
+
+OBJECTIVES = {loss.name: loss for loss in (PseudoHuberLoss, AsymmetricLoss, ReturnWeightedLoss)}
+
+
+def resolve_params(params):
+    """
+    Replace registered objective and metric names in XGBoostModel parameters by Loss instances. Options of the
+    custom loss are passed as 'objective_params'. Everything else is passed through to XGBoost unchanged.
+
+    :param params: Dictionary of XGBoostModel parameters, e.g. {'objective': 'pseudo_huber',
+                   'objective_params': {'delta': 5}, 'eval_metric': 'pseudo_huber'}
+    :return: Dictionary of XGBRegressor/XGBClassifier parameters
+    """
+    params = dict(params)
+    objective_params = params.pop('objective_params', {})
+    objective = params.get('objective')
+    if isinstance(objective, str) and objective in OBJECTIVES:
+        params['objective'] = OBJECTIVES[objective](**objective_params)
+    elif objective_params:
+        raise ValueError(f"objective_params given for unregistered objective {objective!r}")
+
+    metric = params.get('eval_metric')
+    if isinstance(metric, str) and metric in OBJECTIVES:
+        # A metric named after the training loss uses the same options, e.g. the same pseudo-Huber delta.
+        objective = params.get('objective')
+        loss = objective if isinstance(objective, Loss) and objective.name == metric else OBJECTIVES[metric]()
+        params['eval_metric'] = loss.metric()
+    return params
@@ -0,0 +1,308 @@
+import numpy as np
+
+
+METHODS = ('mean_variance', 'risk_parity', 'long_only')
+
+
+class EWMACovariance:
+    """
+    Exponentially weighted mean and covariance of asset returns, updated one row at a time with the weighted
+    form of Welford's update, so moving to the next rebalance date costs O(assets^2) instead of a full
+    re-estimate. Rows with a missing value leave the estimate unchanged.
+
+    :param n_assets: Number of assets tracked
+    :param halflife: Number of rows after which the weight of an observation has halved
+    """
+
+    def __init__(self, n_assets, halflife=12):
+        self.n_assets = n_assets
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = np.zeros(self.n_assets)
+        self.cov = np.zeros((self.n_assets, self.n_assets))
+
+    def update(self, row):
+        row = np.asarray(row, dtype=float)
+        if np.isnan(row).any():
+            return
+        if self.count == 0:
+            self.mean[:] = row
+        else:
+            diff = row - self.mean
+            self.mean += self.alpha * diff
+            self.cov += self.alpha * np.outer(diff, diff)
+            self.cov *= 1 - self.alpha
+        self.count += 1
+
+    def covariance(self):
+        return self.cov.copy()
+
+
+class RollingCovariance:
+    """
+    Sample mean and covariance of the last window complete rows, updated with Welford's add and remove steps
+    as rows enter and leave the window. Rows with a missing value are skipped.
+
+    :param n_assets: Number of assets tracked
+    :param window: Number of rows in the window
+    """
+
+    def __init__(self, n_assets, window=36):
+        self.n_assets = n_assets
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self.rows = []
+        self.count = 0
+        self.mean = np.zeros(self.n_assets)
+        self.comoment = np.zeros((self.n_assets, self.n_assets))
+
+    def _add(self, row):
+        self.count += 1
+        diff = row - self.mean
+        self.mean += diff / self.count
+        self.comoment += np.outer(diff, row - self.mean)
+
+    def _remove(self, row):
+        if self.count == 1:
+            self.count = 0
+            self.mean[:] = 0
+            self.comoment[:] = 0
+            return
+        self.count -= 1
+        diff = row - self.mean
+        self.mean -= diff / self.count
+        self.comoment -= np.outer(diff, row - self.mean)
+
+    def update(self, row):
+        row = np.asarray(row, dtype=float)
+        if np.isnan(row).any():
+            return
+        self.rows.append(row)
+        self._add(row)
+        if len(self.rows) > self.window:
+            self._remove(self.rows.pop(0))
+
+    def covariance(self):
+        if self.count < 2:
+            return np.full((self.n_assets, self.n_assets), np.nan)
+        return self.comoment / (self.count - 1)
+
+
+def covariance_history(returns, dates=None, estimator='ewma', halflife=12, window=36, min_periods=12):
+    """
+    Covariance available at every rebalance date, estimated in one pass over the returns. The estimate for a
+    date only uses returns dated strictly before it.
+
+    :param returns: DataFrame of realised asset returns (dates x assets)
+    :param dates: Rebalance dates (default: every date of returns)
+    :param estimator: 'ewma' or 'rolling'
+    :param min_periods: Dates with fewer complete rows behind them get a NaN covariance
+    :return: Array (dates, assets, assets)
+    """
+    if estimator == 'ewma':
+        stats = EWMACovariance(returns.shape[1], halflife)
+    elif estimator == 'rolling':
+        stats = RollingCovariance(returns.shape[1], window)
+    else:
+        raise ValueError("estimator must be either 'ewma' or 'rolling'")
+    values = returns.to_numpy(dtype=float)
+    # states[k] is the estimate after the first k rows of returns.
+    states = np.full((len(values) + 1, returns.shape[1], returns.shape[1]), np.nan)
+    for k in range(len(values) + 1):
+        if stats.count >= max(min_periods, 2):
+            states[k] = stats.covariance()
+        if k < len(values):
+            stats.update(values[k])
+    if dates is None:
+        return states[:-1]
+    return states[returns.index.searchsorted(dates, side='left')]
+
+
+def _solve(cov, rhs):
+    return np.linalg.solve(cov, rhs[..., None])[..., 0]
+
+
+def mean_variance_weights(expected, cov, risk_aversion=5.0, fully_invested=True):
+    """
+    Unconstrained mean-variance weights maximising mu'w - risk_aversion / 2 * w'Cw at every date at once.
+
+    :param expected: Array (dates, assets) of expected returns
+    :param cov: Array (dates, assets, assets) of covariances
+    :param fully_invested: Constrain the weights to sum to one (shorting is allowed)
+    :return: Array (dates, assets)
+    """
+    weights = _solve(cov, expected) / risk_aversion
+    if fully_invested:
+        ones = np.ones_like(expected)
+        min_variance = _solve(cov, ones)
+        scale = (1 - weights.sum(axis=1)) / min_variance.sum(axis=1)
+        weights += scale[:, None] * min_variance
+    return weights
+
+
+def risk_parity_weights(cov, budget=None, max_iter=100, tol=1e-10):
+    """
+    Long-only weights whose risk contributions w_i (Cw)_i are proportional to the budget, found with batched
+    Newton steps on the convex formulation min x'Cx / 2 - sum(b_i log x_i).
+
+    :param cov: Array (dates, assets, assets) of covariances
+    :param budget: Risk budget of every asset (default: equal)
+    :return: Array (dates, assets) summing to one
+    """
+    n_assets = cov.shape[1]
+    budget = np.full(n_assets, 1.0) if budget is None else np.asarray(budget, dtype=float)
+    budget = budget / budget.sum()
+    x = budget / np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    for _ in range(max_iter):
+        gradient = np.einsum('tij,tj->ti', cov, x) - budget / x
+        hessian = cov + np.eye(n_assets) * (budget / x ** 2)[:, :, None]
+        step = _solve(hessian, gradient)
+        # Shorten the step of dates where a full step would leave the positive orthant.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            limit = np.where(step > 0, x / step, np.inf).min(axis=1)
+        x = x - np.minimum(1, 0.95 * limit)[:, None] * step
+        if np.abs(gradient).max(initial=0) < tol:
+            break
+    return x / x.sum(axis=1, keepdims=True)
+
+
+def project_capped_simplex(values, max_weight=1.0, n_iter=60):
+    """
+    Euclidean projection of every row onto {w : 0 <= w <= max_weight, sum(w) = 1}, by bisection on the shift.
+    """
+    lower = values.min(axis=1) - max_weight
+    upper = values.max(axis=1)
+    for _ in range(n_iter):
+        shift = (lower + upper) / 2
+        total = np.clip(values - shift[:, None], 0, max_weight).sum(axis=1)
+        above = total > 1
+        lower = np.where(above, shift, lower)
+        upper = np.where(above, upper, shift)
+    return np.clip(values - ((lower + upper) / 2)[:, None], 0, max_weight)
+
+
+def long_only_weights(expected, cov, risk_aversion=5.0, max_weight=1.0, max_iter=1000, tol=1e-9):
+    """
+    Mean-variance weights constrained to be long-only, fully invested and at most max_weight per asset, found
+    with accelerated projected gradient steps (restarted per date) on all dates at once.
+
+    :return: Array (dates, assets)
+    """
+    n_assets = expected.shape[1]
+    if max_weight * n_assets < 1:
+        raise ValueError(f"max_weight {max_weight} cannot hold a fully invested portfolio of {n_assets} assets")
+    # Step 1 / L with L the largest eigenvalue of the objective's Hessian.
+    step = 1 / (risk_aversion * np.linalg.eigvalsh(cov)[:, -1])[:, None]
+    weights = np.full(expected.shape, 1 / n_assets)
+    momentum = weights.copy()
+    t = np.ones((len(expected), 1))
+    for _ in range(max_iter):
+        gradient = risk_aversion * np.einsum('tij,tj->ti', cov, momentum) - expected
+        updated = project_capped_simplex(momentum - step * gradient, max_weight)
+        # The projected step from the extrapolated point vanishes only at the optimum.
+        residual = np.abs(updated - momentum).max(initial=0)
+        # Restart the momentum of dates where it points uphill.
+        t[((momentum - updated) * (updated - weights)).sum(axis=1) > 0] = 1
+        t_next = (1 + np.sqrt(1 + 4 * t ** 2)) / 2
+        momentum = updated + (t - 1) / t_next * (updated - weights)
+        weights, t = updated, t_next
+        if residual < tol:
+            break
+    return weights
+
+
+def expected_returns(results, prices=None, **filters):
+    """
+    Arrange walk-forward predictions as a frame of expected returns, one column per target.
+
+    :param results: WalkForwardResults holding at most one prediction per target and date after filtering
+    :param prices: Levels of the targets (dates x targets). When the targets are levels (total return indices),
+                   predictions are turned into returns relative to the previous period's level
+    :param filters: Passed to results.select, e.g. model='default', scheme='rolling'
+    :return: DataFrame (dates x targets)
+    """
+    if filters:
+        results = results.select(**filters)
+    frame = results.to_frame()
+    if frame.duplicated(['Date', 'target']).any():
+        raise ValueError("Several predictions per target and date; filter the results by model and scheme")
+    expected = frame.pivot(index='Date', columns='target', values='predicted')
+    expected.columns.name = None
+    if prices is not None:
+        previous = prices[expected.columns].shift(1).reindex(expected.index)
+        expected = expected / previous - 1
+    return expected
+
+
+class PortfolioOptimizer:
+    """
+    Allocates across assets at every rebalance date in one batched pass: the covariance is carried forward
+    incrementally across dates, and the per-date problems are solved together as stacked arrays.
+
+    'mean_variance' is the closed-form, fully invested solution (shorting allowed), 'risk_parity' equalises the
+    risk contributions and ignores expected returns, 'long_only' is mean-variance with 0 <= w <= max_weight.
+
+    :param method: 'mean_variance', 'risk_parity' or 'long_only'
+    :param risk_aversion: Weight of the variance term in the mean-variance objectives
+    :param max_weight: Largest weight of any asset in 'long_only'
+    :param estimator: Covariance estimator, 'ewma' or 'rolling'
+    :param halflife: Half-life of the EWMA covariance, in rows
+    :param window: Window of the rolling covariance, in rows
+    :param min_periods: Dates with fewer complete return rows behind them get NaN weights
+    :param shrinkage: Fraction of the covariance replaced by its diagonal, which keeps it well conditioned
+    """
+
+    def __init__(self, method='long_only', risk_aversion=5.0, max_weight=1.0, estimator='ewma', halflife=12,
+                 window=36, min_periods=12, shrinkage=0.0):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}")
+        self.method = method
+        self.risk_aversion = risk_aversion
+        self.max_weight = max_weight
+        self.estimator = estimator
+        self.halflife = halflife
+        self.window = window
+        self.min_periods = min_periods
+        self.shrinkage = shrinkage
+
+    def covariances(self, returns, dates=None):
+        cov = covariance_history(returns, dates, self.estimator, self.halflife, self.window, self.min_periods)
+        if self.shrinkage:
+            diagonal = np.eye(cov.shape[1]) * np.diagonal(cov, axis1=1, axis2=2)[:, None, :]
+            cov = (1 - self.shrinkage) * cov + self.shrinkage * diagonal
+        return cov
+
+    def optimize(self, returns, expected=None):
+        """
+        :param returns: DataFrame of realised asset returns (dates x assets) the covariance is estimated from
+        :param expected: DataFrame of expected returns (rebalance dates x assets), e.g. from expected_returns();
+                         not needed for 'risk_parity', which then rebalances at every date of returns
+        :return: DataFrame of weights (rebalance dates x assets); NaN where the covariance or a forecast is
+                 not available yet
+        """
+        import pandas as pd
+
+        if expected is None:
+            if self.method != 'risk_parity':
+                raise ValueError(f"The {self.method} method needs expected returns")
+            dates, assets = returns.index, list(returns.columns)
+        else:
+            dates, assets = expected.index, list(expected.columns)
+        cov = self.covariances(returns[assets], dates)
+        mu = expected.to_numpy(dtype=float) if expected is not None else np.zeros((len(dates), len(assets)))
+
+        valid = ~np.isnan(cov).any(axis=(1, 2)) & ~np.isnan(mu).any(axis=1)
+        weights = np.full((len(dates), len(assets)), np.nan)
+        if valid.any():
+            if self.method == 'mean_variance':
+                weights[valid] = mean_variance_weights(mu[valid], cov[valid], self.risk_aversion)
+            elif self.method == 'risk_parity':
+                weights[valid] = risk_parity_weights(cov[valid])
+            else:
+                weights[valid] = long_only_weights(mu[valid], cov[valid], self.risk_aversion, self.max_weight)
+        return pd.DataFrame(weights, index=dates, columns=assets)
@@ -0,0 +1,127 @@
+import numpy as np
+
+
+# Total return indices among the processed data's target columns; the Treasury yields are not investable.
+DEFAULT_ASSETS = ('BAMLHYH0A0HYM2TRIV', 'BAMLCC0A0CMTRIV')
+
+
+class RebalancingEnv:
+    """
+    Batch of portfolio rebalancing episodes stepped together as numpy arrays, for reinforcement learning on the
+    processed data. Every episode starts on a random row and lasts episode_length rebalances. On each step an
+    agent observes the features of the current row and its current weights, chooses new weights over the
+    assets, and earns the next period's portfolio return net of transaction costs on the turnover from its
+    drifted weights. Finished episodes are restarted at once, so every step returns a full batch.
+
+    :param features: pandas DataFrame or 2-D array (rows x features) of what is known on each row
+    :param returns: pandas DataFrame or 2-D array (rows x assets); row t holds the returns from row t to t + 1
+    :param n_envs: Number of parallel episodes
+    :param episode_length: Rebalances per episode
+    :param cost: Transaction cost per unit of turnover (e.g. 0.001 for 10 basis points)
+    :param seed: Seed of the episode start sampling
+    """
+
+    def __init__(self, features, returns, n_envs=1024, episode_length=36, cost=0.001, seed=None):
+        self.features = np.nan_to_num(np.asarray(features, dtype=np.float32))
+        self.returns = np.asarray(returns, dtype=np.float64)
+        if len(self.features) != len(self.returns):
+            raise ValueError("features and returns must have the same number of rows")
+        self.n_envs = n_envs
+        self.episode_length = episode_length
+        self.cost = cost
+        self.n_assets = self.returns.shape[1]
+        self.observation_size = self.features.shape[1] + self.n_assets
+
+        # An episode may start on row t if the returns of rows t .. t + episode_length - 1 are all known.
+        missing = np.concatenate([[0], np.cumsum(np.isnan(self.returns).any(axis=1))])
+        last_start = len(self.returns) - episode_length
+        starts = np.arange(max(last_start + 1, 0))
+        self.starts = starts[missing[starts + episode_length] == missing[starts]]
+        if not len(self.starts):
+            raise ValueError(f"No {episode_length}-row stretch of known returns to run an episode on")
+
+        self.rng = np.random.default_rng(seed)
+        self.row = np.zeros(n_envs, dtype=np.int64)
+        self.step_count = np.zeros(n_envs, dtype=np.int64)
+        self.weights = np.zeros((n_envs, self.n_assets))
+        self.value = np.ones(n_envs)
+
+    @classmethod
+    def from_processed(cls, data, assets=DEFAULT_ASSETS, normalize=True, **kwargs):
+        """
+        Build the environment from the process stage's output: the assets' 1-month returns of the next row
+        are the step returns, and every column is a feature.
+
+        :param data: processed_data DataFrame
+        :param assets: Target columns whose '<column>_1_mo_return' is traded
+        :param normalize: Standardise every feature with its expanding mean and standard deviation, so a row is
+                          scaled with past rows only
+        :param kwargs: Other arguments of RebalancingEnv
+        """
+        returns = data[[f'{asset}_1_mo_return' for asset in assets]].shift(-1)
+        features = data.astype(float)
+        if normalize:
+            expanding = features.expanding(min_periods=2)
+            features = (features - expanding.mean()) / expanding.std().replace(0, np.nan)
+        return cls(features, returns, **kwargs)
+
+    def _restart(self, envs):
+        self.row[envs] = self.rng.choice(self.starts, size=len(envs))
+        self.step_count[envs] = 0
+        self.weights[envs] = 0.0
+        self.value[envs] = 1.0
+
+    def _observe(self):
+        return np.concatenate([self.features[self.row], self.weights.astype(np.float32)], axis=1)
+
+    def reset(self, seed=None):
+        """
+        Start a new episode in every environment (starting in cash).
+
+        :param seed: Optional new seed of the episode sampling
+        :return: Observations (n_envs x observation_size, float32): the current row's features, then the weights
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._restart(np.arange(self.n_envs))
+        return self._observe()
+
+    def allocations(self, actions):
+        """
+        Turn actions into weights: negative weights are clipped to 0, and rows adding up to more than 1 are
+        scaled down to 1; what is not allocated is held in cash, which earns nothing.
+        """
+        weights = np.clip(np.asarray(actions, dtype=np.float64).reshape(self.n_envs, self.n_assets), 0.0, None)
+        total = weights.sum(axis=1, keepdims=True)
+        return np.where(total > 1.0, weights / np.where(total > 0, total, 1.0), weights)
+
+    def step(self, actions):
+        """
+        Rebalance every environment to the weights of its action and move to the next row.
+
+        :param actions: Array (n_envs x assets) of target weights
+        :return: Tuple of (observations, rewards, dones, info). Rewards are the net portfolio returns; done
+                 environments are already restarted, so their observation is the first of the next episode, and
+                 info holds the 'turnover', 'gross_return' and, for done environments, 'final_value' (NaN for
+                 the others)
+        """
+        weights = self.allocations(actions)
+        turnover = np.abs(weights - self.weights).sum(axis=1)
+        returns = self.returns[self.row]
+        gross = (weights * returns).sum(axis=1)
+        rewards = gross - self.cost * turnover
+
+        # Weights drift with their assets' returns until the next rebalance.
+        grown = weights * (1.0 + returns)
+        self.weights = grown / np.where(np.abs(1.0 + gross) > 1e-12, 1.0 + gross, 1.0)[:, None]
+        self.value *= 1.0 + rewards
+        self.row += 1
+        self.step_count += 1
+
+        dones = self.step_count >= self.episode_length
+        final_value = np.where(dones, self.value, np.nan)
+        done_envs = np.flatnonzero(dones)
+        if len(done_envs):
+            self._restart(done_envs)
+        info = {'turnover': turnover, 'gross_return': gross, 'final_value': final_value}
+        return self._observe(), rewards, dones, info
@@ -1,37 +1,169 @@
-from xgboost import XGBRegressor, XGBClassifier
+import json
+
+import numpy as np
 from sklearn.base import BaseEstimator, RegressorMixin, ClassifierMixin
 from typing import Union, Dict, Any
 
 
+# Parameters handled by the wrapper itself rather than passed to XGBoost.
+WRAPPER_PARAMS = ('validation_fraction', 'refit_full_window')
+DEFAULT_EARLY_STOPPING_ROUNDS = 50
+
+
+def _xgboost_params(params):
+    from models.objectives import resolve_params
+
+    # Registered custom objectives and metrics (see models.objectives) can be selected by name.
+    return resolve_params({key: value for key, value in params.items() if key not in WRAPPER_PARAMS})
+
+
 class XGBoostModel(BaseEstimator):
+    """
+    Thin wrapper around XGBRegressor/XGBClassifier. Besides the XGBoost parameters it accepts
+    validation_fraction: when set, fit() holds out that share of the (time-ordered) training rows as a
+    validation tail, stops boosting once the validation loss has not improved for early_stopping_rounds rounds
+    (default 50) and records the chosen round count in best_n_estimators. Unless refit_full_window is False,
+    the model is then refitted on the whole window with that many rounds, so the most recent rows are not lost
+    to validation.
+    """
+
     def __init__(self, model_type: str = 'regressor', **kwargs):
         self.model_type = model_type
         self.model_params = kwargs
         self.model = None
+        self._best_n_estimators = None
 
     def _initialize_model(self):
+        # xgboost is imported on first fit so that importing this module stays cheap.
+        from xgboost import XGBRegressor, XGBClassifier
+
+        params = _xgboost_params(self.model_params)
+        if self.model_params.get('validation_fraction'):
+            params.setdefault('early_stopping_rounds', DEFAULT_EARLY_STOPPING_ROUNDS)
         if self.model_type == 'regressor':
-            self.model = XGBRegressor(**self.model_params)
+            self.model = XGBRegressor(**params)
         elif self.model_type == 'classifier':
-            self.model = XGBClassifier(**self.model_params)
+            self.model = XGBClassifier(**params)
         else:
             raise ValueError("model_type must be either 'regressor' or 'classifier'")
 
     def fit(self, X, y):
+        from managers.resources import get_manager
+
         if self.model is None:
             self._initialize_model()
-        self.model.fit(X, y)
+        if 'n_jobs' not in self.model_params and 'nthread' not in self.model_params:
+            # Inside a fold or search pool this is the worker's share of the cores, not the whole machine.
+            self.model.set_params(n_jobs=get_manager().threads())
+        fraction = self.model_params.get('validation_fraction')
+        self._best_n_estimators = None
+        if not fraction:
+            self.model.fit(X, y)
+            return self
+
+        # The validation rows are the latest rows of the training window, so nothing after the window is used.
+        n_valid = max(1, int(round(len(X) * fraction)))
+        split = len(X) - n_valid
+        if split < 1:
+            raise ValueError(f"validation_fraction={fraction} leaves no training rows out of {len(X)}")
+        X_train, X_valid = (X.iloc[:split], X.iloc[split:]) if hasattr(X, 'iloc') else (X[:split], X[split:])
+        y_train, y_valid = (y.iloc[:split], y.iloc[split:]) if hasattr(y, 'iloc') else (y[:split], y[split:])
+        self.model.fit(X_train, y_train, eval_set=[(X_valid, y_valid)], verbose=False)
+        self._best_n_estimators = self.model.best_iteration + 1
+
+        if self.model_params.get('refit_full_window', True):
+            params = self.model.get_params()
+            self.model.set_params(n_estimators=self._best_n_estimators, early_stopping_rounds=None)
+            try:
+                self.model.fit(X, y)
+            finally:
+                # The same instance is refitted on the next fold with the full round budget.
+                self.model.set_params(n_estimators=params['n_estimators'],
+                                      early_stopping_rounds=params['early_stopping_rounds'])
         return self
 
+    @property
+    def best_n_estimators(self):
+        """
+        Number of boosting rounds used for predictions: the best round plus one after early stopping, otherwise
+        every fitted round.
+        """
+        if self.model is None:
+            raise ValueError("Model has not been fitted yet. Call fit() first.")
+        if self._best_n_estimators is not None:
+            return self._best_n_estimators
+        booster = self.model.get_booster()
+        best_iteration = booster.attr('best_iteration')
+        return int(best_iteration) + 1 if best_iteration is not None else booster.num_boosted_rounds()
+
     def predict(self, X):
         if self.model is None:
             raise ValueError("Model has not been fitted yet. Call fit() before predict().")
         return self.model.predict(X)
 
+    def contributions(self, X, interactions=False, batch_size=None, n_threads=None):
+        """
+        Compute XGBoost's native SHAP contributions (or interaction values) for every row of X.
+
+        :param X: pandas DataFrame or numpy array with the columns the model was fitted on
+        :param interactions: Return pairwise interaction values instead of per-feature contributions
+        :param batch_size: Number of rows per predict call (default: all rows in one call); interaction values
+                           need n_features^2 floats per row, so bound the batch size for wide inputs
+        :param n_threads: Number of threads XGBoost uses for the computation (default: the calling thread's
+                          share of the cores, see managers.resources)
+        :return: Array of shape (rows, n_features + 1) whose last column is the bias term, or
+                 (rows, n_features + 1, n_features + 1) for interactions
+        """
+        from xgboost import DMatrix
+
+        if self.model is None:
+            raise ValueError("Model has not been fitted yet. Call fit() before contributions().")
+        from managers.resources import get_manager
+
+        booster = self.model.get_booster()
+        # The thread count is a booster parameter; it is put back so later predict calls and pickles keep theirs.
+        previous_nthread = json.loads(booster.save_config())['learner']['generic_param']['nthread']
+        booster.set_param({'nthread': n_threads or get_manager().threads()})
+        batch_size = batch_size or max(len(X), 1)
+        feature_names = None if hasattr(X, 'columns') else booster.feature_names
+        batches = []
+        try:
+            for start in range(0, len(X), batch_size):
+                rows = X.iloc[start:start + batch_size] if hasattr(X, 'iloc') else X[start:start + batch_size]
+                batches.append(booster.predict(DMatrix(rows, feature_names=feature_names),
+                                               pred_contribs=not interactions, pred_interactions=interactions,
+                                               iteration_range=(0, self.best_n_estimators)))
+        finally:
+            booster.set_param({'nthread': int(previous_nthread)})
+        return np.concatenate(batches) if batches else np.empty((0, booster.num_features() + 1))
+
+    def export_flat(self):
+        """
+        Flatten the fitted booster into numpy arrays that score new rows without importing xgboost.
+        Like predict, only the trees up to the best iteration are kept when early stopping was used.
+
+        :return: FlatForest
+        """
+        from models.flat_forest import FlatForest
+
+        if self.model is None:
+            raise ValueError("Model has not been fitted yet. Call fit() before export_flat().")
+        n_trees = self.best_n_estimators * int(self.model.get_params().get('num_parallel_tree') or 1)
+        return FlatForest.from_booster(self.model.get_booster(), n_trees)
+
     def set_params(self, **params):
         self.model_params.update(params)
-        if self.model is not None:
-            self.model.set_params(**params)
+        if any(key in WRAPPER_PARAMS for key in params):
+            # Early stopping is configured when the XGBoost model is created, so create it again on the next fit.
+            self.model = None
+        elif self.model is not None:
+            # Resolve against every parameter, so objective_params alone reaches the objective already set (and a
+            # metric sharing the loss' options follows it).
+            resolved = _xgboost_params(self.model_params)
+            keys = set(params) - {'objective_params'}
+            if 'objective' in params or 'objective_params' in params:
+                keys |= {'objective', 'eval_metric'}
+            self.model.set_params(**{key: resolved[key] for key in keys if key in resolved})
         return self
 
     def get_params(self, deep=True):
@@ -0,0 +1,184 @@
+import copy
+import logging
+import time
+
+import numpy as np
+
+from managers.resources import get_manager
+
+
+def _linear(**params):
+    from sklearn.linear_model import LinearRegression
+    return LinearRegression(**params)
+
+
+def _ridge(**params):
+    from sklearn.linear_model import Ridge
+    return Ridge(**params)
+
+
+def _random_forest(**params):
+    from sklearn.ensemble import RandomForestRegressor
+    params.setdefault('n_estimators', 200)
+    params.setdefault('min_samples_leaf', 5)
+    return RandomForestRegressor(**params)
+
+
+def _xgboost(**params):
+    from models.xgb import XGBoostRegressor
+    return XGBoostRegressor(**params)
+
+
+# Linear models are fitted on imputed and standardised features (fitted on the training window only).
+ESTIMATORS = {
+    'linear': (_linear, True),
+    'ridge': (_ridge, True),
+    'random_forest': (_random_forest, False),
+    'xgboost': (_xgboost, False),
+}
+
+
+def make_estimator(estimator, **params):
+    """
+    Create an estimator of the ESTIMATORS registry.
+
+    :param estimator: Name in ESTIMATORS
+    :param params: Parameters of the estimator
+    :return: Unfitted sklearn-compatible estimator
+    """
+    if estimator not in ESTIMATORS:
+        raise ValueError(f"Unknown estimator {estimator!r}, choose one of {sorted(ESTIMATORS)}")
+    factory, scaled = ESTIMATORS[estimator]
+    model = factory(**params)
+    if not scaled:
+        return model
+    from sklearn.impute import SimpleImputer
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    return make_pipeline(SimpleImputer(strategy='median', keep_empty_features=True), StandardScaler(), model)
+
+
+def make_models(specs):
+    """
+    Build the estimators described by a configuration such as
+    {'ridge': {'alpha': 10}, 'forest': {'estimator': 'random_forest', 'max_depth': 4}}: each key is the model's
+    label, and the estimator defaults to the label itself.
+
+    :return: Dictionary of label -> unfitted estimator
+    """
+    models = {}
+    for name, params in specs.items():
+        params = dict(params or {})
+        models[name] = make_estimator(params.pop('estimator', name), **params)
+    return models
+
+
+class FoldCache:
+    """
+    Train and test matrices of every walk-forward fold, built once and shared by every model evaluated on them.
+    Features are copied once into a contiguous float array; folds using every feature are slices (views) of it,
+    and only folds with a feature selection get their own copy. Training rows without a target are dropped.
+
+    :param X: pandas DataFrame of features
+    :param y: pandas Series of targets aligned with X
+    :param splits: Dictionary of scheme -> list of (train_start, train_end, test_start, test_end) bounds, as
+                   written by the split stage
+    :param selector: Optional FoldFeatureSelector choosing the columns of every fold on its training window
+    """
+
+    def __init__(self, X, y, splits, selector=None):
+        self.feature_names = list(X.columns)
+        self.dates = y.index
+        self.values = np.ascontiguousarray(X.to_numpy(dtype=np.float64))
+        self.target = y.to_numpy(dtype=np.float64)
+        self.splits = {scheme: [tuple(b) for b in bounds] for scheme, bounds in splits.items()}
+        self.folds = {}
+        for scheme, bounds in self.splits.items():
+            for fold, (train_start, train_end, test_start, test_end) in enumerate(bounds):
+                columns = selector.select(train_start, train_end) if selector is not None else None
+                self.folds[scheme, fold] = self._build(train_start, train_end, test_start, test_end, columns)
+
+    def _build(self, train_start, train_end, test_start, test_end, columns):
+        X_train = self.values[train_start:train_end]
+        X_test = self.values[test_start:test_end]
+        if columns is not None and len(columns) < self.values.shape[1]:
+            X_train, X_test = X_train[:, columns], X_test[:, columns]
+        y_train = self.target[train_start:train_end]
+        labelled = ~np.isnan(y_train)
+        if not labelled.all():
+            X_train, y_train = X_train[labelled], y_train[labelled]
+        return {'X_train': X_train, 'y_train': y_train, 'X_test': X_test,
+                'y_test': self.target[test_start:test_end], 'dates': self.dates[test_start:test_end],
+                'columns': columns}
+
+    def __len__(self):
+        return len(self.folds)
+
+    def __getitem__(self, key):
+        """
+        :param key: Tuple of (scheme, fold)
+        :return: Dictionary with the fold's 'X_train', 'y_train', 'X_test', 'y_test', test 'dates' and
+                 selected 'columns' (None when every feature is used)
+        """
+        return self.folds[key]
+
+    def nbytes(self):
+        """
+        :return: Bytes held by the cache, counting the shared feature array once
+        """
+        total = self.values.nbytes + self.target.nbytes
+        for fold in self.folds.values():
+            total += sum(fold[key].nbytes for key in ('X_train', 'X_test')
+                         if not np.shares_memory(fold[key], self.values))
+        return total
+
+
+class ModelZoo:
+    """
+    Evaluates several sklearn-compatible estimators on the same folds. Every (model, fold) fit is scheduled on
+    one thread pool sized by the process' core budget (see managers.resources), each task fitting its own copy
+    of the estimator on the cached fold matrices, and every prediction is written to one WalkForwardResults.
+
+    :param models: Dictionary of label -> unfitted estimator (see make_models)
+    :param n_jobs: Maximum number of fits running at the same time (default: one per core)
+    """
+
+    def __init__(self, models, n_jobs=None):
+        self.models = dict(models)
+        self.n_jobs = n_jobs
+        self.seconds = {}
+
+    def _fit_predict(self, name, cache, key):
+        fold = cache[key]
+        start = time.perf_counter()
+        model = copy.deepcopy(self.models[name])
+        model.fit(fold['X_train'], fold['y_train'])
+        predictions = model.predict(fold['X_test'])
+        return predictions, time.perf_counter() - start
+
+    def run(self, cache, results=None, target='default'):
+        """
+        :param cache: FoldCache of the folds to evaluate on
+        :param results: WalkForwardResults to append to (default: a new one)
+        :param target: Name of the target column
+        :return: WalkForwardResults with the predictions of every model, labelled by model and scheme
+        """
+        from managers.results_store import WalkForwardResults
+
+        if results is None:
+            results = WalkForwardResults(capacity=len(self.models) * sum(
+                len(cache[key]['y_test']) for key in cache.folds) or 1)
+        tasks = [(name, key) for name in self.models for key in cache.folds]
+        with get_manager().thread_pool(len(tasks), self.n_jobs) as executor:
+            outputs = list(executor.map(lambda task: self._fit_predict(task[0], cache, task[1]), tasks))
+
+        # Predictions are appended from this thread, in a fixed order, whatever order the fits finished in.
+        self.seconds = {name: 0.0 for name in self.models}
+        for (name, (scheme, fold)), (predictions, seconds) in zip(tasks, outputs):
+            fold_data = cache[scheme, fold]
+            results.append(fold, fold_data['dates'], fold_data['y_test'], predictions, model=name, scheme=scheme,
+                           target=target)
+            self.seconds[name] += seconds
+        logging.info("Model zoo fit seconds: " + ", ".join(f"{name} {s:.2f}" for name, s in self.seconds.items()))
+        return results
@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+
+from managers.data_manager import FREDDataManager, YahooDataManager
+from managers.pipeline import DATA_DIR, STAGES, Pipeline
+from managers.refresh_daemon import RefreshDaemon
+from managers.resources import set_cores
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Poll FRED and Yahoo Finance for new releases, refresh only the "
+                                                 "series that changed and re-score the latest month.")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directory holding the pipeline inputs and outputs")
+    parser.add_argument('--config', help="JSON file overriding the default stage configuration")
+    parser.add_argument('--api-key', default=os.environ.get('FRED_API_KEY'),
+                        help="FRED API key (default: $FRED_API_KEY)")
+    parser.add_argument('--interval', type=float, default=3600, help="Seconds between polls (default: 3600)")
+    parser.add_argument('--once', action='store_true', help="Poll once and exit")
+    parser.add_argument('--cores', type=int, help="Number of cores to use (default: all available)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if not args.api_key:
+        raise SystemExit("A FRED API key is required. Set FRED_API_KEY or pass --api-key.")
+    if args.cores:
+        set_cores(args.cores)
+
+    config = None
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+    pipeline = Pipeline(STAGES, data_dir=args.data_dir, config=config, api_key=args.api_key)
+    daemon = RefreshDaemon(pipeline, FREDDataManager(args.api_key), YahooDataManager(), interval=args.interval)
+
+    if args.once:
+        asyncio.run(daemon.poll_once())
+    else:
+        asyncio.run(daemon.run())
+
+
+if __name__ == '__main__':
+    main()
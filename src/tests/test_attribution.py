@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.attribution import Attributions, explain_folds
+from models.xgb import XGBoostRegressor
+
+
+@pytest.fixture
+def walk_forward():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(80, 4)), columns=['a', 'b', 'c', 'd'],
+                     index=pd.date_range('2000-01-31', periods=80, freq='ME'))
+    y = 2 * X['a'] - X['c'] + 0.1 * rng.normal(size=80)
+    bounds = [(0, 40, 40, 50), (0, 50, 50, 60), (10, 60, 60, 80)]
+    columns = [['a', 'b', 'c', 'd'], ['a', 'c'], ['b', 'c', 'd']]
+    models = [XGBoostRegressor(n_estimators=20, max_depth=2).fit(X.iloc[s:e][cols], y.iloc[s:e])
+              for (s, e, _, _), cols in zip(bounds, columns)]
+    return X, bounds, columns, models
+
+
+def test_contributions_add_up_to_the_prediction(walk_forward):
+    X, _, _, models = walk_forward
+
+    contributions = models[0].contributions(X.to_numpy(), batch_size=7)
+
+    np.testing.assert_allclose(contributions.sum(axis=1), models[0].predict(X), rtol=1e-5, atol=1e-5)
+    interactions = models[0].contributions(X, interactions=True)
+    np.testing.assert_allclose(interactions.sum(axis=2), contributions, rtol=1e-4, atol=1e-4)
+
+    # The thread count used for the attribution does not stick to the fitted booster.
+    config = lambda: json.loads(models[0].model.get_booster().save_config())['learner']['generic_param']  # noqa: E731
+    nthread = config()['nthread']
+    models[0].contributions(X, n_threads=3)
+    assert config()['nthread'] == nthread
+
+
+def test_explain_folds_aligns_features_and_dates(walk_forward, tmp_path):
+    X, bounds, columns, models = walk_forward
+
+    attributions = explain_folds(models, X, bounds, interactions=True, n_jobs=3)
+
+    assert attributions.values.shape == (40, 4) and attributions.interactions.shape == (40, 4, 4)
+    assert attributions.dates[0] == X.index[40] and attributions.folds.tolist() == [0] * 10 + [1] * 10 + [2] * 20
+    # The second fold never saw b or d, so they get no credit.
+    assert not attributions.values[10:20, [1, 3]].any()
+    expected = np.concatenate([m.predict(X.iloc[t0:t1][cols]) for m, (_, _, t0, t1), cols in
+                               zip(models, bounds, columns)])
+    np.testing.assert_allclose(attributions.values.sum(axis=1) + attributions.bias, expected, rtol=1e-4, atol=1e-4)
+
+    attributions.save(tmp_path / 'attributions.npz')
+    loaded = Attributions.load(tmp_path / 'attributions.npz')
+    pd.testing.assert_frame_equal(loaded.summary(), attributions.summary())
+    assert loaded.summary().index[0] == 'a'
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from managers.column_store import ColumnStore
+from managers.data_manager import DataFusion
+from managers.data_processing import DataProcessor
+
+
+def make_sources(tmp_path):
+    rng = np.random.default_rng(0)
+    fred_dates = pd.date_range('2000-01-01', periods=500, freq='D', name='Date')
+    fred = pd.DataFrame(rng.normal(100, 5, size=(500, 11)), index=fred_dates,
+                        columns=[f'S{i}' for i in range(10)] + ['RET'])
+    fred = fred.mask(rng.random(fred.shape) < 0.3)
+    yahoo = pd.DataFrame({'SPY': rng.normal(300, 10, size=480)},
+                         index=pd.date_range('2000-01-15', periods=480, freq='B', name='Date'))
+    fred.to_csv(tmp_path / 'fred.csv')
+    yahoo.to_csv(tmp_path / 'yahoo.csv')
+    return fred, yahoo
+
+
+def test_store_round_trips_a_csv(tmp_path):
+    fred, _ = make_sources(tmp_path)
+
+    store = ColumnStore.from_csv(tmp_path / 'fred.csv', tmp_path / 'store', memory_budget=20_000)
+
+    assert len(store.meta['blocks']) > 1
+    in_memory = pd.read_csv(tmp_path / 'fred.csv', index_col='Date', parse_dates=True)
+    pd.testing.assert_frame_equal(store.to_frame(), in_memory, check_freq=False)
+    store.to_csv(tmp_path / 'chunked.csv', memory_budget=20_000)
+    in_memory.to_csv(tmp_path / 'in_memory.csv')
+    assert (tmp_path / 'chunked.csv').read_text() == (tmp_path / 'in_memory.csv').read_text()
+
+
+def test_chunked_fusion_and_processing_match_the_in_memory_path(tmp_path):
+    make_sources(tmp_path)
+    read = lambda name: pd.read_csv(tmp_path / name, index_col='Date', parse_dates=True)  # noqa: E731
+    targets = ['S3', 'SPY', 'MISSING']
+
+    fused = DataFusion(read('fred.csv'), read('yahoo.csv')).fuse_data()
+    fused.index.name = 'Date'
+    fused.to_csv(tmp_path / 'merged.csv')
+    DataProcessor(read('merged.csv')).process_data(targets, save_csv=True, csv_filename=tmp_path / 'processed.csv',
+                                                   compound_columns=['RET'])
+
+    budget = 30_000
+    fusion = DataFusion(ColumnStore.from_csv(tmp_path / 'fred.csv', tmp_path / 'fred', budget),
+                        ColumnStore.from_csv(tmp_path / 'yahoo.csv', tmp_path / 'yahoo', budget))
+    fusion.fuse_to_store(tmp_path / 'merged', budget).to_csv(tmp_path / 'merged_chunked.csv', memory_budget=budget)
+    processor = DataProcessor(ColumnStore.from_csv(tmp_path / 'merged_chunked.csv', tmp_path / 'merged2', budget))
+    processed = processor.process_store(targets, tmp_path / 'processed', csv_filename=tmp_path / 'chunked.csv',
+                                        compound_columns=['RET'], memory_budget=budget)
+
+    assert len(processed.meta['blocks']) > 3
+    assert (tmp_path / 'merged_chunked.csv').read_text() == (tmp_path / 'merged.csv').read_text()
+    assert (tmp_path / 'chunked.csv').read_text() == (tmp_path / 'processed.csv').read_text()
+
+
+def test_chunked_processing_rejects_what_the_in_memory_path_rejects(tmp_path):
+    make_sources(tmp_path)
+    merged = pd.read_csv(tmp_path / 'fred.csv', index_col='Date', parse_dates=True)
+    with pytest.raises(KeyError, match='TYPO'):
+        DataProcessor(merged).process_data(['S3'], compound_columns=['RET', 'TYPO'])
+
+    store = ColumnStore.from_csv(tmp_path / 'fred.csv', tmp_path / 'fred', 30_000)
+    with pytest.raises(KeyError, match='TYPO'):
+        DataProcessor(store).process_store(['S3'], tmp_path / 'processed', compound_columns=['RET', 'TYPO'])
+
+    empty = ColumnStore.create(tmp_path / 'empty', merged.index)
+    with pytest.raises(ValueError, match='no columns'):
+        DataProcessor(empty).process_store(['S3'], tmp_path / 'processed', csv_filename=tmp_path / 'out.csv')
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from managers.compounding import compound_returns
+from managers.data_processing import DataProcessor
+
+
+@pytest.fixture
+def daily_returns():
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range('2000-01-03', '2001-06-29')
+    returns = pd.DataFrame(rng.normal(0, 0.01, size=(len(index), 3)), index=index, columns=['a', 'b', 'c'])
+    returns.iloc[5, 0] = np.nan
+    return returns
+
+
+@pytest.mark.parametrize('method', ['log', 'cumprod'])
+def test_matches_per_month_product(daily_returns, method):
+    expected = daily_returns.resample('MS').apply(lambda r: (r + 1).prod() - 1)
+
+    result = compound_returns(daily_returns, method=method, anchor='start')
+
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_nan_policy_and_anchor(daily_returns):
+    propagated = compound_returns(daily_returns, nan_policy='propagate')
+
+    assert propagated.index[0] == pd.Timestamp('2000-01-31')
+    assert np.isnan(propagated.iloc[0, 0]) and not np.isnan(propagated.iloc[0, 1])
+    with pytest.raises(ValueError):
+        compound_returns(daily_returns, nan_policy='raise')
+
+
+def test_empty_periods_and_percent_units():
+    returns = pd.Series([1.0, 1.0, 2.0], index=pd.to_datetime(['2000-01-10', '2000-01-11', '2000-03-01']))
+
+    result = compound_returns(returns, scale=100, method='cumprod')
+
+    assert result.iloc[0] == pytest.approx(2.01)
+    assert np.isnan(result.iloc[1])
+    assert result.iloc[2] == pytest.approx(2.0)
+
+
+def test_transform_to_eom_compounds_return_columns(daily_returns):
+    processor = DataProcessor(daily_returns.copy())
+
+    processor.transform_to_eom(compound_columns=['a'])
+
+    pd.testing.assert_series_equal(processor.data['a'], compound_returns(daily_returns['a']), check_freq=False)
+    assert processor.data['b'].iloc[0] == daily_returns['b'].loc['2000-01'].iloc[-1]
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from managers.cross_validation import FoldStatistics, TimeSeriesCrossValidator
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    # A large offset and a tiny spread: the textbook sum-of-squares formula loses every digit here.
+    data = pd.DataFrame({'level': 1e6 + 1e-2 * rng.normal(size=500), 'ret': rng.standard_t(3, size=500),
+                         'sparse': rng.normal(size=500)}, index=pd.date_range('1980-01-31', periods=500, freq='ME'))
+    data.iloc[::7, 2] = np.nan
+    data.iloc[100:180, 2] = np.nan
+    return data
+
+
+def test_window_statistics_match_pandas(data):
+    stats = TimeSeriesCrossValidator(data).statistics()
+
+    for start, end in [(0, 500), (0, 10), (37, 301), (120, 190), (150, 170), (499, 500)]:
+        window = data.iloc[start:end]
+        np.testing.assert_allclose(stats.count(start, end), window.count())
+        np.testing.assert_allclose(stats.mean(start, end), window.mean(), rtol=1e-12)
+        np.testing.assert_allclose(stats.std(start, end), window.std(), rtol=1e-7)
+        np.testing.assert_array_equal(stats.min(start, end), window.min())
+        np.testing.assert_array_equal(stats.max(start, end), window.max())
+    lower, upper = stats.winsorize_bounds(0, 300, n_std=2)
+    np.testing.assert_allclose(lower, np.maximum(data[:300].mean() - 2 * data[:300].std(), data[:300].min()))
+    assert np.isnan(stats.std(150, 170)[2]) and np.isnan(stats.min(150, 170)[2])
+
+
+def test_fold_local_scaling_uses_only_the_training_window(data):
+    cv = TimeSeriesCrossValidator(data)
+    stats = cv.statistics()
+    assert cv.statistics() is stats
+
+    for train_start, train_end, test_start, test_end in cv.split_bounds('sliding', window_size=120, step_size=60,
+                                                                        test_size=12):
+        train, test = data.iloc[train_start:train_end], data.iloc[test_start:test_end]
+        scaled = stats.transform(test, train_start, train_end)
+        np.testing.assert_allclose(scaled, (test - train.mean()) / train.std(), rtol=1e-6, atol=1e-6)
+        minmax = stats.transform(train, train_start, train_end, method='minmax')
+        np.testing.assert_allclose(np.nanmin(minmax, axis=0), 0, atol=1e-12)
+        np.testing.assert_allclose(np.nanmax(minmax, axis=0), 1, atol=1e-9)
+
+    constant = FoldStatistics(np.ones((10, 2)))
+    np.testing.assert_array_equal(constant.transform(np.ones((3, 2)), 0, 10), 0)
@@ -0,0 +1,71 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from managers.data_manager import FREDDataManager
+
+
+class FlakyFREDManager(FREDDataManager):
+    """
+    Serves made-up series from memory; the series in `failing` raise like an exhausted retry budget would.
+    """
+
+    def __init__(self, data, failing=()):
+        super().__init__(api_key='key')
+        self.data = data
+        self.failing = set(failing)
+        self.requested = []
+
+    def get_earliest_date(self, series_id):
+        return self.data[series_id].first_valid_index()
+
+    def get_data(self, series_id, start_date):
+        self.requested.append(series_id)
+        if series_id in self.failing:
+            raise ConnectionError('503 Service Unavailable')
+        return self.data[[series_id]].loc[start_date:]
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2000-01-01', periods=200, name='Date')
+    data = pd.DataFrame(rng.normal(size=(len(index), 4)), index=index, columns=['GDP', 'HY', 'DGS10', 'DGS2'])
+    data.iloc[:20, 1] = np.nan
+    return data
+
+
+def test_rerun_resumes_only_the_failed_series(data, tmp_path):
+    csv_filename = str(tmp_path / 'fred_data.csv')
+    series_ids = list(data.columns)
+
+    first = FlakyFREDManager(data, failing={'DGS10'})
+    with pytest.raises(RuntimeError, match='DGS10'):
+        first.get_all_data(series_ids, '1998-01-01', csv_filename=csv_filename)
+    assert first.summary['fetched'] == ['GDP', 'HY', 'DGS2'] and list(first.summary['failed']) == ['DGS10']
+    assert not (tmp_path / 'fred_data.csv').exists()
+
+    second = FlakyFREDManager(data)
+    merged = second.get_all_data(series_ids, '1998-01-01', csv_filename=csv_filename)
+
+    assert second.requested == ['DGS10']
+    assert second.summary == {'fetched': ['DGS10'], 'resumed': ['GDP', 'HY', 'DGS2'], 'failed': {}}
+    assert list(merged.columns) == series_ids and merged.index[0] == data['HY'].first_valid_index()
+    clean_filename = str(tmp_path / 'clean.csv')
+    FlakyFREDManager(data).get_all_data(series_ids, '1998-01-01', csv_filename=clean_filename,
+                                        checkpoint_dir=str(tmp_path / 'clean'))
+    assert pathlib.Path(csv_filename).read_text() == pathlib.Path(clean_filename).read_text()
+    # A complete run leaves no checkpoint behind.
+    assert not (tmp_path / 'fred_data_checkpoint').exists()
+
+
+def test_partial_run_writes_the_series_that_succeeded(data, tmp_path):
+    manager = FlakyFREDManager(data, failing={'GDP'})
+
+    merged = manager.get_all_data(list(data.columns), '1998-01-01', csv_filename=str(tmp_path / 'fred_data.csv'),
+                                  allow_partial=True)
+
+    assert list(merged.columns) == ['HY', 'DGS10', 'DGS2']
+    assert (tmp_path / 'fred_data_checkpoint' / 'manifest.json').exists()
@@ -0,0 +1,68 @@
+import logging
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from managers.dataset_stats import DatasetStats, read_stats, sidecar_path, write_sidecar
+from managers.pipeline import DATA_DIR, STAGES, Pipeline
+
+
+def make_frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2000-01-31', periods=n, freq='ME', name='Date')
+    frame = pd.DataFrame({'level': 100 + rng.normal(size=n).cumsum(), 'ret': rng.standard_t(4, size=n) / 100,
+                          'spread': rng.lognormal(size=n)}, index=index)
+    frame.iloc[:30, 0] = np.nan
+    frame.iloc[-12:, 2] = np.nan
+    return frame
+
+
+def test_merged_statistics_match_pandas(tmp_path):
+    frame = make_frame()
+    stats = DatasetStats.from_frame(frame.iloc[:77]).merge(DatasetStats.from_frame(frame.iloc[77:]))
+    stats.save(str(tmp_path / 'stats.json'))
+    summary = DatasetStats.load(str(tmp_path / 'stats.json')).describe()
+
+    expected = frame.describe().T
+    for column in ('count', 'mean', 'std', 'min', 'max'):
+        np.testing.assert_allclose(summary[column], expected[column], rtol=1e-12)
+    np.testing.assert_allclose(summary['skew'], frame.skew(), rtol=1e-9)
+    np.testing.assert_allclose(summary['kurtosis'], frame.kurt(), rtol=1e-9)
+    quartiles = np.nanquantile(frame.to_numpy(), [0.25, 0.5, 0.75], axis=0, method='lower').T
+    np.testing.assert_allclose(summary[['25%', '50%', '75%']].to_numpy(), quartiles, rtol=0.0101)
+    assert list(summary['missing']) == [30, 0, 12]
+    assert summary.loc['level', 'first_valid'] == '2002-07-31' and summary.loc['spread', 'last_valid'] == '2023-12-31'
+
+
+def test_sidecar_merges_appended_rows_and_recomputes_rewrites(tmp_path, caplog):
+    frame = make_frame()
+    path = str(tmp_path / 'data.csv')
+    frame.iloc[:200].to_csv(path)
+    write_sidecar(path)
+
+    frame.to_csv(path)
+    with caplog.at_level(logging.INFO):
+        appended = write_sidecar(path)
+    assert 'Merged statistics of 100 appended rows' in caplog.text
+    assert appended.n_rows == 300
+    np.testing.assert_allclose(read_stats(path).describe()['std'], frame.describe().T['std'], rtol=1e-12)
+
+    frame.iloc[5, 1] = 1.0
+    frame.to_csv(path)
+    rewritten = write_sidecar(path)
+    assert rewritten.max[1] == pytest.approx(1.0)
+
+
+def test_pipeline_writes_a_sidecar_for_every_dataset(tmp_path):
+    for name in ['fred-tickers.json', 'fred_data.csv', 'yahoo_data.csv']:
+        shutil.copy(os.path.join(DATA_DIR, name), tmp_path / name)
+    Pipeline(STAGES, data_dir=str(tmp_path)).run(until='process')
+
+    for name in ['fred_data.csv', 'yahoo_data.csv', 'merged_data.csv', 'processed_data.csv']:
+        assert os.path.exists(sidecar_path(str(tmp_path / name)))
+    processed = pd.read_csv(tmp_path / 'processed_data.csv', index_col='Date')
+    assert read_stats(str(tmp_path / 'processed_data.csv')).describe()['count'].equals(
+        processed.count().rename_axis('column'))
@@ -0,0 +1,41 @@
+import os
+import shutil
+
+import numpy as np
+
+from managers.pipeline import DATA_DIR, STAGES, Pipeline, load_model
+from models.xgb import XGBoostRegressor
+
+
+def test_early_stopping_validates_on_the_training_tail():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    y = X[:, 0] + 0.5 * rng.normal(size=200)
+
+    model = XGBoostRegressor(n_estimators=500, learning_rate=0.3, validation_fraction=0.25,
+                             early_stopping_rounds=10, refit_full_window=False).fit(X, y)
+
+    assert model.best_n_estimators < 500
+    # The validation set is the last quarter of the window and was not used for fitting.
+    np.testing.assert_allclose(model.model.evals_result()['validation_0']['rmse'][model.best_n_estimators - 1],
+                               np.sqrt(np.mean((model.predict(X[150:]) - y[150:]) ** 2)), rtol=1e-4)
+
+    refitted = XGBoostRegressor(n_estimators=500, learning_rate=0.3, validation_fraction=0.25,
+                                early_stopping_rounds=10).fit(X, y)
+    assert refitted.best_n_estimators == model.best_n_estimators
+    assert refitted.model.get_booster().num_boosted_rounds() == model.best_n_estimators
+    assert refitted.model.n_estimators == 500
+
+
+def test_train_stage_records_fold_rounds(tmp_path):
+    for name in ['fred-tickers.json', 'fred_data.csv', 'yahoo_data.csv']:
+        shutil.copy(os.path.join(DATA_DIR, name), tmp_path / name)
+    pipeline = Pipeline(STAGES, data_dir=str(tmp_path), config={'train': {'model_params': {
+        'n_estimators': 200, 'max_depth': 2, 'validation_fraction': 0.2, 'early_stopping_rounds': 5}}})
+
+    pipeline.run(until='train')
+
+    persisted = load_model(pipeline)
+    rounds = [n for scheme in persisted['fold_rounds'].values() for n in scheme]
+    assert set(persisted['fold_rounds']) == {'rolling', 'sliding'} and all(1 <= n <= 200 for n in rounds)
+    assert persisted['model'].model.get_booster().num_boosted_rounds() == int(np.median(rounds))
@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from managers import excel_loader
+from managers.excel_loader import UST_DROP_COLUMNS, ExcelDataLoader
+
+pytest.importorskip('openpyxl')
+
+
+@pytest.fixture
+def workbooks(tmp_path):
+    dates = pd.date_range('2000-01-03', periods=4).strftime('%Y-%m-%d')
+    pd.DataFrame({'Dates': dates, 'SPX': [1.0, 2.0, 3.0, 4.0]}).to_excel(tmp_path / 'macro.xlsx', index=False)
+    pd.DataFrame({'Date': dates, 'GDP': [5.0, 6.0, 7.0, 8.0]}).to_excel(tmp_path / 'fred.xlsx', index=False)
+    with pd.ExcelWriter(tmp_path / 'returns.xlsx') as writer:
+        for sheet in ['HYCorp', 'IGCorp']:
+            pd.DataFrame({'Value Date': dates, 'Excess Return': [0.1, 0.2, 0.3, 0.4],
+                          'Daily Total Return': 0.0}).to_excel(writer, sheet_name=sheet, index=False)
+    with pd.ExcelWriter(tmp_path / 'ust.xlsx') as writer:
+        for sheet in ['UST', 'UST1-3']:
+            frame = pd.DataFrame({'Value Date': dates, 'Daily Total Return': [0.01, 0.02, 0.03, 0.04],
+                                  **{column: 0 for column in UST_DROP_COLUMNS}})
+            frame.to_excel(writer, sheet_name=sheet, index=False, startrow=8)
+    pd.DataFrame({'Date': ['1/3/2000'], 'Open': 1, 'High': 1, 'Low': 1, 'Close': 1, 'Adj Close': 1,
+                  'Volume': 0}).to_csv(tmp_path / 'vix.csv', index=False)
+    pd.DataFrame({'Date': ['2000.01'], 'CAPE': 40.0, 'Bad Date': 0, 'Intermediate Date': 0}).to_csv(
+        tmp_path / 'cape.csv', index=False)
+    return tmp_path
+
+
+def make_loader(path, **kwargs):
+    return ExcelDataLoader(macro_path=path / 'macro.xlsx', macro_path_sht='Sheet1', ret_path=path / 'returns.xlsx',
+                           hy_ret_path_sht='HYCorp', ig_ret_path_sht='IGCorp', vix_path=path / 'vix.csv',
+                           cape_path=path / 'cape.csv', fred_path=path / 'fred.xlsx', fred_path_sht='Sheet1',
+                           treasury_path=path / 'ust.xlsx', treasury_path_sht_list=['UST', 'UST1-3'],
+                           cache_dir=path / 'cache', **kwargs)
+
+
+def test_load_data_parses_every_workbook_once(workbooks, monkeypatch):
+    calls = []
+    parse = excel_loader.parse_workbook
+    monkeypatch.setattr(excel_loader, 'parse_workbook', lambda *args: calls.append(args[0]) or parse(*args))
+
+    loader = make_loader(workbooks, max_workers=1).load_data()
+
+    assert len(calls) == len(set(calls)) == 4
+    assert list(loader.HY_excess_return_data.columns) == ['Value Date', 'Excess Return']
+    assert list(loader.treasury_data['UST1-3'].columns) == ['Value Date', 'Daily Total Return']
+    assert list(loader.vix_data.columns)[1] == 'VIX Open'
+    assert 'Bad Date' not in loader.cape_data.columns
+
+
+def test_cached_workbooks_skip_parsing_until_the_file_changes(workbooks, monkeypatch):
+    first = make_loader(workbooks).load_data()
+
+    calls = []
+    parse = excel_loader.parse_workbook
+    monkeypatch.setattr(excel_loader, 'parse_workbook', lambda *args: calls.append(args[0]) or parse(*args))
+    second = make_loader(workbooks, max_workers=1).load_data()
+
+    assert calls == []
+    pd.testing.assert_frame_equal(first.treasury_data['UST'], second.treasury_data['UST'])
+
+    pd.DataFrame({'Dates': ['2000-01-03'], 'SPX': [9.0]}).to_excel(workbooks / 'macro.xlsx', index=False)
+    third = make_loader(workbooks, max_workers=1).load_data()
+
+    assert calls == [workbooks / 'macro.xlsx']
+    assert third.macro_var_data['SPX'].tolist() == [9.0]
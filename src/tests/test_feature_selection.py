@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from managers.feature_selection import CorrelationPruner, FoldFeatureSelector, RunningCorrelation
+
+
+def make_data(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=(n, 3))
+    X = np.column_stack([base[:, 0], base[:, 0] * 2 + 0.01 * rng.normal(size=n), base[:, 1], base[:, 2]])
+    X[::7, 2] = np.nan
+    y = base[:, 0] + 0.5 * base[:, 1] + 0.1 * rng.normal(size=n)
+    return X, y
+
+
+def test_running_correlation_matches_pandas_after_window_moves():
+    X, _ = make_data()
+    stats = RunningCorrelation(X.shape[1])
+    stats.add(X[:80])
+    stats.add(X[80:100])
+    stats.remove(X[:30])
+
+    expected = pd.DataFrame(X[30:100]).corr().to_numpy()
+
+    np.testing.assert_allclose(stats.correlation(), expected, atol=1e-10)
+
+
+def test_cluster_keeps_one_representative_per_correlated_group():
+    X, y = make_data()
+    corr = pd.DataFrame(np.column_stack([X, y])).corr().to_numpy()
+
+    selected = set(CorrelationPruner(threshold=0.9).select(corr))
+
+    assert len(selected & {0, 1}) == 1 and {2, 3} <= selected
+    assert list(CorrelationPruner(method='filter', max_features=2).select(corr)) == [0, 1]
+
+
+def test_fold_selector_only_sees_training_rows():
+    X, y = make_data()
+    # Make the test rows scream that feature 3 is the target; the selector must not notice.
+    X[100:, 3] = y[100:] * 10
+    selector = FoldFeatureSelector(X, y, CorrelationPruner(threshold=0.9, max_features=2))
+
+    windows = [(0, 60), (0, 80), (20, 100), (0, 40)]
+    selections = [list(selector.select(start, end)) for start, end in windows]
+
+    for (start, end), selected in zip(windows, selections):
+        fresh = FoldFeatureSelector(X[start:end], y[start:end], CorrelationPruner(threshold=0.9, max_features=2))
+        assert selected == list(fresh.select(0, end - start))
+    assert all(3 not in selected for selected in selections)
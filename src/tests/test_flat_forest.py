@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from models.xgb import XGBoostClassifier, XGBoostRegressor
+
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_data(n_rows=400):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(n_rows, 5)), columns=['a', 'b', 'c', 'd', 'e'])
+    y = 3 * X['a'] - X['b'] * X['c'] + 0.1 * rng.normal(size=n_rows)
+    # Missing values exercise the default directions of the splits.
+    X = X.mask(rng.random(X.shape) < 0.1)
+    return X, y
+
+
+def test_flat_forest_matches_predict():
+    X, y = make_data()
+    regressor = XGBoostRegressor(n_estimators=60, max_depth=4).fit(X, y)
+    classifier = XGBoostClassifier(n_estimators=20, max_depth=3).fit(X, (y > 0).astype(int))
+
+    flat = regressor.export_flat()
+
+    np.testing.assert_allclose(flat.predict(X), regressor.predict(X), rtol=1e-5, atol=1e-4)
+    np.testing.assert_allclose(flat.predict(X[['e', 'd', 'c', 'b', 'a']]), regressor.predict(X), rtol=1e-5, atol=1e-4)
+    np.testing.assert_allclose(flat.predict(X.to_numpy(), batch_size=7), regressor.predict(X), rtol=1e-5, atol=1e-4)
+    np.testing.assert_allclose(classifier.export_flat().predict(X), classifier.model.predict_proba(X)[:, 1],
+                               rtol=1e-5, atol=1e-6)
+
+
+def test_saved_forest_scores_without_xgboost(tmp_path):
+    X, y = make_data()
+    model = XGBoostRegressor(n_estimators=30).fit(X, y)
+    model.export_flat().save(tmp_path / 'forest.npz')
+    np.save(tmp_path / 'X.npy', X.to_numpy())
+
+    script = ("import sys; sys.modules['xgboost'] = None\n"
+              "import numpy as np\n"
+              "from models.flat_forest import FlatForest\n"
+              f"forest = FlatForest.load({str(tmp_path / 'forest.npz')!r})\n"
+              f"np.save({str(tmp_path / 'scores.npy')!r}, forest.predict(np.load({str(tmp_path / 'X.npy')!r})))\n")
+    subprocess.run([sys.executable, '-c', script], cwd=SRC_DIR, check=True)
+
+    np.testing.assert_allclose(np.load(tmp_path / 'scores.npy'), model.predict(X), rtol=1e-5, atol=1e-4)
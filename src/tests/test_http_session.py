@@ -0,0 +1,100 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+
+from managers.data_manager import FREDDataManager
+from managers.http_session import get_json, make_session
+
+
+class FlakyFRED(BaseHTTPRequestHandler):
+    """
+    Serves series/observations and series like FRED does, gzip-compressed, failing the first requests of every
+    path with 503.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    failures = 2
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        server.connections.add(self.client_address)
+        server.attempts[url.path] = server.attempts.get(url.path, 0) + 1
+        if server.attempts[url.path] <= self.failures:
+            self._send(503, b'busy')
+            return
+        if url.path.endswith('/series/observations'):
+            observations = [{'date': '2020-01-01', 'value': '1.5'}, {'date': '2020-01-02', 'value': '.'},
+                            {'date': '2020-01-03', 'value': '2.5'}]
+            offset, limit = int(query['offset']), int(query['limit'])
+            body = {'count': len(observations), 'observations': observations[offset:offset + limit]}
+        elif url.path.endswith('/series'):
+            body = {'seriess': [{'id': query['series_id'], 'observation_start': '1996-12-31'}]}
+        else:
+            self._send(404, b'not found')
+            return
+        payload = json.dumps(body, separators=(',', ':')).encode()
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            self._send(200, gzip.compress(payload), {'Content-Encoding': 'gzip'})
+        else:
+            self._send(200, payload)
+
+    def _send(self, status, payload, headers=None):
+        self.send_response(status)
+        for name, value in {'Content-Length': str(len(payload)), **(headers or {})}.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyFRED)
+    server.connections, server.attempts = set(), {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_retries_transient_errors_over_one_connection(server):
+    session = make_session(retries=3, backoff_factor=0.01, backoff_jitter=0.01)
+    root = f'http://127.0.0.1:{server.server_address[1]}/fred'
+
+    first = get_json(f'{root}/series', params={'series_id': 'DGS10'}, session=session)
+    second = get_json(f'{root}/series', params={'series_id': 'DGS2'}, session=session)
+
+    assert first['seriess'][0]['id'] == 'DGS10' and second['seriess'][0]['id'] == 'DGS2'
+    assert server.attempts['/fred/series'] == 4
+    assert len(server.connections) == 1
+
+
+def test_session_gives_up_after_the_retry_budget(server):
+    import requests
+
+    session = make_session(retries=1, backoff_factor=0.01, backoff_jitter=0.01)
+
+    with pytest.raises(requests.HTTPError):
+        get_json(f'http://127.0.0.1:{server.server_address[1]}/fred/series', params={'series_id': 'X'},
+                 session=session)
+
+
+def test_fred_manager_reads_observations_through_the_session(server):
+    manager = FREDDataManager('key', session=make_session(retries=3, backoff_factor=0.01, backoff_jitter=0.01))
+    manager.API_ROOT = f'http://127.0.0.1:{server.server_address[1]}/fred'
+
+    data = manager.get_data('DGS10', '2020-01-01')
+
+    assert list(data.columns) == ['DGS10'] and data.index.name == 'Date'
+    np.testing.assert_array_equal(data['DGS10'].to_numpy(), [1.5, np.nan, 2.5])
+    assert str(manager.get_earliest_date('DGS10').date()) == '1996-12-31'
@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from managers.job_queue import JobQueue, collect_results, run_worker
+
+WORKER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'worker.py')
+
+
+def test_failed_jobs_are_retried_then_marked_failed(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite'), max_attempts=2)
+    queue.enqueue('square', {'x': 3})
+    queue.enqueue('boom', {})
+    tasks = {'square': lambda payload: payload['x'] ** 2, 'boom': lambda payload: 1 / 0}
+
+    assert run_worker(queue, tasks=tasks) == 3
+
+    assert queue.counts() == {'done': 1, 'failed': 1}
+    assert [result for _, _, result in queue.results()] == [9]
+    assert 'ZeroDivisionError' in queue.failures()[0][2]
+
+
+def test_expired_lease_hands_the_job_to_another_worker(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.sqlite'), lease_seconds=0.05)
+    job_id = queue.enqueue('square', {'x': 2})
+
+    assert queue.claim('a').id == job_id
+    assert queue.claim('b') is None
+    time.sleep(0.1)
+    job = queue.claim('b')
+
+    assert job.id == job_id and job.attempts == 2
+    assert not queue.complete(job_id, 'a', 'stale result')
+    assert queue.complete(job_id, 'b', 4)
+    assert queue.results() == [(job_id, {'x': 2}, 4)]
+
+
+def test_several_worker_processes_drain_a_search(tmp_path):
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2000-01-31', periods=60, freq='ME', name='Date')
+    data = pd.DataFrame(rng.normal(size=(60, 4)), index=index, columns=['a', 'b', 'c', 'target'])
+    data.to_csv(tmp_path / 'processed_data.csv')
+    splits = {'rolling': [[0, 30 + 5 * i, 30 + 5 * i, 35 + 5 * i] for i in range(5)]}
+    (tmp_path / 'splits.json').write_text(json.dumps(splits))
+    configs = {'shallow': {'n_estimators': 5, 'max_depth': 1}, 'deep': {'n_estimators': 5, 'max_depth': 3}}
+    (tmp_path / 'configs.json').write_text(json.dumps(configs))
+    db = str(tmp_path / 'jobs.sqlite')
+
+    subprocess.run([sys.executable, WORKER, '--db', db, 'enqueue', '--data-dir', str(tmp_path),
+                    '--target-col', 'target', '--configs', str(tmp_path / 'configs.json')], check=True)
+    subprocess.run([sys.executable, WORKER, '--db', db, 'work', '--processes', '3'], check=True)
+
+    queue = JobQueue(db)
+    assert queue.counts() == {'done': 10}
+    results = collect_results(queue)
+    assert len(results) == 2 * 5 * 5
+    assert sorted(results.labels['model']) == ['deep', 'shallow']
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from models.objectives import OBJECTIVES, AsymmetricLoss, PseudoHuberLoss, ReturnWeightedLoss, resolve_params
+from models.xgb import XGBoostRegressor
+
+
+@pytest.mark.parametrize('loss', [PseudoHuberLoss(delta=0.7), AsymmetricLoss(over=1.0, under=3.0),
+                                  ReturnWeightedLoss(power=1.5)])
+def test_gradients_match_finite_differences_of_the_loss(loss):
+    rng = np.random.default_rng(0)
+    y_true = rng.normal(size=200)
+    y_pred = y_true + rng.normal(scale=2, size=200)
+    y_pred[np.abs(y_pred - y_true) < 1e-2] += 0.1
+    eps = 1e-4
+
+    grad, hess = loss(y_true.astype(np.float32), y_pred.astype(np.float32))
+
+    def dloss(pred):
+        return (loss.loss(y_true, pred + eps - y_true) - loss.loss(y_true, pred - eps - y_true)) / (2 * eps)
+    np.testing.assert_allclose(grad, dloss(y_pred), rtol=1e-3, atol=1e-4)
+    np.testing.assert_allclose(hess, (dloss(y_pred + eps) - dloss(y_pred - eps)) / (2 * eps), rtol=1e-2, atol=1e-3)
+    # Every round writes into the same buffers.
+    assert loss(y_true, y_pred)[0] is grad
+
+
+def test_registered_objectives_train_by_name():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(300, 4))
+    y = 2 * X[:, 0] + rng.standard_t(2, size=300)
+
+    model = XGBoostRegressor(n_estimators=20, objective='pseudo_huber', objective_params={'delta': 2.0},
+                             eval_metric='pseudo_huber')
+    model.fit(X, y)
+
+    assert isinstance(model.model.objective, PseudoHuberLoss) and model.model.objective.delta == 2.0
+    assert model.model.eval_metric.loss is model.model.objective
+    assert np.isfinite(model.predict(X)).all()
+    assert set(OBJECTIVES) == {'pseudo_huber', 'asymmetric', 'return_weighted'}
+    with pytest.raises(ValueError):
+        resolve_params({'objective': 'reg:squarederror', 'objective_params': {'delta': 1}})
+
+    # Changing only the options of a registered objective on a fitted model rebuilds the loss and its metric.
+    model.set_params(objective_params={'delta': 0.5})
+    assert model.model.objective.delta == 0.5 and model.model.eval_metric.loss is model.model.objective
+    model.fit(X, y)
+    assert np.isfinite(model.predict(X)).all()
@@ -0,0 +1,112 @@
+import os
+import pathlib
+import shutil
+
+import pandas as pd
+import pytest
+
+from managers.pipeline import DATA_DIR, STAGES, Pipeline, read_dated_csv
+from managers.results_store import WalkForwardResults
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name in ['fred-tickers.json', 'fred_data.csv', 'yahoo_data.csv']:
+        shutil.copy(os.path.join(DATA_DIR, name), tmp_path / name)
+    return str(tmp_path)
+
+
+def make_pipeline(data_dir, **train):
+    config = {'train': {'model_params': {'n_estimators': 5, 'max_depth': 2}, **train}}
+    return Pipeline(STAGES, data_dir=data_dir, config=config)
+
+
+def test_run_until_stops_at_the_requested_stage(data_dir):
+    executed = make_pipeline(data_dir).run(until='process')
+
+    assert executed == ['fuse', 'process']
+    assert os.path.exists(os.path.join(data_dir, 'processed_data.csv'))
+    assert not os.path.exists(os.path.join(data_dir, 'splits.json'))
+
+
+def test_rerun_only_executes_stale_stages(data_dir):
+    assert make_pipeline(data_dir).run() == ['fuse', 'process', 'split', 'train', 'evaluate']
+    assert make_pipeline(data_dir).run() == []
+
+    # A config change only invalidates the stage it belongs to and whatever consumes its outputs.
+    assert make_pipeline(data_dir, target_col='BAMLCC0A0CMTRIV').run() == ['train', 'evaluate']
+
+
+def test_edited_output_makes_its_stage_stale(data_dir):
+    pipeline = make_pipeline(data_dir)
+    pipeline.run(until='split')
+    with open(os.path.join(data_dir, 'splits.json'), 'a') as f:
+        f.write('\n')
+
+    assert pipeline.status()['split'] == 'stale'
+    assert pipeline.status()['fuse'] == 'up-to-date'
+
+
+def test_fetch_without_api_key_fails_when_outputs_are_missing(data_dir):
+    os.remove(os.path.join(data_dir, 'yahoo_data.csv'))
+
+    with pytest.raises(ValueError, match='FRED API key'):
+        make_pipeline(data_dir).run(until='fetch')
+
+
+def test_zoo_models_are_evaluated_next_to_xgboost(data_dir, capsys):
+    make_pipeline(data_dir, zoo={'ridge': {'alpha': 10}, 'linear': {}}).run()
+
+    metrics = pd.read_csv(os.path.join(data_dir, 'metrics.csv'))
+    assert set(metrics['model']) == {'xgboost', 'ridge', 'linear'}
+    assert (metrics.groupby('model').size() == metrics.groupby('model').size().iloc[0]).all()
+    printed = [line for line in capsys.readouterr().out.splitlines() if ' RMSE: ' in line]
+    assert len(printed) == len(metrics)
+    assert sum(' (ridge) RMSE: ' in line for line in printed) == (metrics['model'] == 'ridge').sum()
+
+
+def test_zoo_label_may_not_reuse_the_main_model_name(data_dir):
+    with pytest.raises(ValueError, match="'xgboost' is the train stage's own model name"):
+        make_pipeline(data_dir, zoo={'xgboost': {'n_estimators': 5}}).run()
+
+    make_pipeline(data_dir, zoo={'xgboost_deep': {'estimator': 'xgboost', 'n_estimators': 5, 'max_depth': 6}}).run()
+    predictions = WalkForwardResults.load(os.path.join(data_dir, 'predictions.npz')).to_frame()
+    assert not predictions.duplicated(['model', 'scheme', 'fold', 'Date']).any()
+    metrics = pd.read_csv(os.path.join(data_dir, 'metrics.csv'))
+    assert set(metrics['model']) == {'xgboost', 'xgboost_deep'}
+    assert not metrics.duplicated(['model', 'scheme', 'fold']).any()
+
+
+def test_outputs_shipped_with_the_checkout_are_adopted(data_dir):
+    for name in ['merged_data.csv', 'processed_data.csv']:
+        shutil.copy(os.path.join(DATA_DIR, name), os.path.join(data_dir, name))
+    processed = pathlib.Path(data_dir, 'processed_data.csv')
+    shipped = processed.read_bytes()
+
+    assert make_pipeline(data_dir).run(until='process') == []
+    assert processed.read_bytes() == shipped
+
+    # Once adopted, the stages are tracked like any other: newly fetched data (written in place and recorded, as
+    # the refresh daemon does) makes them stale.
+    fred = pathlib.Path(data_dir, 'fred_data.csv')
+    fred.write_text(''.join(fred.read_text().splitlines(keepends=True)[:-1]))
+    pipeline = make_pipeline(data_dir)
+    pipeline.mark_up_to_date('fetch')
+    assert pipeline.run(until='process') == ['fuse', 'process']
+
+
+def test_outputs_are_not_adopted_over_newer_fetched_data(data_dir, monkeypatch):
+    for name in ['merged_data.csv', 'processed_data.csv']:
+        shutil.copy(os.path.join(DATA_DIR, name), os.path.join(data_dir, name))
+
+    def fetch(pipeline, config):
+        read_dated_csv(pipeline.path('fred_data.csv')).loc[:'2023-12-31'].to_csv(pipeline.path('fred_data.csv'))
+
+    monkeypatch.setattr(STAGES[0], 'func', fetch)
+    assert make_pipeline(data_dir).run(only='fetch', force=['fetch']) == ['fetch']
+
+    # The shipped outputs were built from the data the fetch just replaced.
+    pipeline = make_pipeline(data_dir)
+    assert pipeline.run(until='process') == ['fuse', 'process']
+    assert read_dated_csv(os.path.join(data_dir, 'processed_data.csv')).index[-1] <= pd.Timestamp('2023-12-31')
+    assert pipeline.status()['process'] == 'up-to-date'
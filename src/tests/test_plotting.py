@@ -0,0 +1,48 @@
+import matplotlib
+import numpy as np
+import pandas as pd
+
+from managers.plotting import DownsampleCache, lttb_downsample, minmax_downsample, plot_series
+
+matplotlib.use('Agg')
+
+
+def make_series(n=23000, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('1930-01-01', periods=n, freq='D')
+    values = 100 + rng.normal(size=n).cumsum()
+    values[5000] = 1000
+    values[::97] = np.nan
+    return pd.Series(values, index=index)
+
+
+def test_minmax_keeps_every_extreme_and_lttb_keeps_the_spike():
+    series = make_series().dropna()
+    x, y = series.index.to_numpy(), series.to_numpy()
+
+    mx, my = minmax_downsample(x, y, 400)
+    assert len(my) <= 802 and my.max() == y.max() and my.min() == y.min()
+    assert mx[0] == x[0] and mx[-1] == x[-1] and (np.diff(mx.astype(np.int64)) > 0).all()
+
+    lx, ly = lttb_downsample(x, y, 500)
+    assert len(ly) == 500 and ly.max() == 1000
+    assert lx[0] == x[0] and lx[-1] == x[-1] and (np.diff(lx.astype(np.int64)) > 0).all()
+
+
+def test_zooming_redownsamples_the_visible_range_and_reuses_the_cache():
+    series = make_series()
+    cache = DownsampleCache(method='lttb')
+    plot = plot_series({'a': series, 'b': series * 2}, cache=cache)
+    line = plot.lines['a']
+    assert len(line.get_xdata()) <= plot.n_points()
+
+    plot.ax.set_xlim(pd.Timestamp('1950-01-01'), pd.Timestamp('1951-01-01'))
+    zoomed = line.get_xdata()
+    assert zoomed[1] >= np.datetime64('1950-01-01') and zoomed[-2] <= np.datetime64('1951-01-01')
+    # A year of daily data is drawn in full.
+    assert len(zoomed) == series['1949-12-31':'1951-01-02'].notna().sum()
+
+    misses = cache.misses
+    plot.ax.set_xlim(pd.Timestamp('1960-01-01'), pd.Timestamp('1970-01-01'))
+    plot.ax.set_xlim(pd.Timestamp('1950-01-01'), pd.Timestamp('1951-01-01'))
+    assert cache.misses == misses + 2 and cache.hits >= 2
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from managers.results_store import WalkForwardResults
+from models.portfolio import (PortfolioOptimizer, covariance_history, expected_returns, long_only_weights,
+                              mean_variance_weights, risk_parity_weights)
+
+
+ASSETS = ['BAMLHYH0A0HYM2TRIV', 'BAMLCC0A0CMTRIV', 'DGS10', 'DGS2']
+
+
+def make_returns(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    mixing = rng.normal(size=(len(ASSETS), len(ASSETS)))
+    returns = pd.DataFrame(rng.normal(size=(n, len(ASSETS))) @ mixing * 0.01,
+                           index=pd.date_range('2000-01-31', periods=n, freq='ME'), columns=ASSETS)
+    returns.iloc[5, 2] = np.nan
+    return returns
+
+
+def test_incremental_covariances_match_pandas_and_skip_the_current_date():
+    returns = make_returns()
+    complete = returns.dropna()
+    halflife = 10
+
+    ewma = covariance_history(returns, halflife=halflife, min_periods=2)
+    rolling = covariance_history(returns, estimator='rolling', window=36, min_periods=2)
+
+    date = returns.index[80]
+    past = complete[complete.index < date]
+    expected_ewma = past.ewm(alpha=1 - 0.5 ** (1 / halflife), adjust=False).cov(bias=True).loc[past.index[-1]]
+    np.testing.assert_allclose(ewma[80], expected_ewma.to_numpy(), atol=1e-15)
+    np.testing.assert_allclose(rolling[80], past.iloc[-36:].cov().to_numpy(), atol=1e-15)
+    assert np.isnan(covariance_history(returns, min_periods=12)[:12]).all()
+
+
+def test_solvers_satisfy_their_optimality_conditions():
+    returns = make_returns()
+    cov = covariance_history(returns, min_periods=24)
+    cov = cov[~np.isnan(cov).any(axis=(1, 2))]
+    rng = np.random.default_rng(1)
+    mu = rng.normal(scale=0.01, size=(len(cov), len(ASSETS)))
+
+    weights = mean_variance_weights(mu, cov, risk_aversion=4)
+    multiplier = mu - 4 * np.einsum('tij,tj->ti', cov, weights)
+    np.testing.assert_allclose(weights.sum(axis=1), 1)
+    np.testing.assert_allclose(multiplier, multiplier[:, :1] * np.ones(len(ASSETS)), atol=1e-12)
+
+    weights = risk_parity_weights(cov)
+    contributions = weights * np.einsum('tij,tj->ti', cov, weights)
+    np.testing.assert_allclose(contributions / contributions.sum(axis=1, keepdims=True), 1 / len(ASSETS))
+
+    weights = long_only_weights(mu, cov, risk_aversion=4, max_weight=0.4)
+    assert (weights >= 0).all() and (weights <= 0.4 + 1e-12).all()
+    np.testing.assert_allclose(weights.sum(axis=1), 1)
+    # No feasible direction improves the objective: the gradient is steepest on the binding bounds.
+    gradient = 4 * np.einsum('tij,tj->ti', cov, weights) - mu
+    for g, w in zip(gradient, weights):
+        free = (w > 1e-8) & (w < 0.4 - 1e-8)
+        if free.any():
+            assert np.ptp(g[free]) < 1e-6
+            assert (g[w <= 1e-8] >= g[free].max() - 1e-6).all()
+            assert (g[w >= 0.4 - 1e-8] <= g[free].min() + 1e-6).all()
+
+
+def test_optimizer_uses_walk_forward_predictions():
+    returns = make_returns()
+    dates = returns.index[60:]
+    results = WalkForwardResults()
+    for asset in ASSETS:
+        results.append(0, dates, returns.loc[dates, asset], returns.loc[dates, asset] + 0.001, target=asset)
+        results.append(0, dates, returns.loc[dates, asset], np.zeros(len(dates)), model='other', target=asset)
+
+    with pytest.raises(ValueError):
+        expected_returns(results)
+    expected = expected_returns(results, model='default')
+
+    weights = PortfolioOptimizer('long_only', max_weight=0.5).optimize(returns, expected)
+
+    assert list(weights.columns) == list(expected.columns) and weights.index.equals(dates)
+    np.testing.assert_allclose(weights.sum(axis=1), 1)
+    # Changing a realised return must not move the allocation made at or before its date.
+    shocked = returns.copy()
+    shocked.iloc[90:] *= 10
+    np.testing.assert_allclose(PortfolioOptimizer('long_only', max_weight=0.5).optimize(shocked, expected)
+                               .iloc[:31], weights.iloc[:31], atol=1e-8)
+    assert PortfolioOptimizer('risk_parity', min_periods=24).optimize(returns).iloc[:24].isna().all().all()
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.rebalancing_env import RebalancingEnv
+
+
+@pytest.fixture
+def market():
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(40, 3))
+    returns = 0.01 * rng.normal(size=(40, 2))
+    returns[25] = np.nan
+    return features, returns
+
+
+def test_rewards_are_net_of_costs_on_drifted_weights(market):
+    features, returns = market
+    env = RebalancingEnv(features, returns, n_envs=3, episode_length=5, cost=0.01, seed=0)
+
+    obs = env.reset()
+    rows = env.row.copy()
+    assert obs.shape == (3, 5) and obs.dtype == np.float32 and not obs[:, 3:].any()
+    # No episode runs over the missing returns of row 25.
+    assert ((env.starts + 5 <= 25) | (env.starts > 25)).all()
+
+    obs, rewards, dones, info = env.step(np.tile([0.6, 0.4], (3, 1)))
+    r = returns[rows]
+    gross = r @ [0.6, 0.4]
+    np.testing.assert_allclose(rewards, gross - 0.01 * 1.0)
+    drifted = np.array([0.6, 0.4]) * (1 + r) / (1 + gross)[:, None]
+    np.testing.assert_allclose(obs[:, 3:], drifted, rtol=1e-6)
+    np.testing.assert_array_equal(obs[:, :3], features[rows + 1].astype(np.float32))
+
+    # Holding the drifted weights costs nothing; an over-allocated action is scaled to be fully invested.
+    _, rewards, _, info = env.step(drifted)
+    np.testing.assert_allclose(info['turnover'], 0, atol=1e-12)
+    np.testing.assert_allclose(rewards, (drifted * returns[rows + 1]).sum(axis=1))
+    np.testing.assert_allclose(env.allocations(np.tile([3.0, -1.0], (3, 1))), np.tile([1.0, 0.0], (3, 1)))
+
+
+def test_episodes_restart_with_seeded_starts(market):
+    features, returns = market
+
+    def run(seed):
+        env = RebalancingEnv(pd.DataFrame(features), pd.DataFrame(returns), n_envs=8, episode_length=4, seed=seed)
+        env.reset()
+        history = []
+        for _ in range(9):
+            _, rewards, dones, info = env.step(np.full((8, 2), 0.5))
+            history.append((env.row.copy(), rewards, dones, info['final_value']))
+        return history
+
+    first, second = run(7), run(7)
+    for (rows, rewards, dones, final), (rows2, rewards2, _, _) in zip(first, second):
+        np.testing.assert_array_equal(rows, rows2)
+        np.testing.assert_array_equal(rewards, rewards2)
+    dones = np.array([step[2] for step in first])
+    assert dones[[3, 7]].all() and not dones[[0, 1, 2, 4, 5, 6, 8]].any()
+    assert np.isfinite(first[3][3]).all() and np.isnan(first[4][3]).all()
+    assert not all(np.array_equal(a[0], b[0]) for a, b in zip(first, run(8)))
+
+    with pytest.raises(ValueError, match='No 30-row stretch'):
+        RebalancingEnv(features, returns, episode_length=30)
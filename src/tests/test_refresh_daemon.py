@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from managers.pipeline import META_DIRNAME, STAGES, Pipeline, read_dated_csv
+from managers.refresh_daemon import RefreshDaemon
+
+
+class FakeFRED:
+    def __init__(self, data):
+        self.data = data
+        self.updates = {}
+        self.polls = 0
+        self.fetched = []
+
+    def get_last_updated(self, series_ids, since=None):
+        self.polls += 1
+        return {series_id: ts for series_id, ts in self.updates.items() if series_id in series_ids}
+
+    def get_data(self, series_id, start_date):
+        self.fetched.append(series_id)
+        return self.data[[series_id]].loc[start_date:]
+
+
+class FakeYahoo:
+    def __init__(self, data):
+        self.data = data
+
+    def get_latest_dates(self, tickers):
+        return {'SPY': self.data.index[-1]}
+
+    def get_data(self, ticker, csv_filename):
+        self.data.to_csv(csv_filename)
+        return self.data
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2000-01-01', '2004-12-31', name='Date')
+    fred = pd.DataFrame({'GDP': rng.normal(size=len(index)).cumsum(),
+                         'HY': 100 + rng.normal(size=len(index)).cumsum()}, index=index)
+    fred.to_csv(tmp_path / 'fred_data.csv')
+    pd.DataFrame({'SPY': 50 + rng.normal(size=len(index)).cumsum()}, index=index).to_csv(tmp_path / 'yahoo_data.csv')
+    (tmp_path / 'fred-tickers.json').write_text(json.dumps({'Growth': 'GDP', 'High Yield': 'HY'}))
+    config = {'process': {'target_columns': ['HY']},
+              'split': {'rolling': {'initial_train_size': 24, 'step_size': 12, 'test_size': 6}},
+              'train': {'target_col': 'HY', 'model_params': {'n_estimators': 5}}}
+    pipeline = Pipeline(STAGES, data_dir=str(tmp_path), config=config)
+    pipeline.run()
+    return pipeline
+
+
+def make_daemon(pipeline):
+    fred_data = read_dated_csv(pipeline.path('fred_data.csv'))
+    daemon = RefreshDaemon(pipeline, FakeFRED(fred_data), FakeYahoo(read_dated_csv(pipeline.path('yahoo_data.csv'))))
+    daemon.state['yahoo_last_date'] = daemon.yahoo_manager.data.index[-1].isoformat()
+    return daemon
+
+
+def test_poll_without_new_releases_is_a_no_op(pipeline):
+    daemon = make_daemon(pipeline)
+
+    assert asyncio.run(daemon.poll_once()) == []
+    assert daemon.fred_manager.polls == 1
+    assert daemon.fred_manager.fetched == []
+    assert pipeline.status()['process'] == 'up-to-date'
+
+
+def test_poll_refreshes_only_changed_series_and_rescores(pipeline):
+    daemon = make_daemon(pipeline)
+    daemon.fred_manager.data.loc['2004-12-31', 'GDP'] = 1e6
+    daemon.fred_manager.updates = {'GDP': pd.Timestamp('2005-01-05 08:00:00-06:00')}
+
+    assert asyncio.run(daemon.poll_once()) == ['GDP']
+
+    assert daemon.fred_manager.fetched == ['GDP']
+    assert read_dated_csv(pipeline.path('processed_data.csv'))['GDP'].iloc[-1] == 1e6
+    scores = pd.read_csv(pipeline.path(RefreshDaemon.SCORES_FILE))
+    assert scores['Date'].tolist() == ['2004-12-31'] and scores['target'].tolist() == ['HY']
+
+    # The same release is not processed twice.
+    assert asyncio.run(daemon.poll_once()) == []
+    assert daemon.fred_manager.fetched == ['GDP']
+
+
+def test_partial_fetch_keeps_the_recorded_fetch_stage_up_to_date(pipeline, monkeypatch):
+    pipeline.mark_up_to_date('fetch')
+    daemon = make_daemon(pipeline)
+    daemon.fred_manager.updates = {'GDP': pd.Timestamp('2005-01-05 08:00:00-06:00')}
+    pipeline.api_key = 'key'
+
+    def full_download(*args, **kwargs):
+        raise AssertionError("the fetch stage ran")
+
+    monkeypatch.setattr(STAGES[0], 'func', full_download)
+    assert asyncio.run(daemon.poll_once()) == ['GDP']
+
+    assert daemon.fred_manager.fetched == ['GDP']
+    assert pipeline.status()['fetch'] == 'up-to-date'
+
+
+def test_first_poll_of_a_fresh_checkout_rebuilds_the_processed_data(pipeline):
+    # A checkout ships its data files but no stage records.
+    shutil.rmtree(os.path.join(pipeline.data_dir, META_DIRNAME))
+    daemon = make_daemon(pipeline)
+    daemon.fred_manager.data.loc['2004-12-31', 'GDP'] = 1e6
+    daemon.fred_manager.updates = {'GDP': pd.Timestamp('2005-01-05 08:00:00-06:00')}
+
+    assert asyncio.run(daemon.poll_once()) == ['GDP']
+
+    assert read_dated_csv(pipeline.path('processed_data.csv'))['GDP'].iloc[-1] == 1e6
+    assert pipeline.status()['process'] == 'up-to-date'
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+
+from managers.resources import CORES_ENV_VAR, ResourceManager
+from models.xgb import XGBoostRegressor
+
+
+def test_pools_split_the_core_budget():
+    manager = ResourceManager(cores=8)
+
+    assert manager.split(3) == (3, 2)
+    assert manager.split(20) == (8, 1)
+    assert manager.split(20, max_workers=2) == (2, 4)
+    with manager.thread_pool(4) as pool:
+        shares = list(pool.map(lambda _: (manager.threads(), manager.split(2)), range(4)))
+    assert shares == [(2, (2, 1))] * 4
+    assert manager.threads() == 8
+
+    env, per_child = manager.child_env(3, env={})
+    assert per_child == 2 and env[CORES_ENV_VAR] == '2' and env['OMP_NUM_THREADS'] == '2'
+
+
+def test_budget_comes_from_the_environment(monkeypatch):
+    monkeypatch.setenv(CORES_ENV_VAR, '3')
+
+    assert ResourceManager().cores == 3
+    assert ResourceManager(cores=5).cores == 5
+
+
+def test_xgboost_uses_the_worker_share(monkeypatch):
+    import managers.resources
+
+    manager = ResourceManager(cores=4)
+    monkeypatch.setattr(managers.resources, '_manager', manager)
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(50, 3)), rng.normal(size=50)
+
+    def fit(_):
+        return XGBoostRegressor(n_estimators=2).fit(X, y).model.get_params()['n_jobs']
+
+    with manager.thread_pool(2) as pool:
+        assert list(pool.map(fit, range(2))) == [2, 2]
+    assert fit(None) == 4
+    assert XGBoostRegressor(n_estimators=2, n_jobs=1).fit(X, y).model.get_params()['n_jobs'] == 1
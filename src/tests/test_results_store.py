@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from managers.results_store import WalkForwardResults
+
+
+@pytest.fixture
+def results():
+    rng = np.random.default_rng(0)
+    store = WalkForwardResults(capacity=4)
+    for model in ['xgb', 'ridge']:
+        for fold in range(3):
+            dates = pd.date_range('2000-01-31', periods=20, freq='ME') + pd.DateOffset(months=20 * fold)
+            actual = rng.normal(size=20)
+            store.append(fold, dates, actual, actual + rng.normal(scale=0.5, size=20), model=model,
+                         scheme='rolling', target='HY')
+    return store
+
+
+def test_metrics_match_pandas_groupby(results):
+    frame = results.to_frame()
+    metrics = results.metrics(by=['model', 'fold'])
+
+    expected = frame.groupby(['model', 'fold'], sort=False).apply(lambda g: pd.Series({
+        'rmse': np.sqrt(((g.actual - g.predicted) ** 2).mean()),
+        'hit_rate': (np.sign(g.actual) == np.sign(g.predicted)).mean(),
+        'ic': g.actual.corr(g.predicted)}), include_groups=False).reset_index()
+    pd.testing.assert_frame_equal(metrics.drop(columns='n'), expected, check_dtype=False)
+    assert (metrics['n'] == 20).all()
+
+
+def test_bootstrap_intervals_bracket_the_estimate(results):
+    metrics = results.metrics(by=['model'], n_bootstrap=200)
+
+    for metric in ['rmse', 'hit_rate', 'ic']:
+        assert (metrics[f'{metric}_lower'] <= metrics[metric]).all()
+        assert (metrics[metric] <= metrics[f'{metric}_upper']).all()
+
+
+def test_save_load_and_select_round_trip(results, tmp_path):
+    results.save(tmp_path / 'predictions.npz')
+    loaded = WalkForwardResults.load(tmp_path / 'predictions.npz')
+
+    pd.testing.assert_frame_equal(loaded.to_frame(), results.to_frame())
+    ridge = loaded.select(model='ridge', fold=[1, 2])
+    assert len(ridge) == 40 and set(ridge.column('model')) == {'ridge'}
+
+    combined = WalkForwardResults()
+    combined.extend(ridge)
+    combined.extend(loaded.select(model='xgb'))
+    assert combined.metrics(by=['model'])['n'].tolist() == [40, 60]
@@ -1,6 +1,10 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from managers.plotting import plot_series  # noqa: E402
 
 # Set the paths
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,17 +23,10 @@ spx_data['Date'] = pd.to_datetime(spx_data['Date'])
 spx_data.set_index('Date', inplace=True)
 spx_data = spx_data[spx_data.index >= fred_data.index.min()]
 
-# Plot the data
-plt.figure(figsize=(12, 8))
-plt.plot(spx_data.index, spx_data['Close'], label='SPX Close')
-# plt.plot(spx_data.index, spx_data['Adj Close'], label='SPX Adj Close')
-plt.plot(fred_data.index, fred_data['SP500'], label='FRED SP500')
-
-plt.title('Comparison of SPX and FRED SP500 Data')
-plt.xlabel('Date')
-plt.ylabel('Price')
-plt.legend()
-plt.grid(True)
+# Plot the data, downsampled to the width of the figure.
+plot = plot_series({'SPX Close': spx_data['Close'], 'FRED SP500': fred_data['SP500']},
+                   title='Comparison of SPX and FRED SP500 Data', ylabel='Price')
+plot.ax.set_xlabel('Date')
 
 plt.tight_layout()
 plt.show()
@@ -0,0 +1,21 @@
+from benchmarks.startup_benchmark import heavy_imports, measure_startup
+from managers.results_store import WalkForwardResults
+
+
+def test_status_only_imports_the_standard_library(tmp_path):
+    _, entries = measure_startup(['--data-dir', str(tmp_path), '--status'], repeats=1)
+
+    imported = {module.split('.')[0] for module, _, _, _ in entries}
+    assert 'pandas' not in imported
+    assert heavy_imports(entries) == []
+
+
+def test_cached_evaluation_skips_heavy_dependencies(tmp_path):
+    results = WalkForwardResults()
+    results.append(0, ['2000-01-31', '2000-02-29'], [1.0, 2.0], [1.5, 1.5], scheme='rolling')
+    results.save(tmp_path / 'predictions.npz')
+
+    _, entries = measure_startup(['--data-dir', str(tmp_path), '--only', 'evaluate'], repeats=1)
+
+    assert (tmp_path / 'metrics.csv').exists()
+    assert heavy_imports(entries) == []
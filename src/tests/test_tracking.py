@@ -0,0 +1,58 @@
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+import managers.tracking
+from managers.pipeline import DATA_DIR, STAGES, Pipeline
+from managers.tracking import ExperimentTracker
+
+
+class SlowStore:
+    def __init__(self, run_id):
+        self.batches = []
+
+    def write(self, params, metrics, artifacts):
+        time.sleep(0.2)
+        self.batches.append((params, metrics, artifacts))
+
+    def close(self):
+        pass
+
+
+def test_logging_does_not_wait_for_the_backend(monkeypatch):
+    monkeypatch.setitem(managers.tracking.BACKENDS, 'slow', SlowStore)
+    tracker = ExperimentTracker(None, backend='slow', flush_interval=0.05)
+
+    start = time.perf_counter()
+    tracker.log_params({'max_depth': 3})
+    for fold in range(100):
+        tracker.log_metrics({'rmse': fold}, step=fold)
+    assert time.perf_counter() - start < 0.1
+
+    assert tracker.flush(timeout=5)
+    tracker.close()
+    metrics = [record for _, batch, _ in tracker.store.batches for record in batch]
+    assert [record['step'] for record in metrics] == list(range(100))
+    assert len(tracker.store.batches) < 10
+    with pytest.raises(RuntimeError):
+        tracker.log_metrics({'rmse': 0})
+
+
+def test_train_stage_logs_to_the_local_store(tmp_path):
+    for name in ['fred-tickers.json', 'fred_data.csv', 'yahoo_data.csv']:
+        shutil.copy(os.path.join(DATA_DIR, name), tmp_path / name)
+    pipeline = Pipeline(STAGES, data_dir=str(tmp_path), config={'train': {'model_params': {'n_estimators': 5}}})
+
+    pipeline.run(until='train')
+
+    (run_dir,) = (tmp_path / 'runs').iterdir()
+    with open(run_dir / 'metrics.jsonl') as f:
+        records = [json.loads(line) for line in f]
+    with open(tmp_path / 'splits.json') as f:
+        n_folds = sum(len(bounds) for bounds in json.load(f).values())
+    assert len([record for record in records if 'rmse' in record]) == n_folds
+    assert json.loads((run_dir / 'params.json').read_text())['model_params'] == {'n_estimators': 5}
+    assert (run_dir / 'artifacts' / 'predictions.npz').exists()
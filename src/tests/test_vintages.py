@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+from managers.vintages import SeriesVintages, VintageStore
+
+
+class FakeALFRED:
+    """
+    Serves a made-up revision history in the string format of ALFRED's series/observations.
+    """
+
+    def __init__(self, records):
+        self.records = records
+
+    def get_vintages(self, series_id, start_date=None):
+        frame = pd.DataFrame(self.records[series_id], columns=['date', 'realtime_start', 'realtime_end', 'value'])
+        return frame[frame['date'] >= start_date] if start_date is not None else frame
+
+
+RECORDS = {
+    # January is first published in February, revised in March and again (to missing) in April.
+    'GDP': [('2020-01-01', '2020-02-01', '2020-02-29', '1.0'), ('2020-01-01', '2020-03-01', '2020-03-31', '1.1'),
+            ('2020-01-01', '2020-04-01', '9999-12-31', '.'), ('2020-02-01', '2020-03-01', '9999-12-31', '2.0'),
+            ('2019-12-01', '2020-01-01', '9999-12-31', '0.5')],
+    'UNRATE': [('2020-01-01', '2020-02-07', '9999-12-31', '3.6'), ('2020-02-01', '2020-03-06', '9999-12-31', '3.5')],
+}
+
+
+def test_as_of_returns_what_was_published_on_the_day(tmp_path):
+    store = VintageStore(str(tmp_path / 'vintages'))
+    assert store.fetch(FakeALFRED(RECORDS), ['GDP', 'UNRATE']) == {}
+
+    gdp = VintageStore(str(tmp_path / 'vintages')).load('GDP')
+    assert gdp.as_of('2019-12-31').empty
+    assert gdp.as_of('2020-02-15').to_dict() == {pd.Timestamp('2019-12-01'): 0.5, pd.Timestamp('2020-01-01'): 1.0}
+    assert gdp.as_of('2020-03-01').tolist() == [0.5, 1.1, 2.0]
+    assert gdp.as_of('2020-03-01', start='2020-01-01', end='2020-01-31').tolist() == [1.1]
+    assert np.isnan(gdp.latest()['2020-01-01']) and len(gdp.latest()) == 3
+    assert gdp.vintage_dates().tolist() == [np.datetime64(d, 'D') for d in
+                                            ['2020-01-01', '2020-02-01', '2020-03-01', '2020-04-01']]
+
+    panel = store.as_of(['GDP', 'UNRATE'], '2020-03-05')
+    # February's unemployment rate was only released on March 6.
+    assert list(panel.columns) == ['GDP', 'UNRATE'] and np.isnan(panel.loc['2020-02-01', 'UNRATE'])
+    index = pd.date_range('2019-12-31', periods=4, freq='ME')
+    folds = list(store.fold_panels(['GDP'], index, [(0, 2, 2, 3), (0, 3, 3, 4)]))
+    assert [known_on for _, known_on, _ in folds] == [index[1], index[2]]
+    assert folds[0][2]['GDP'].tolist() == [0.5] and folds[1][2]['GDP'].tolist() == [0.5, 1.0]
+
+
+def test_delta_encoding_round_trips_and_matches_full_snapshots(tmp_path):
+    # Monthly series where every release publishes a month and revises the two before it.
+    rng = np.random.default_rng(0)
+    months = pd.date_range('2000-01-01', periods=60, freq='MS')
+    releases = months + pd.DateOffset(months=1, days=14)
+    records, snapshots = [], {}
+    current = {}
+    for k, release in enumerate(releases):
+        for j in range(max(0, k - 2), k + 1):
+            value = round(rng.normal(), 3)
+            if j in current:
+                records[current[j]][2] = release - pd.Timedelta(days=1)
+            current[j] = len(records)
+            records.append([months[j], release, pd.Timestamp('9999-12-31'), value])
+        snapshots[release] = [records[current[j]][3] for j in range(k + 1)]
+    frame = pd.DataFrame([[str(d.date()), str(s.date()), '9999-12-31' if e.year == 9999 else str(e.date()), str(v)]
+                          for d, s, e, v in records], columns=['date', 'realtime_start', 'realtime_end', 'value'])
+    vintages = SeriesVintages.from_frame(frame.sample(frac=1, random_state=0))
+
+    store = VintageStore(str(tmp_path))
+    store.save('IP', vintages)
+    decoded = VintageStore(str(tmp_path)).load('IP')
+
+    for release, snapshot in snapshots.items():
+        np.testing.assert_array_equal(decoded.as_of(release).to_numpy(), snapshot)
+        np.testing.assert_array_equal(decoded.as_of(release + pd.Timedelta(days=20)).to_numpy(), snapshot)
+    # Far fewer records than rows in the snapshots, and smaller still on disk.
+    assert len(vintages) < sum(map(len, snapshots.values())) / 8
+    assert (tmp_path / 'IP.vintages.npz').stat().st_size < vintages.nbytes
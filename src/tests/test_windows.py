@@ -0,0 +1,63 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from managers.windows import WindowBuilder
+
+
+def make_frame(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.normal(size=(n, 3)), columns=['a', 'b', 'y'],
+                         index=pd.date_range('2000-01-31', periods=n, freq='ME', name='Date'))
+    frame.iloc[10, 1] = np.nan
+    return frame
+
+
+def test_windows_and_lags_are_read_only_views_matching_shift():
+    frame = make_frame()
+    builder = WindowBuilder(frame[['a', 'b']], target=frame['y'], horizon=1, dtype=np.float64)
+
+    lags = builder.lags(3)
+    windows = builder.windows(24)
+
+    assert np.shares_memory(lags, builder.values) and np.shares_memory(windows, builder.values)
+    assert not lags.flags.writeable and not windows.flags.writeable
+    shifted = np.stack([frame[['a', 'b']].shift(k).to_numpy() for k in range(4)], axis=1)[3:3 + len(lags)]
+    np.testing.assert_array_equal(lags, shifted)
+    np.testing.assert_array_equal(windows[5, -1], frame[['a', 'b']].iloc[28])
+    np.testing.assert_array_equal(builder.targets(24), frame['y'].iloc[24:].to_numpy())
+    assert builder.dates(24)[0] == frame.index[23] and len(windows) == len(builder.targets(24)) == 36
+    # Windows containing row 10 (missing 'b') are flagged.
+    assert np.flatnonzero(~builder.valid(4)).tolist() == [7, 8, 9, 10]
+    assert builder.sample_range(4, 20, 30).tolist() == list(range(17, 26))
+
+
+def test_batches_cover_every_valid_sample_with_prefetching():
+    frame = make_frame()
+    builder = WindowBuilder(frame, target='y')
+
+    batches = list(builder.batches(6, batch_size=16))
+    X = np.concatenate([X for X, _ in batches])
+    y = np.concatenate([y for _, y in batches])
+
+    valid = np.flatnonzero(builder.valid(6))
+    assert len(batches) == len(builder.batches(6, batch_size=16))
+    np.testing.assert_array_equal(X, builder.windows(6)[valid])
+    np.testing.assert_array_equal(y, builder.targets(6)[valid])
+
+    shuffled = np.concatenate([y for _, y in builder.batches(6, batch_size=16, shuffle=True, seed=1)])
+    assert sorted(shuffled) == sorted(y) and not np.array_equal(shuffled, y)
+
+    # Stopping early leaves no producer thread behind.
+    for _ in builder.batches(6, batch_size=4, prefetch=1):
+        break
+    assert not [thread for thread in threading.enumerate() if thread.name == 'batch-prefetch']
+
+
+def test_errors_while_assembling_reach_the_consumer():
+    builder = WindowBuilder(make_frame())
+
+    with pytest.raises(IndexError):
+        list(builder.batches(6, samples=[0, 1, 10_000]))
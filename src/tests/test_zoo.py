@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from managers.feature_selection import CorrelationPruner, FoldFeatureSelector
+from models.zoo import FoldCache, ModelZoo, make_models
+
+
+@pytest.fixture
+def walk_forward():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(120, 5)), columns=list('abcde'),
+                     index=pd.date_range('2000-01-31', periods=120, freq='ME'))
+    y = 2 * X['a'] - X['c'] + 0.1 * rng.normal(size=120)
+    X.iloc[7, 1] = np.nan
+    y.iloc[3] = np.nan
+    splits = {'rolling': [(0, 60, 60, 80), (0, 80, 80, 100)], 'sliding': [(40, 100, 100, 120)]}
+    return X, y, splits
+
+
+def test_fold_cache_shares_the_feature_array_and_drops_unlabelled_rows(walk_forward):
+    X, y, splits = walk_forward
+
+    cache = FoldCache(X, y, splits)
+    fold = cache['sliding', 0]
+    assert len(cache) == 3 and fold['columns'] is None
+    assert np.shares_memory(fold['X_train'], cache.values) and np.shares_memory(fold['X_test'], cache.values)
+    np.testing.assert_array_equal(fold['X_test'], X.iloc[100:120].to_numpy())
+    assert fold['dates'][0] == X.index[100]
+    # The row without a target is left out of the first training windows only.
+    assert len(cache['rolling', 0]['y_train']) == 59 and len(fold['y_train']) == 60
+    assert cache.nbytes() < 2 * (cache.values.nbytes + cache.target.nbytes)
+
+    selected = FoldCache(X, y, splits, FoldFeatureSelector(X, y, CorrelationPruner(max_features=2)))
+    fold = selected['rolling', 1]
+    assert sorted(fold['columns']) == [0, 2] and fold['X_train'].shape == (79, 2)
+    np.testing.assert_array_equal(fold['X_test'], X.iloc[80:100, [0, 2]].to_numpy())
+
+
+def test_zoo_matches_fitting_each_model_alone(walk_forward):
+    X, y, splits = walk_forward
+    cache = FoldCache(X, y, splits)
+    models = make_models({'linear': {}, 'ridge': {'alpha': 1.0},
+                          'forest': {'estimator': 'random_forest', 'n_estimators': 10, 'random_state': 0},
+                          'xgboost': {'n_estimators': 10, 'max_depth': 2}})
+
+    results = ModelZoo(models, n_jobs=4).run(cache, target='y')
+
+    assert len(results) == 4 * 60 and results.labels['model'] == ['linear', 'ridge', 'forest', 'xgboost']
+    for name, model in models.items():
+        fold = cache['rolling', 1]
+        expected = model.fit(fold['X_train'], fold['y_train']).predict(fold['X_test'])
+        np.testing.assert_allclose(results.select(model=name, scheme='rolling', fold=1).predicted, expected,
+                                   rtol=1e-6)
+    metrics = results.metrics(by=['model'])
+    assert metrics.set_index('model').loc['linear', 'rmse'] < 0.2
+
+    with pytest.raises(ValueError, match='Unknown estimator'):
+        make_models({'lasso': {}})
@@ -0,0 +1,79 @@
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+
+from managers.job_queue import JobQueue, collect_results, enqueue_search, run_worker
+from managers.pipeline import DATA_DIR
+from managers.resources import get_manager, set_cores
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Distribute walk-forward folds x XGBoost configurations over "
+                                                 "worker processes sharing a SQLite job queue.")
+    parser.add_argument('--db', default=os.path.join(DATA_DIR, 'jobs.sqlite'), help="Path of the queue database")
+    parser.add_argument('--lease', type=float, default=300, help="Lease duration of a claimed job in seconds")
+    parser.add_argument('--cores', type=int,
+                        help="Number of cores to use, shared by the worker processes (default: all available)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help="Enqueue every fold of splits.json for every configuration")
+    enqueue.add_argument('--data-dir', default=DATA_DIR, help="Directory holding processed_data.csv and splits.json")
+    enqueue.add_argument('--target-col', default='BAMLHYH0A0HYM2TRIV')
+    enqueue.add_argument('--configs', required=True,
+                         help="JSON file mapping configuration name to XGBoostModel parameters")
+
+    work = commands.add_parser('work', help="Run workers until the queue is drained")
+    work.add_argument('--processes', type=int, default=1, help="Number of worker processes to start on this host")
+    work.add_argument('--forever', action='store_true', help="Keep polling instead of exiting on an empty queue")
+    work.add_argument('--poll-interval', type=float, default=5.0)
+
+    commands.add_parser('status', help="Print the number of jobs per status")
+
+    collect = commands.add_parser('collect', help="Write the finished folds to a results store")
+    collect.add_argument('--output', required=True, help="Path of the .npz results store to write")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    queue = JobQueue(args.db, lease_seconds=args.lease)
+    if args.cores:
+        set_cores(args.cores)
+
+    if args.command == 'enqueue':
+        with open(os.path.join(args.data_dir, 'splits.json')) as f:
+            splits = json.load(f)
+        with open(args.configs) as f:
+            configs = json.load(f)
+        ids = enqueue_search(queue, os.path.abspath(os.path.join(args.data_dir, 'processed_data.csv')),
+                             args.target_col, splits, configs)
+        logging.info(f"Enqueued {len(ids)} jobs")
+    elif args.command == 'work':
+        if args.processes > 1:
+            # Each extra process is a plain single worker, exactly like one started on another host, running on
+            # its share of the cores so the workers' XGBoost threads do not compete.
+            env, cores = get_manager().child_env(args.processes)
+            child_args = [sys.executable, os.path.abspath(__file__), '--db', args.db, '--lease', str(args.lease),
+                          '--cores', str(cores), 'work', '--poll-interval', str(args.poll_interval)] + \
+                (['--forever'] if args.forever else [])
+            children = [subprocess.Popen(child_args, env=env) for _ in range(args.processes)]
+            sys.exit(max(child.wait() for child in children))
+        run_worker(queue, poll_interval=args.poll_interval, exit_when_empty=not args.forever)
+    elif args.command == 'status':
+        for status, count in sorted(queue.counts().items()):
+            print(f"{status:<10} {count}")
+        for job_id, payload, error in queue.failures():
+            print(f"job {job_id} ({payload.get('config')}, {payload.get('scheme')} fold {payload.get('fold')}) "
+                  f"failed: {error.strip().splitlines()[-1] if error else 'unknown error'}")
+    elif args.command == 'collect':
+        results = collect_results(queue)
+        results.save(args.output)
+        print(results.metrics(by=['model', 'scheme']).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()